@@ -0,0 +1,243 @@
+"""
+EduAssist AI - Admission Control
+A bounded work queue in front of content generation, so a burst of
+sessions (a whole school pressing Generate at the start of a period) is
+served a few at a time at full speed instead of all at once, each slowed
+down by all the others
+
+A request first passes its session's rate limit (a token bucket), then
+takes one of max_concurrent slots or waits its turn in a FIFO queue of at
+most max_queue tickets. A waiting ticket reports its position, so the page
+can say so at once instead of stalling.
+
+Configure with EDUASSIST_MAX_CONCURRENT, EDUASSIST_MAX_QUEUE,
+EDUASSIST_SESSION_RATE (requests per minute, 0 for no limit) and
+EDUASSIST_SESSION_BURST.
+"""
+
+from collections import deque
+from typing import Callable, Deque, Dict, Hashable, Optional, Tuple
+import os
+import threading
+import time
+
+from metrics import metrics
+
+
+QUEUE_METRIC = "eduassist_queue_seconds"
+ADMISSIONS_METRIC = "eduassist_admissions_total"
+
+
+class AdmissionRejected(Exception):
+    """A request that was turned away; retry_after is a hint in seconds."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimited(AdmissionRejected):
+    """The session sent more requests than its rate limit allows."""
+
+
+class QueueFull(AdmissionRejected):
+    """Every slot is busy and the queue is at its limit."""
+
+
+class Ticket:
+    """
+    One request's place in the queue, then its slot.
+
+    Release it when the work is done, or when giving up while still queued;
+    used as a context manager it releases itself.
+    """
+
+    __slots__ = ("controller", "session", "enqueued", "admitted_at", "_admitted", "_released")
+
+    def __init__(self, controller: "AdmissionController", session: Hashable, enqueued: float):
+        self.controller = controller
+        self.session = session
+        self.enqueued = enqueued
+        self.admitted_at: Optional[float] = None
+        self._admitted = threading.Event()
+        self._released = False
+
+    @property
+    def admitted(self) -> bool:
+        """Whether the ticket holds a slot."""
+        return self._admitted.is_set()
+
+    @property
+    def position(self) -> int:
+        """1-based place in the queue, 0 once admitted (or released)."""
+        return self.controller._position(self)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until admitted or timeout seconds pass; return whether admitted."""
+        return self._admitted.wait(timeout)
+
+    def release(self) -> None:
+        """Give back the slot, or leave the queue; later calls do nothing."""
+        self.controller._release(self)
+
+    def __enter__(self) -> "Ticket":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        self.release()
+        return False
+
+
+class AdmissionController:
+    """Concurrency limit, bounded FIFO queue and per-session rate limits."""
+
+    # Session buckets kept before full (idle) ones are dropped
+    MAX_BUCKETS = 4096
+
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 256, rate: float = 0.2,
+                 burst: float = 3, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_concurrent: Requests doing work at once
+            max_queue: Requests allowed to wait; more are rejected with QueueFull
+            rate: Requests per second each session earns (0 for no rate limit)
+            burst: Requests a session may send back to back
+            clock: Monotonic time source in seconds
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queue: Deque[Ticket] = deque()
+        self._buckets: Dict[Hashable, Tuple[float, float]] = {}
+        # Moving average of how long a slot is held, for retry hints
+        self._service_seconds = 0.0
+        self.admitted = 0
+        self.queued = 0
+        self.rate_limited = 0
+        self.rejected = 0
+        self.abandoned = 0
+        self.queue_seconds_total = 0.0
+        self.queue_seconds_max = 0.0
+
+    def submit(self, session: Hashable) -> Ticket:
+        """
+        Ask for a slot without blocking.
+
+        Args:
+            session: Identifies the caller for rate limiting
+
+        Returns:
+            A ticket that is either admitted already or waiting in the queue
+
+        Raises:
+            RateLimited: If the session is over its rate limit
+            QueueFull: If no slot is free and the queue is full
+        """
+        now = self.clock()
+        with self._lock:
+            tokens = self._tokens(session, now)
+            if tokens < 1:
+                self.rate_limited += 1
+                outcome, error = "rate_limited", RateLimited(
+                    "Too many requests from this session", (1 - tokens) / self.rate)
+            elif self._active >= self.max_concurrent and len(self._queue) >= self.max_queue:
+                self.rejected += 1
+                outcome, error = "queue_full", QueueFull(
+                    "Too many requests are waiting",
+                    self._service_seconds * (len(self._queue) + 1) / self.max_concurrent)
+            else:
+                if self.rate > 0:
+                    self._buckets[session] = (tokens - 1, now)
+                ticket = Ticket(self, session, now)
+                if self._active < self.max_concurrent and not self._queue:
+                    self._admit(ticket, now)
+                    outcome, error = "admitted", None
+                else:
+                    self._queue.append(ticket)
+                    self.queued += 1
+                    outcome, error = "queued", None
+        metrics.inc(ADMISSIONS_METRIC, outcome=outcome)
+        if error is not None:
+            raise error
+        if outcome == "admitted" and metrics.enabled:
+            metrics.observe(QUEUE_METRIC, 0.0)
+        return ticket
+
+    def stats(self) -> Dict[str, float]:
+        """Slots in use, queue length, and admission counts."""
+        with self._lock:
+            return {
+                "active": self._active, "waiting": len(self._queue),
+                "max_concurrent": self.max_concurrent, "max_queue": self.max_queue,
+                "admitted": self.admitted, "queued": self.queued, "rate_limited": self.rate_limited,
+                "rejected": self.rejected, "abandoned": self.abandoned,
+                "queue_seconds_total": round(self.queue_seconds_total, 6),
+                "queue_seconds_max": round(self.queue_seconds_max, 6)
+            }
+
+    def _tokens(self, session: Hashable, now: float) -> float:
+        # Tokens the session has now; a bucket starts full
+        if self.rate <= 0:
+            return self.burst
+        bucket = self._buckets.get(session)
+        if bucket is None:
+            if len(self._buckets) >= self.MAX_BUCKETS:
+                self._prune(now)
+            return self.burst
+        return min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+
+    def _prune(self, now: float) -> None:
+        # A refilled bucket is the same as no bucket
+        for session, (tokens, stamp) in list(self._buckets.items()):
+            if tokens + (now - stamp) * self.rate >= self.burst:
+                del self._buckets[session]
+
+    def _admit(self, ticket: Ticket, now: float) -> None:
+        self._active += 1
+        self.admitted += 1
+        ticket.admitted_at = now
+        waited = now - ticket.enqueued
+        self.queue_seconds_total += waited
+        self.queue_seconds_max = max(self.queue_seconds_max, waited)
+        ticket._admitted.set()
+
+    def _position(self, ticket: Ticket) -> int:
+        with self._lock:
+            if ticket._released or ticket._admitted.is_set():
+                return 0
+            return self._queue.index(ticket) + 1
+
+    def _release(self, ticket: Ticket) -> None:
+        now = self.clock()
+        waited = []
+        with self._lock:
+            if ticket._released:
+                return
+            ticket._released = True
+            if not ticket._admitted.is_set():
+                self._queue.remove(ticket)
+                self.abandoned += 1
+                return
+            self._active -= 1
+            held = now - ticket.admitted_at
+            self._service_seconds = held if not self._service_seconds else 0.9 * self._service_seconds + 0.1 * held
+            while self._queue and self._active < self.max_concurrent:
+                waiting = self._queue.popleft()
+                waited.append(now - waiting.enqueued)
+                self._admit(waiting, now)
+        if metrics.enabled:
+            for seconds in waited:
+                metrics.observe(QUEUE_METRIC, seconds)
+
+
+# Process-wide controller for the Streamlit page
+admission_controller = AdmissionController(
+    max_concurrent=int(os.environ.get("EDUASSIST_MAX_CONCURRENT", "8")),
+    max_queue=int(os.environ.get("EDUASSIST_MAX_QUEUE", "256")),
+    rate=float(os.environ.get("EDUASSIST_SESSION_RATE", "12")) / 60,
+    burst=float(os.environ.get("EDUASSIST_SESSION_BURST", "3"))
+)
@@ -4,8 +4,200 @@ AI-Powered Learning Support System
 Aligned with SDG 4 - Quality Education
 """
 
+from typing import Optional
+import math
+import os
+
 import streamlit as st
-from backend import generate_all_content
+import backend
+import profiling
+from admission import QueueFull, RateLimited, Ticket, admission_controller
+from backend import (
+    LazyContent,
+    generate_all_content,
+    generate_quiz,
+    get_content_cache_stats,
+    knowledge_source,
+    render_metrics,
+    resolve_topic,
+    search_topics
+)
+from fragments import answer_letters, fragment_cache, quiz_html, results_html
+from metrics import METRICS_FILE, metrics
+from scoring import quiz_answer_key, quiz_item_ids, quiz_stats_key, scoring_engine
+
+
+def write_markdown(section) -> str:
+    """Write a finished markdown string, or stream one chunk by chunk; return the full text."""
+    if isinstance(section, str):
+        st.markdown(section)
+        return section
+    return st.write_stream(section)
+
+
+def render_content(content: LazyContent) -> None:
+    """
+    Render the explanation, quiz and study plan sections.
+    
+    Sections sit behind toggles rather than expanders (whose bodies always
+    run), so a section is only generated once the student opens it. The first
+    time, it is streamed piece by piece as it is generated. Each section is
+    a single element, and each divider shares an element with the next heading.
+    """
+    # 1. Personalized Explanation
+    st.markdown("## 📖 Personalized Explanation")
+    if st.toggle("Show explanation", value=True, key="show_explanation"):
+        write_markdown(content.stream('explanation'))
+    
+    # 2. Self-Assessment Quiz
+    st.markdown("---\n\n## 📝 Self-Assessment Quiz")
+    if st.toggle("Show quiz", key="show_quiz"):
+        stats_key = quiz_stats_key(content.topic, content.level)
+        if not backend.content_backend.rule_based:
+            # A generator backend's quiz was requested with the other sections; show it, not a bank draw.
+            # Every session sees the same one, so its block is rendered once per process
+            render_quiz(content['quiz'], f"{stats_key}/{backend.content_backend.name}", stats_key,
+                        content.digest('quiz'))
+        else:
+            # Each student gets their own draw from the question bank, not the fixed shared quiz
+            if "quiz_seed" not in st.session_state:
+                new_quiz_seed()
+            seed = st.session_state["quiz_seed"]
+            render_quiz(generate_quiz(content.topic, content.level, seed), f"{stats_key}/{seed}", stats_key)
+            st.button("🔀 Try a different set of questions", on_click=new_quiz_seed)
+    
+    # 3. Recommended Study Plan
+    st.markdown("---\n\n## 📅 Recommended Study Plan")
+    if st.toggle("Show your personalized study plan", key="show_study_plan"):
+        write_markdown(content.stream('study_plan'))
+    
+    # Encouragement message
+    st.markdown("---")
+    st.info("💡 **Keep Learning!** Remember to practice regularly and don't hesitate to explore additional resources.")
+
+
+def new_quiz_seed() -> None:
+    """Give this student a fresh question bank draw."""
+    st.session_state["quiz_seed"] = os.urandom(4).hex()
+
+
+def use_suggestion(topic_key: str) -> None:
+    """Fill the topic input with a suggested topic."""
+    st.session_state["topic_input"] = topic_key.title()
+
+
+def render_suggestions(topic: str) -> None:
+    """Suggest knowledge base topics that mention what the student typed."""
+    hits = search_topics(topic, limit=3)
+    if not hits or hits[0].key == topic.lower().strip():
+        return
+    st.caption("🔍 Related topics:")
+    for hit in hits:
+        st.button(hit.key.title(), key=f"suggest::{hit.key}", on_click=use_suggestion, args=(hit.key,))
+
+
+def render_quiz(questions: list, quiz_key: str, stats_key: str, digest: Optional[str] = None) -> None:
+    """
+    Render the quiz as a form the student can submit, then grade it.
+    
+    The questions are one pre-assembled block and the answers one letter
+    choice per question, the only per-question elements a graded quiz needs.
+    Results come back as one block with the correct answers behind
+    client-side disclosures.
+    
+    Args:
+        questions: Quiz questions
+        quiz_key: Identifies this quiz's answers and result in the session
+        stats_key: Question pool of the scoring engine's item statistics
+        digest: Content digest of questions every session shares (a generator backend's
+            quiz), whose block is then rendered once per process; None for a per-session draw
+    """
+    def render() -> str:
+        return "<p><em>Test your understanding with these questions:</em></p>\n" + quiz_html(questions, reveal=False)
+    
+    block = render() if digest is None else fragment_cache.get(("quiz", digest), render)
+    with st.form(f"quiz::{quiz_key}"):
+        st.markdown(block, unsafe_allow_html=True)
+        # Answer sheet: unanswered until the student picks a letter
+        for idx, letters in enumerate(answer_letters(questions), 1):
+            st.radio(
+                f"Question {idx}",
+                letters,
+                index=None,
+                horizontal=True,
+                key=f"answer::{quiz_key}::{idx}"
+            )
+        submitted = st.form_submit_button("✅ Submit Answers")
+    
+    result_key = f"quiz_result::{quiz_key}"
+    if submitted:
+        answers = [st.session_state.get(f"answer::{quiz_key}::{idx}") or "" for idx in range(1, len(questions) + 1)]
+        # Only a student's first submission counts towards the item statistics
+        correct, _ = scoring_engine.score(stats_key, [answers], quiz_answer_key(questions),
+                                          record=result_key not in st.session_state,
+                                          item_ids=quiz_item_ids(questions))
+        st.session_state[result_key] = correct[0].tolist()
+    
+    result = st.session_state.get(result_key)
+    if result is not None:
+        st.markdown(results_html(questions, result), unsafe_allow_html=True)
+
+
+# How often a queued request refreshes its place in line, in seconds
+QUEUE_POLL_SECONDS = 0.5
+# The developer panel is switched on by the deployment, never by a visitor
+DEV_PANEL = os.environ.get("EDUASSIST_DEV_PANEL") == "1"
+
+
+def format_wait(seconds: float) -> str:
+    """A retry hint in whole seconds, e.g. "5 seconds"."""
+    seconds = max(1, math.ceil(seconds))
+    return "1 second" if seconds == 1 else f"{seconds} seconds"
+
+
+def wait_for_admission() -> Optional[Ticket]:
+    """
+    Take a generation slot for this session, showing its place in the queue while it waits.
+    
+    Returns:
+        The admitted ticket, to release once the page is rendered, or None
+        when the request was turned away (a warning is shown instead)
+    """
+    session = st.session_state.setdefault("session_id", os.urandom(8).hex())
+    try:
+        ticket = admission_controller.submit(session)
+    except RateLimited as e:
+        st.warning(f"⏳ You are generating content very quickly. Please try again in {format_wait(e.retry_after)}.")
+        return None
+    except QueueFull as e:
+        st.warning(f"⏳ EduAssist is very busy right now. Please try again in about {format_wait(e.retry_after)}.")
+        return None
+    notice = None
+    try:
+        while not ticket.wait(0 if notice is None else QUEUE_POLL_SECONDS):
+            if notice is None:
+                notice = st.empty()
+            position = ticket.position
+            if position:
+                notice.info(f"⏳ Queued, position {position}. Your learning content will appear here shortly.")
+    except BaseException:
+        # Leaving the page (or a rerun) gives up the place in line
+        ticket.release()
+        raise
+    if notice is not None:
+        notice.empty()
+    return ticket
+
+
+def start_profile() -> Optional[profiling.RequestProfile]:
+    """Profile this page run if it is sampled (EDUASSIST_PROFILE) or requested with ?profile=1."""
+    return profiling.start(force=profile_requested())
+
+
+def profile_requested() -> bool:
+    """Whether the URL asks to profile this run; honoured only with EDUASSIST_DEV_PANEL=1."""
+    return DEV_PANEL and st.query_params.get("profile") == "1"
+
 
 # Page configuration
 st.set_page_config(
@@ -171,8 +363,12 @@ with col1:
     topic = st.text_input(
         "What would you like to learn about?",
         placeholder="e.g., Photosynthesis, Python Programming, World War II...",
-        help="Enter any topic you want to explore"
+        help="Enter any topic you want to explore",
+        key="topic_input"
     )
+    # Suggestions update whenever the input is submitted (Enter or leaving the field)
+    if topic.strip():
+        render_suggestions(topic)
 
 with col2:
     level = st.radio(
@@ -184,61 +380,87 @@ with col2:
 # Generate button
 generate_clicked = st.button("🚀 Generate Learning Support", use_container_width=True)
 
-# Output Section
-if generate_clicked:
-    if not topic or topic.strip() == "":
-        st.error("⚠️ Please enter a learning topic to continue.")
-    else:
-        with st.spinner(f"🤖 Generating personalized learning content for '{topic}' at {level} level..."):
-            try:
-                # Generate all content
-                content = generate_all_content(topic, level)
-                
-                st.success("✅ Learning content generated successfully!")
-                st.markdown("---")
-                
-                # 1. Personalized Explanation
-                st.markdown("## 📖 Personalized Explanation")
-                with st.expander("Click to view explanation", expanded=True):
-                    st.markdown(content['explanation'])
-                
-                st.markdown("---")
-                
-                # 2. Self-Assessment Quiz
-                st.markdown("## 📝 Self-Assessment Quiz")
-                st.markdown("*Test your understanding with these questions:*")
-                
-                quiz_questions = content['quiz']
-                
-                for idx, q in enumerate(quiz_questions, 1):
-                    st.markdown(f"""
-                    <div class="quiz-question">
-                        <strong>Question {idx}:</strong> {q.get('question', 'N/A')}
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Display options
-                    for option in q.get('options', []):
-                        st.markdown(f"&nbsp;&nbsp;&nbsp;&nbsp;{option}")
-                    
-                    # Show answer in expander
-                    with st.expander(f"Show Answer for Question {idx}"):
-                        st.markdown(f"**Correct Answer:** {q.get('correct_answer', 'N/A')}")
-                
-                st.markdown("---")
-                
-                # 3. Recommended Study Plan
-                st.markdown("## 📅 Recommended Study Plan")
-                with st.expander("Click to view your personalized study plan", expanded=True):
-                    st.markdown(content['study_plan'])
-                
-                # Encouragement message
-                st.markdown("---")
-                st.info("💡 **Keep Learning!** Remember to practice regularly and don't hesitate to explore additional resources.")
-                
-            except Exception as e:
-                st.error(f"❌ An error occurred: {str(e)}")
-                st.info("💡 **Troubleshooting Tips:**\n- Check if your `.env` file contains a valid Gemini API key\n- Ensure you have internet connectivity\n- Verify that all dependencies are installed")
+# A click creates lazy content for the topic; it is kept in session state so
+# reruns (e.g. opening a section) only generate the sections opened since
+content = None
+ticket = None
+profile = profile_path = None
+try:
+    if generate_clicked:
+        if not topic or topic.strip() == "":
+            st.error("⚠️ Please enter a learning topic to continue.")
+        else:
+            # Generating and rendering the page holds one of a limited number of slots
+            ticket = wait_for_admission()
+            if ticket is not None:
+                profile = start_profile()
+                st.session_state["topic_match"] = resolve_topic(topic)
+                if backend.content_backend.rule_based:
+                    content = generate_all_content(topic, level)
+                else:
+                    # Another backend fetches every section up front, each within its deadline
+                    with st.spinner("Preparing your learning content..."):
+                        content = generate_all_content(topic, level)
+    elif "generated_content" in st.session_state:
+        profile = start_profile()
+        content = st.session_state["generated_content"]
+
+    # Output Section
+    if content is not None:
+        status = st.empty()
+        st.markdown("---")
+        
+        # Let the student know when a misspelled or reworded topic was matched
+        match = st.session_state.get("topic_match")
+        if match is not None and not match.exact and match.key != "default":
+            st.info(f"🔎 Showing results for **{match.key.title()}** (matched \"{match.matched}\", {match.score:.0%} confidence)")
+        try:
+            with metrics.stage("render"):
+                render_content(content)
+            if generate_clicked:
+                st.session_state["generated_content"] = content
+                status.success("✅ Learning content generated successfully!")
+        except Exception as e:
+            st.session_state.pop("generated_content", None)
+            st.error(f"❌ An error occurred: {str(e)}")
+            st.info("💡 **Troubleshooting Tips:**\n- Try a different spelling or a more general topic\n- If `EDUASSIST_BACKEND` selects a generator backend, check that it is reachable; sections it cannot deliver in time use the built-in templates\n- Verify that all dependencies are installed")
+finally:
+    # Hand the generation slot to the next queued session
+    if ticket is not None:
+        ticket.release()
+    # Generation and rendering of this run, written to EDUASSIST_PROFILE_DIR
+    if profile is not None:
+        profile_path = profile.finish(f"{content.topic} {content.level}" if content is not None else "page")
+
+if profile_path is not None and profile_requested():
+    # The file name only: the server's directory layout is none of the page's business
+    st.caption(f"🔬 Profile written to `{os.path.basename(profile_path)}.*`")
+
+if METRICS_FILE and metrics.enabled:
+    metrics.write_prometheus(METRICS_FILE)
+
+# Developer panel (EDUASSIST_DEV_PANEL=1)
+if DEV_PANEL:
+    with st.expander("🛠️ Developer metrics"):
+        # Instrumentation is process-wide, so only EDUASSIST_METRICS switches it
+        st.caption(f"Instrumentation: {'on' if metrics.enabled else 'off (set EDUASSIST_METRICS=1)'}")
+        if knowledge_source is not None:
+            st.caption(f"Knowledge source: {knowledge_source.path} (version {knowledge_source.current.number}, "
+                       f"{len(knowledge_source.current.topics)} topics)")
+            if knowledge_source.last_error:
+                st.warning(f"Last reload failed, still serving version {knowledge_source.current.number}: "
+                           f"{knowledge_source.last_error}")
+        st.json(get_content_cache_stats()
+                | {f"fragment_{name}": value for name, value in fragment_cache.stats().items()}
+                | {f"admission_{name}": value for name, value in admission_controller.stats().items()})
+        for graded_quiz in scoring_engine.quizzes():
+            stats = scoring_engine.statistics(graded_quiz)
+            st.markdown(f"**Item statistics — {graded_quiz}** ({stats.submissions} submissions)")
+            st.dataframe(stats.summary(), use_container_width=True)
+        summary = metrics.summary()
+        if summary:
+            st.dataframe(summary, use_container_width=True)
+        st.code(render_metrics(), language="text")
 
 # Footer
 st.markdown("---")
@@ -5,8 +5,26 @@ Aligned with SDG 4 - Quality Education
 NO API REQUIRED - Fully offline capable
 """
 
-from typing import Dict, List
-import random
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union
+import asyncio
+import os
+import threading
+
+from content_backends import ContentBackend, RuleBasedBackend, create_backend
+from content_hash import ContentSkeleton, escape_template, section_digest, source_fingerprint, substitutions
+from knowledge_source import KnowledgeChange, KnowledgeSource
+from knowledge_store import KnowledgeStore
+from metrics import metrics
+from question_bank import question_bank
+from records import QuizQuestion, StudyWeek, TopicEntry
+from search_index import SearchHit, SearchIndex
+from shared_cache import SharedContentCache
+from single_flight import SingleFlight
+from topic_index import TopicIndex, TopicMatch
 
 
 # Knowledge Base - Predefined educational content
@@ -72,236 +90,615 @@ KNOWLEDGE_BASE = {
 }
 
 
-def get_topic_data(topic: str, level: str) -> Dict:
-    """Retrieve topic data from knowledge base."""
-    topic_key = topic.lower().strip()
-    level_key = level.lower()
-    
-    # Check if topic exists in knowledge base
-    if topic_key in KNOWLEDGE_BASE:
-        return KNOWLEDGE_BASE[topic_key][level_key]
-    else:
-        # Use default template
-        return KNOWLEDGE_BASE["default"][level_key]
+# Alternative names students use for knowledge base topics
+TOPIC_ALIASES = {
+    "photosynthesis": [
+        "photo synthesis",
+        "photosynthetic process",
+        "plant photosynthesis",
+        "how plants make food",
+        "calvin cycle",
+        "light dependent reactions"
+    ]
+}
 
+# Minimum confidence for a fuzzy match before falling back to the default entry.
+# A one-letter typo in a long name scores about 0.8, while a different word
+# sharing a long stem scores 0.6-0.65 ("chemosynthesis", "biosynthesis" and
+# "synthesis" against "photosynthesis"), so those must fall below the cut.
+TOPIC_MATCH_THRESHOLD = 0.7
 
-def generate_explanation(topic: str, level: str) -> str:
+# Built once per process over KNOWLEDGE_BASE keys plus declared aliases
+topic_index = TopicIndex.build(
+    (key for key in KNOWLEDGE_BASE if key != "default"),
+    TOPIC_ALIASES,
+    threshold=TOPIC_MATCH_THRESHOLD
+)
+
+# Full-text index over the built-in entries' names, definitions and key points
+search_index = SearchIndex.build(KNOWLEDGE_BASE)
+
+
+# Optional disk-backed knowledge base (see knowledge_store.py); the
+# KNOWLEDGE_BASE literal above remains the built-in fallback
+KNOWLEDGE_STORE_PATH = os.environ.get("EDUASSIST_KB_PATH")
+knowledge_store = KnowledgeStore(KNOWLEDGE_STORE_PATH) if KNOWLEDGE_STORE_PATH else None
+
+# Optional hot-reloaded knowledge base (see knowledge_source.py); its topics
+# take precedence over the store and the built-in entries. Loaded here, then
+# watched once the content cache below exists.
+KNOWLEDGE_SOURCE_PATH = os.environ.get("EDUASSIST_KB_SOURCE")
+knowledge_source = (
+    KnowledgeSource(KNOWLEDGE_SOURCE_PATH, threshold=TOPIC_MATCH_THRESHOLD) if KNOWLEDGE_SOURCE_PATH else None
+)
+if knowledge_source is not None:
+    knowledge_source.reload()
+
+
+def resolve_topic(topic: str) -> TopicMatch:
     """
-    Generate a rule-based explanation using templates.
+    Resolve a topic to the best knowledge base entry.
     
     Args:
-        topic: The learning topic to explain
-        level: Learning level (Beginner, Intermediate, Advanced)
+        topic: The learning topic as entered by the student
     
     Returns:
-        A formatted explanation suitable for the specified level
+        TopicMatch with the matched key, the name or alias it matched and a
+        confidence score; unknown topics resolve to "default" with score 0.0
     """
-    data = get_topic_data(topic, level)
-    
-    # Level-specific introduction templates
-    intros = {
-        "beginner": f"Let's learn about **{topic}** in a simple way!",
-        "intermediate": f"Understanding **{topic}** requires exploring its key mechanisms and applications.",
-        "advanced": f"An advanced analysis of **{topic}** involves examining complex theoretical frameworks."
-    }
-    
-    intro = intros.get(level.lower(), intros["beginner"])
-    definition = data["definition"]
-    key_points = data["key_points"]
-    
-    # Build explanation
-    explanation = f"{intro}\n\n"
-    explanation += f"**Definition:** {definition}\n\n"
-    explanation += "**Key Concepts:**\n"
-    
-    for i, point in enumerate(key_points, 1):
-        explanation += f"{i}. {point}\n"
+    topic_key = topic.lower().strip()
     
-    # Add level-specific conclusion
-    if level.lower() == "beginner":
-        explanation += f"\n**Remember:** {topic.capitalize()} is an important concept that you'll use as you continue learning!"
-    elif level.lower() == "intermediate":
-        explanation += f"\n**Application:** Understanding {topic} helps you connect theory with practical applications in the field."
-    else:
-        explanation += f"\n**Research Direction:** Advanced study of {topic} opens pathways to cutting-edge research and innovation."
+    # Exact hits in the hot-reloaded source, the store, then the built-in dict, skip fuzzy matching entirely
+    if knowledge_source is not None:
+        match = knowledge_source.lookup(topic, fuzzy=False)
+        if match is not None:
+            return match
+    if knowledge_store is not None:
+        match = knowledge_store.lookup(topic, fuzzy=False)
+        if match is not None:
+            return match
+    if topic_key in KNOWLEDGE_BASE:
+        return TopicMatch(topic_key, topic_key, 1.0, topic_key)
     
-    return explanation
+    candidates = [topic_index.lookup(topic)]
+    if knowledge_source is not None:
+        candidates.append(knowledge_source.lookup(topic))
+    if knowledge_store is not None:
+        candidates.append(knowledge_store.lookup(topic))
+    candidates = [match for match in candidates if match is not None]
+    if not candidates:
+        return TopicMatch("default", "default", 0.0, topic_key)
+    return max(candidates, key=lambda match: match.score)
 
 
-def generate_quiz(topic: str, level: str) -> List[Dict[str, any]]:
+def search_topics(query: str, limit: int = 5) -> List[SearchHit]:
     """
-    Generate rule-based quiz questions using templates.
+    Find topics whose name or content matches a free-text query.
+    
+    Unlike resolve_topic, which maps a topic name to one entry, this ranks
+    every topic by the words it contains, so "chlorophyll" finds
+    photosynthesis. The last word may be partial, for suggestions as the
+    student types.
     
     Args:
-        topic: The learning topic for the quiz
-        level: Learning level (Beginner, Intermediate, Advanced)
+        query: Words the student typed
+        limit: Maximum number of topics returned
     
     Returns:
-        List of dictionaries containing questions, options, and correct answers
+        Matching topics, hot-reloaded source hits first, then the store's, each topic once
     """
+    indexes = [index for index in (knowledge_source, knowledge_store) if index is not None]
+    hits, seen = [], set()
+    for index in indexes + [search_index]:
+        for hit in index.search(query, limit):
+            if len(hits) >= limit:
+                return hits
+            if hit.key not in seen:
+                hits.append(hit)
+                seen.add(hit.key)
+    return hits
+
+
+# Built-in entries converted to TopicEntry records on first use. Keyed by the
+# identity of the source dict (kept alive alongside the record), so topics that
+# share a level dict share one record and replaced dicts are re-converted.
+_TOPIC_ENTRIES: Dict[int, Tuple[Dict, TopicEntry]] = {}
+
+
+def _builtin_entry(topic_key: str, level_key: str) -> TopicEntry:
+    """Return the built-in knowledge base entry as a shared, immutable record."""
+    source = KNOWLEDGE_BASE.get(topic_key, KNOWLEDGE_BASE["default"])[level_key]
+    cached = _TOPIC_ENTRIES.get(id(source))
+    if cached is not None:
+        return cached[1]
+    entry = TopicEntry.from_mapping(source)
+    _TOPIC_ENTRIES[id(source)] = (source, entry)
+    return entry
+
+
+def get_topic_data(topic: str, level: str) -> TopicEntry:
+    """Retrieve topic data from the knowledge store or built-in knowledge base."""
+    level_key = level.lower()
     
-    # Question templates by level
-    templates = {
-        "beginner": [
-            {
-                "question": f"What is {topic}?",
-                "options": [
-                    "A) A process or concept in the subject area",
-                    "B) A type of measurement tool",
-                    "C) A mathematical formula",
-                    "D) A historical event"
-                ],
-                "correct_answer": "A"
-            },
-            {
-                "question": f"Why is {topic} important?",
-                "options": [
-                    "A) It has no practical use",
-                    "B) It helps us understand fundamental concepts",
-                    "C) It only matters for advanced students",
-                    "D) It is outdated knowledge"
-                ],
-                "correct_answer": "B"
-            },
-            {
-                "question": f"Where do we commonly encounter {topic}?",
-                "options": [
-                    "A) Only in laboratories",
-                    "B) In everyday life and nature",
-                    "C) Only in textbooks",
-                    "D) Nowhere in the real world"
-                ],
-                "correct_answer": "B"
-            },
+    with metrics.stage("topic_lookup"):
+        # Misspelled or reworded topics resolve to their closest entry, others use the default template
+        topic_key = resolve_topic(topic).key
+        if knowledge_source is not None:
+            data = knowledge_source.get(topic_key, level_key)
+            if data is not None:
+                return data
+        if knowledge_store is not None:
+            data = knowledge_store.get(topic_key, level_key)
+            if data is not None:
+                return data
+        return _builtin_entry(topic_key, level_key)
+
+
+# Explanation templates - ``{topic}`` slots are filled in at render time
+EXPLANATION_INTROS = {
+    "beginner": "Let's learn about **{topic}** in a simple way!",
+    "intermediate": "Understanding **{topic}** requires exploring its key mechanisms and applications.",
+    "advanced": "An advanced analysis of **{topic}** involves examining complex theoretical frameworks."
+}
+
+EXPLANATION_CONCLUSIONS = {
+    "beginner": "\n**Remember:** {topic_capitalized} is an important concept that you'll use as you continue learning!",
+    "intermediate": "\n**Application:** Understanding {topic} helps you connect theory with practical applications in the field.",
+    "advanced": "\n**Research Direction:** Advanced study of {topic} opens pathways to cutting-edge research and innovation."
+}
+
+
+# Quiz question templates by level
+QUIZ_TEMPLATES = {
+    "beginner": [
+        {
+            "question": "What is {topic}?",
+            "options": [
+                "A) A process or concept in the subject area",
+                "B) A type of measurement tool",
+                "C) A mathematical formula",
+                "D) A historical event"
+            ],
+            "correct_answer": "A"
+        },
+        {
+            "question": "Why is {topic} important?",
+            "options": [
+                "A) It has no practical use",
+                "B) It helps us understand fundamental concepts",
+                "C) It only matters for advanced students",
+                "D) It is outdated knowledge"
+            ],
+            "correct_answer": "B"
+        },
+        {
+            "question": "Where do we commonly encounter {topic}?",
+            "options": [
+                "A) Only in laboratories",
+                "B) In everyday life and nature",
+                "C) Only in textbooks",
+                "D) Nowhere in the real world"
+            ],
+            "correct_answer": "B"
+        },
+        {
+            "question": "What is the first step in learning about {topic}?",
+            "options": [
+                "A) Memorizing complex formulas",
+                "B) Understanding the basic definition",
+                "C) Conducting advanced research",
+                "D) Ignoring the fundamentals"
+            ],
+            "correct_answer": "B"
+        },
+        {
+            "question": "How can you practice {topic}?",
+            "options": [
+                "A) By doing simple exercises and examples",
+                "B) By avoiding all practice",
+                "C) Only through theoretical study",
+                "D) It cannot be practiced"
+            ],
+            "correct_answer": "A"
+        }
+    ],
+    "intermediate": [
+        {
+            "question": "What are the key mechanisms involved in {topic}?",
+            "options": [
+                "A) Simple one-step processes",
+                "B) Complex interactions between multiple components",
+                "C) No mechanisms are involved",
+                "D) Only theoretical concepts"
+            ],
+            "correct_answer": "B"
+        },
+        {
+            "question": "How does {topic} relate to other concepts in the field?",
+            "options": [
+                "A) It exists in complete isolation",
+                "B) It connects to and influences related concepts",
+                "C) It has no relationship to anything else",
+                "D) Only beginners need to know connections"
+            ],
+            "correct_answer": "B"
+        },
+        {
+            "question": "What is a practical application of {topic}?",
+            "options": [
+                "A) It has no real-world applications",
+                "B) It solves problems and creates solutions in various fields",
+                "C) Only theoretical exercises",
+                "D) Applications are unknown"
+            ],
+            "correct_answer": "B"
+        },
+        {
+            "question": "What level of understanding is needed to work with {topic}?",
+            "options": [
+                "A) Only memorization is required",
+                "B) Deep conceptual understanding and analytical skills",
+                "C) No understanding is necessary",
+                "D) Basic awareness is sufficient"
+            ],
+            "correct_answer": "B"
+        },
+        {
+            "question": "How would you explain {topic} to someone else?",
+            "options": [
+                "A) By using technical jargon only",
+                "B) By breaking it down into understandable parts with examples",
+                "C) It cannot be explained",
+                "D) By avoiding all details"
+            ],
+            "correct_answer": "B"
+        }
+    ],
+    "advanced": [
+        {
+            "question": "What are the theoretical foundations of {topic}?",
+            "options": [
+                "A) There are no theoretical foundations",
+                "B) Complex principles and established research frameworks",
+                "C) Only practical observations",
+                "D) Simple assumptions"
+            ],
+            "correct_answer": "B"
+        },
+        {
+            "question": "How does current research approach {topic}?",
+            "options": [
+                "A) Research has concluded on this topic",
+                "B) Through interdisciplinary methods and advanced analysis",
+                "C) Only through basic observation",
+                "D) Research ignores this topic"
+            ],
+            "correct_answer": "B"
+        },
+        {
+            "question": "What are the limitations of current understanding of {topic}?",
+            "options": [
+                "A) Everything is fully understood",
+                "B) There are ongoing debates and areas requiring further investigation",
+                "C) No limitations exist",
+                "D) The topic is too simple to have limitations"
+            ],
+            "correct_answer": "B"
+        },
+        {
+            "question": "How can {topic} be applied to solve complex problems?",
+            "options": [
+                "A) It cannot solve complex problems",
+                "B) Through systematic analysis and integration with other advanced concepts",
+                "C) Only through guesswork",
+                "D) Simple application is sufficient"
+            ],
+            "correct_answer": "B"
+        },
+        {
+            "question": "What future developments are expected in {topic}?",
+            "options": [
+                "A) No future developments are anticipated",
+                "B) Continued research and technological advances will expand understanding",
+                "C) The field is stagnant",
+                "D) Future developments are impossible"
+            ],
+            "correct_answer": "B"
+        }
+    ]
+}
+
+
+# Study plan templates - duration and structure by level
+STUDY_PLAN_TEMPLATES = {
+    "beginner": {
+        "duration": "2 weeks",
+        "weeks": [
             {
-                "question": f"What is the first step in learning about {topic}?",
-                "options": [
-                    "A) Memorizing complex formulas",
-                    "B) Understanding the basic definition",
-                    "C) Conducting advanced research",
-                    "D) Ignoring the fundamentals"
-                ],
-                "correct_answer": "B"
+                "week": 1,
+                "focus": "Understanding Basics",
+                "activities": [
+                    "Learn the definition and purpose of {topic}",
+                    "Watch introductory videos or read beginner-friendly articles",
+                    "Create flashcards for key terms",
+                    "Complete simple practice exercises"
+                ]
             },
             {
-                "question": f"How can you practice {topic}?",
-                "options": [
-                    "A) By doing simple exercises and examples",
-                    "B) By avoiding all practice",
-                    "C) Only through theoretical study",
-                    "D) It cannot be practiced"
-                ],
-                "correct_answer": "A"
+                "week": 2,
+                "focus": "Practice and Application",
+                "activities": [
+                    "Work through example problems",
+                    "Explain {topic} to someone else in your own words",
+                    "Take practice quizzes",
+                    "Review and summarize what you've learned"
+                ]
             }
         ],
-        "intermediate": [
-            {
-                "question": f"What are the key mechanisms involved in {topic}?",
-                "options": [
-                    "A) Simple one-step processes",
-                    "B) Complex interactions between multiple components",
-                    "C) No mechanisms are involved",
-                    "D) Only theoretical concepts"
-                ],
-                "correct_answer": "B"
-            },
+        "resources": [
+            "Khan Academy or similar educational platforms",
+            "YouTube educational channels",
+            "Beginner-level textbooks or online courses",
+            "Study groups or online forums"
+        ],
+        "milestones": [
+            "- **Week 1:** Can define key terms and explain basic concepts",
+            "- **Week 2:** Can solve simple problems and explain to others"
+        ]
+    },
+    "intermediate": {
+        "duration": "3-4 weeks",
+        "weeks": [
             {
-                "question": f"How does {topic} relate to other concepts in the field?",
-                "options": [
-                    "A) It exists in complete isolation",
-                    "B) It connects to and influences related concepts",
-                    "C) It has no relationship to anything else",
-                    "D) Only beginners need to know connections"
-                ],
-                "correct_answer": "B"
+                "week": 1,
+                "focus": "Core Concepts Review",
+                "activities": [
+                    "Review fundamental principles of {topic}",
+                    "Identify knowledge gaps from beginner level",
+                    "Read intermediate-level materials",
+                    "Create concept maps showing relationships"
+                ]
             },
             {
-                "question": f"What is a practical application of {topic}?",
-                "options": [
-                    "A) It has no real-world applications",
-                    "B) It solves problems and creates solutions in various fields",
-                    "C) Only theoretical exercises",
-                    "D) Applications are unknown"
-                ],
-                "correct_answer": "B"
+                "week": 2,
+                "focus": "Deep Dive into Mechanisms",
+                "activities": [
+                    "Study how {topic} works in detail",
+                    "Analyze case studies and examples",
+                    "Practice problem-solving with moderate difficulty",
+                    "Connect concepts to real-world applications"
+                ]
             },
             {
-                "question": f"What level of understanding is needed to work with {topic}?",
-                "options": [
-                    "A) Only memorization is required",
-                    "B) Deep conceptual understanding and analytical skills",
-                    "C) No understanding is necessary",
-                    "D) Basic awareness is sufficient"
-                ],
-                "correct_answer": "B"
+                "week": 3,
+                "focus": "Application and Integration",
+                "activities": [
+                    "Work on projects or practical exercises",
+                    "Explore how {topic} relates to other concepts",
+                    "Participate in discussions or study groups",
+                    "Complete comprehensive practice problems"
+                ]
             },
             {
-                "question": f"How would you explain {topic} to someone else?",
-                "options": [
-                    "A) By using technical jargon only",
-                    "B) By breaking it down into understandable parts with examples",
-                    "C) It cannot be explained",
-                    "D) By avoiding all details"
-                ],
-                "correct_answer": "B"
+                "week": 4,
+                "focus": "Assessment and Mastery",
+                "activities": [
+                    "Take practice tests",
+                    "Review challenging areas",
+                    "Teach the concept to others",
+                    "Prepare summary notes for future reference"
+                ]
             }
         ],
-        "advanced": [
+        "resources": [
+            "University-level textbooks",
+            "Academic journals (introductory articles)",
+            "Online courses (Coursera, edX)",
+            "Professional forums and communities"
+        ],
+        "milestones": [
+            "- **Week 2:** Can explain mechanisms and processes in detail",
+            "- **Week 3:** Can apply concepts to real-world scenarios",
+            "- **Week 4:** Can teach the topic and solve complex problems"
+        ]
+    },
+    "advanced": {
+        "duration": "4-6 weeks",
+        "weeks": [
+            {
+                "week": 1,
+                "focus": "Theoretical Foundations",
+                "activities": [
+                    "Study the theoretical framework of {topic}",
+                    "Review seminal papers and research",
+                    "Analyze mathematical or conceptual models",
+                    "Identify current debates in the field"
+                ]
+            },
             {
-                "question": f"What are the theoretical foundations of {topic}?",
-                "options": [
-                    "A) There are no theoretical foundations",
-                    "B) Complex principles and established research frameworks",
-                    "C) Only practical observations",
-                    "D) Simple assumptions"
-                ],
-                "correct_answer": "B"
+                "week": 2,
+                "focus": "Advanced Mechanisms",
+                "activities": [
+                    "Deep dive into complex processes",
+                    "Study advanced methodologies",
+                    "Analyze research papers critically",
+                    "Explore interdisciplinary connections"
+                ]
             },
             {
-                "question": f"How does current research approach {topic}?",
-                "options": [
-                    "A) Research has concluded on this topic",
-                    "B) Through interdisciplinary methods and advanced analysis",
-                    "C) Only through basic observation",
-                    "D) Research ignores this topic"
-                ],
-                "correct_answer": "B"
+                "week": 3,
+                "focus": "Research and Analysis",
+                "activities": [
+                    "Conduct literature review",
+                    "Identify gaps in current understanding of {topic}",
+                    "Design hypothetical experiments or studies",
+                    "Engage with cutting-edge research"
+                ]
             },
             {
-                "question": f"What are the limitations of current understanding of {topic}?",
-                "options": [
-                    "A) Everything is fully understood",
-                    "B) There are ongoing debates and areas requiring further investigation",
-                    "C) No limitations exist",
-                    "D) The topic is too simple to have limitations"
-                ],
-                "correct_answer": "B"
+                "week": 4,
+                "focus": "Synthesis and Application",
+                "activities": [
+                    "Work on advanced projects or research",
+                    "Apply concepts to novel problems",
+                    "Collaborate with peers or mentors",
+                    "Present findings or insights"
+                ]
             },
             {
-                "question": f"How can {topic} be applied to solve complex problems?",
-                "options": [
-                    "A) It cannot solve complex problems",
-                    "B) Through systematic analysis and integration with other advanced concepts",
-                    "C) Only through guesswork",
-                    "D) Simple application is sufficient"
-                ],
-                "correct_answer": "B"
+                "week": 5,
+                "focus": "Critical Evaluation",
+                "activities": [
+                    "Critique existing research and theories",
+                    "Develop original perspectives",
+                    "Write comprehensive analysis papers",
+                    "Participate in academic discussions"
+                ]
             },
             {
-                "question": f"What future developments are expected in {topic}?",
-                "options": [
-                    "A) No future developments are anticipated",
-                    "B) Continued research and technological advances will expand understanding",
-                    "C) The field is stagnant",
-                    "D) Future developments are impossible"
-                ],
-                "correct_answer": "B"
+                "week": 6,
+                "focus": "Mastery and Future Directions",
+                "activities": [
+                    "Complete comprehensive assessment",
+                    "Identify areas for continued study",
+                    "Explore career or research opportunities",
+                    "Contribute to the field (publications, projects)"
+                ]
             }
+        ],
+        "resources": [
+            "Advanced textbooks and monographs",
+            "Peer-reviewed academic journals",
+            "Research databases (PubMed, IEEE, arXiv)",
+            "Academic conferences and seminars",
+            "Mentorship from experts in the field"
+        ],
+        "milestones": [
+            "- **Week 2:** Can analyze and critique research papers",
+            "- **Week 4:** Can design original research or projects",
+            "- **Week 6:** Can contribute original insights to the field"
         ]
     }
+}
+
+
+def _compile_quiz_templates(templates: Dict) -> Dict[str, Tuple[QuizQuestion, ...]]:
+    """Freeze quiz templates into QuizQuestion records whose question still has its {topic} slot."""
+    return {
+        level_key: tuple(QuizQuestion.from_mapping(q) for q in questions)
+        for level_key, questions in templates.items()
+    }
+
+
+def _compile_study_plan(plan_data: Dict, milestones: List[str]) -> Tuple[str, ...]:
+    """Assemble one level's study plan into format-string sections (header, weeks, resources, milestones)."""
+    sections = [
+        "# 📅 {level} Study Plan for {topic}\n\n"
+        f"**Duration:** {plan_data['duration']}\n\n"
+        "---\n\n"
+    ]
+    
+    # Week-by-week breakdown
+    for week in (StudyWeek.from_mapping(week_data) for week_data in plan_data["weeks"]):
+        parts = [f"## Week {week.week}: {week.focus}\n\n"]
+        for activity in week.activities:
+            parts.append(f"- {activity}\n")
+        parts.append("\n")
+        sections.append("".join(parts))
+    
+    # Resources
+    parts = ["---\n\n", "## 📚 Recommended Resources\n\n"]
+    for resource in plan_data["resources"]:
+        parts.append(f"- {resource}\n")
+    sections.append("".join(parts))
     
+    # Assessment milestones
+    parts = ["\n---\n\n", "## ✅ Assessment Milestones\n\n"]
+    for milestone in milestones:
+        parts.append(f"{milestone}\n")
+    sections.append("".join(parts))
+    
+    return tuple(sections)
+
+
+# Compiled once per process; generators only fill in the topic slots
+_COMPILED_QUIZ = _compile_quiz_templates(QUIZ_TEMPLATES)
+_COMPILED_STUDY_PLAN_SECTIONS = {
+    level_key: _compile_study_plan(plan_data, plan_data["milestones"])
+    for level_key, plan_data in STUDY_PLAN_TEMPLATES.items()
+}
+# Unknown levels have always used the beginner plan with the advanced milestones
+_COMPILED_FALLBACK_STUDY_PLAN_SECTIONS = _compile_study_plan(
+    STUDY_PLAN_TEMPLATES["beginner"], STUDY_PLAN_TEMPLATES["advanced"]["milestones"]
+)
+_COMPILED_STUDY_PLANS = {
+    level_key: "".join(sections) for level_key, sections in _COMPILED_STUDY_PLAN_SECTIONS.items()
+}
+_COMPILED_FALLBACK_STUDY_PLAN = "".join(_COMPILED_FALLBACK_STUDY_PLAN_SECTIONS)
+
+
+def generate_explanation(topic: str, level: str) -> str:
+    """
+    Generate a rule-based explanation using templates.
+    
+    Args:
+        topic: The learning topic to explain
+        level: Learning level (Beginner, Intermediate, Advanced)
+    
+    Returns:
+        A formatted explanation suitable for the specified level
+    """
+    return "".join(stream_explanation(topic, level))
+
+
+def stream_explanation(topic: str, level: str) -> Iterator[str]:
+    """
+    Generate the explanation in chunks: introduction, definition, each key point and conclusion.
+    
+    Args:
+        topic: The learning topic to explain
+        level: Learning level (Beginner, Intermediate, Advanced)
+    
+    Yields:
+        Markdown chunks that concatenate to generate_explanation's output
+    """
+    data = get_topic_data(topic, level)
     level_key = level.lower()
-    return templates.get(level_key, templates["beginner"])
+    
+    intro = EXPLANATION_INTROS.get(level_key, EXPLANATION_INTROS["beginner"])
+    conclusion = EXPLANATION_CONCLUSIONS.get(level_key, EXPLANATION_CONCLUSIONS["advanced"])
+    
+    yield intro.format(topic=topic) + "\n\n"
+    yield f"**Definition:** {data['definition']}\n\n**Key Concepts:**\n"
+    for i, point in enumerate(data["key_points"], 1):
+        yield f"{i}. {point}\n"
+    yield conclusion.format(topic=topic, topic_capitalized=topic.capitalize())
+
+
+def generate_quiz(topic: str, level: str, seed: Optional[Union[int, str]] = None,
+                  num_questions: int = 5) -> List[QuizQuestion]:
+    """
+    Generate rule-based quiz questions using templates.
+    
+    Args:
+        topic: The learning topic for the quiz
+        level: Learning level (Beginner, Intermediate, Advanced)
+        seed: Per-student seed drawing questions from the question bank with
+            shuffled options; None gives the fixed legacy quiz
+        num_questions: Number of questions (the bank gives at most one per facet)
+    
+    Returns:
+        List of QuizQuestion records (read like dictionaries with question,
+        options and correct_answer); option tuples are shared, not copied
+    """
+    return list(stream_quiz(topic, level, seed, num_questions))
+
+
+def max_quiz_questions(level: str, seed: Optional[Union[int, str]] = None) -> int:
+    """Most questions generate_quiz can give: the legacy quiz's length, or one per question bank facet."""
+    if seed is None:
+        return len(_COMPILED_QUIZ.get(level.lower(), _COMPILED_QUIZ["beginner"]))
+    return question_bank.max_questions(level.lower())
 
 
 def generate_study_plan(topic: str, level: str) -> str:
@@ -315,217 +712,728 @@ def generate_study_plan(topic: str, level: str) -> str:
     Returns:
         A formatted study plan with timeline and milestones
     """
+    template = _COMPILED_STUDY_PLANS.get(level.lower(), _COMPILED_FALLBACK_STUDY_PLAN)
+    return template.format(topic=topic, level=level.capitalize())
+
+
+def stream_quiz(topic: str, level: str, seed: Optional[Union[int, str]] = None,
+                num_questions: int = 5) -> Iterator[QuizQuestion]:
+    """
+    Generate quiz questions one at a time.
     
-    # Duration and structure by level
-    plans = {
-        "beginner": {
-            "duration": "2 weeks",
-            "weeks": [
-                {
-                    "week": 1,
-                    "focus": "Understanding Basics",
-                    "activities": [
-                        f"Learn the definition and purpose of {topic}",
-                        "Watch introductory videos or read beginner-friendly articles",
-                        "Create flashcards for key terms",
-                        "Complete simple practice exercises"
-                    ]
-                },
-                {
-                    "week": 2,
-                    "focus": "Practice and Application",
-                    "activities": [
-                        "Work through example problems",
-                        f"Explain {topic} to someone else in your own words",
-                        "Take practice quizzes",
-                        "Review and summarize what you've learned"
-                    ]
-                }
-            ],
-            "resources": [
-                "Khan Academy or similar educational platforms",
-                "YouTube educational channels",
-                "Beginner-level textbooks or online courses",
-                "Study groups or online forums"
-            ]
-        },
-        "intermediate": {
-            "duration": "3-4 weeks",
-            "weeks": [
-                {
-                    "week": 1,
-                    "focus": "Core Concepts Review",
-                    "activities": [
-                        f"Review fundamental principles of {topic}",
-                        "Identify knowledge gaps from beginner level",
-                        "Read intermediate-level materials",
-                        "Create concept maps showing relationships"
-                    ]
-                },
-                {
-                    "week": 2,
-                    "focus": "Deep Dive into Mechanisms",
-                    "activities": [
-                        f"Study how {topic} works in detail",
-                        "Analyze case studies and examples",
-                        "Practice problem-solving with moderate difficulty",
-                        "Connect concepts to real-world applications"
-                    ]
-                },
-                {
-                    "week": 3,
-                    "focus": "Application and Integration",
-                    "activities": [
-                        "Work on projects or practical exercises",
-                        f"Explore how {topic} relates to other concepts",
-                        "Participate in discussions or study groups",
-                        "Complete comprehensive practice problems"
-                    ]
-                },
-                {
-                    "week": 4,
-                    "focus": "Assessment and Mastery",
-                    "activities": [
-                        "Take practice tests",
-                        "Review challenging areas",
-                        "Teach the concept to others",
-                        "Prepare summary notes for future reference"
-                    ]
-                }
-            ],
-            "resources": [
-                "University-level textbooks",
-                "Academic journals (introductory articles)",
-                "Online courses (Coursera, edX)",
-                "Professional forums and communities"
-            ]
-        },
-        "advanced": {
-            "duration": "4-6 weeks",
-            "weeks": [
-                {
-                    "week": 1,
-                    "focus": "Theoretical Foundations",
-                    "activities": [
-                        f"Study the theoretical framework of {topic}",
-                        "Review seminal papers and research",
-                        "Analyze mathematical or conceptual models",
-                        "Identify current debates in the field"
-                    ]
-                },
-                {
-                    "week": 2,
-                    "focus": "Advanced Mechanisms",
-                    "activities": [
-                        "Deep dive into complex processes",
-                        "Study advanced methodologies",
-                        "Analyze research papers critically",
-                        "Explore interdisciplinary connections"
-                    ]
-                },
-                {
-                    "week": 3,
-                    "focus": "Research and Analysis",
-                    "activities": [
-                        "Conduct literature review",
-                        f"Identify gaps in current understanding of {topic}",
-                        "Design hypothetical experiments or studies",
-                        "Engage with cutting-edge research"
-                    ]
-                },
-                {
-                    "week": 4,
-                    "focus": "Synthesis and Application",
-                    "activities": [
-                        "Work on advanced projects or research",
-                        "Apply concepts to novel problems",
-                        "Collaborate with peers or mentors",
-                        "Present findings or insights"
-                    ]
-                },
-                {
-                    "week": 5,
-                    "focus": "Critical Evaluation",
-                    "activities": [
-                        "Critique existing research and theories",
-                        "Develop original perspectives",
-                        "Write comprehensive analysis papers",
-                        "Participate in academic discussions"
-                    ]
-                },
-                {
-                    "week": 6,
-                    "focus": "Mastery and Future Directions",
-                    "activities": [
-                        "Complete comprehensive assessment",
-                        "Identify areas for continued study",
-                        "Explore career or research opportunities",
-                        "Contribute to the field (publications, projects)"
-                    ]
-                }
-            ],
-            "resources": [
-                "Advanced textbooks and monographs",
-                "Peer-reviewed academic journals",
-                "Research databases (PubMed, IEEE, arXiv)",
-                "Academic conferences and seminars",
-                "Mentorship from experts in the field"
+    Args:
+        topic: The learning topic for the quiz
+        level: Learning level (Beginner, Intermediate, Advanced)
+        seed: Per-student seed for a question bank draw (None gives the legacy quiz)
+        num_questions: Number of questions
+    
+    Yields:
+        QuizQuestion records, in the same order as generate_quiz
+    """
+    if seed is None:
+        questions = _COMPILED_QUIZ.get(level.lower(), _COMPILED_QUIZ["beginner"])
+        for q in questions[:num_questions]:
+            yield QuizQuestion(q.question.format(topic=topic), q.options, q.correct_answer)
+        return
+    for question, options, correct_answer in question_bank.sample(level.lower(), num_questions, seed):
+        yield QuizQuestion(question.format(topic=topic), options, correct_answer)
+
+
+def stream_study_plan(topic: str, level: str) -> Iterator[str]:
+    """
+    Generate the study plan incrementally: header, each week, resources and milestones.
+    
+    Args:
+        topic: The learning topic
+        level: Learning level (Beginner, Intermediate, Advanced)
+    
+    Yields:
+        Markdown sections that concatenate to generate_study_plan's output
+    """
+    sections = _COMPILED_STUDY_PLAN_SECTIONS.get(level.lower(), _COMPILED_FALLBACK_STUDY_PLAN_SECTIONS)
+    level_title = level.capitalize()
+    for section in sections:
+        yield section.format(topic=topic, level=level_title)
+
+
+# The cached quiz section is generate_quiz's default draw
+SECTION_QUIZ_QUESTIONS = 5
+
+
+def content_skeleton(topic: str, level: str, section: str) -> ContentSkeleton:
+    """
+    Split one section of a pair's content into its topic-independent skeleton.
+    
+    Rendering the skeleton with ``substitutions(topic, level)`` gives exactly
+    what the section's generator returns. Pairs that only differ in the topic
+    as typed, or that fall back to the same entry, share one skeleton (and
+    digest); the study plan and quiz skeletons depend on the level alone.
+    
+    Args:
+        topic: The learning topic
+        level: Learning level (Beginner, Intermediate, Advanced)
+        section: One of SECTIONS
+    
+    Returns:
+        ContentSkeleton whose digest identifies the shared part
+    """
+    level_key = level.lower()
+    if section != "explanation":
+        return _level_skeleton(section, level_key)
+    data = get_topic_data(topic, level)
+    parts = [
+        EXPLANATION_INTROS.get(level_key, EXPLANATION_INTROS["beginner"]),
+        "\n\n**Definition:** ", escape_template(data["definition"]), "\n\n**Key Concepts:**\n"
+    ]
+    for i, point in enumerate(data["key_points"], 1):
+        parts.append(f"{i}. {escape_template(point)}\n")
+    parts.append(EXPLANATION_CONCLUSIONS.get(level_key, EXPLANATION_CONCLUSIONS["advanced"]))
+    return ContentSkeleton(section, "".join(parts))
+
+
+@lru_cache(maxsize=64)
+def _level_skeleton(section: str, level_key: str) -> ContentSkeleton:
+    if section == "quiz":
+        questions = _COMPILED_QUIZ.get(level_key, _COMPILED_QUIZ["beginner"])
+        return ContentSkeleton(section, questions[:SECTION_QUIZ_QUESTIONS])
+    if section == "study_plan":
+        return ContentSkeleton(section, _COMPILED_STUDY_PLANS.get(level_key, _COMPILED_FALLBACK_STUDY_PLAN))
+    raise KeyError(section)
+
+
+class ContentCache:
+    """
+    Thread-safe LRU cache for generated content.
+    
+    Entries are keyed by ``(topic_key, level_key, topic)``: the topic and level
+    normalized the same way ``get_topic_data`` does, plus the topic as typed,
+    because the rendered text echoes it back verbatim. Each entry may also
+    record the TopicMatch it was generated from, so changes to one knowledge
+    base topic invalidate exactly the entries built on it.
+    """
+    
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._sources: Dict[Tuple[str, str, str], Optional[TopicMatch]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Tuple[str, str, str]):
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: Tuple[str, str, str], value, source: Optional[TopicMatch] = None) -> None:
+        """Store value under key (generated from source), evicting least recently used entries."""
+        with self._lock:
+            if self.maxsize <= 0:
+                return
+            self._entries[key] = value
+            self._sources[key] = source
+            self._entries.move_to_end(key)
+            self._evict()
+    
+    def invalidate(self, topic: Optional[str] = None, level: Optional[str] = None) -> int:
+        """
+        Drop cached entries matching topic and/or level.
+        
+        Args:
+            topic: Topic to invalidate (normalized like ``get_topic_data``); None matches all
+            level: Level to invalidate; None matches all
+        
+        Returns:
+            Number of entries removed
+        """
+        topic_key = topic.lower().strip() if topic is not None else None
+        level_key = level.lower() if level is not None else None
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if (topic_key is None or key[0] == topic_key)
+                and (level_key is None or key[1] == level_key)
             ]
-        }
+            for key in stale:
+                del self._entries[key]
+                del self._sources[key]
+            return len(stale)
+    
+    def invalidate_topics(self, topic_keys: FrozenSet[str], unmatched: bool = False) -> int:
+        """
+        Drop entries generated from some knowledge base topics.
+        
+        Args:
+            topic_keys: Knowledge base keys whose content changed
+            unmatched: Also drop entries that did not resolve to a topic exactly
+                (alias and fuzzy matches and the default template), whose resolution may
+                change when topics or aliases are added or removed
+        
+        Returns:
+            Number of entries removed
+        """
+        def is_stale(source: Optional[TopicMatch]) -> bool:
+            # Entries without a recorded source are dropped to be safe
+            return source is None or source.key in topic_keys or (unmatched and not source.exact)
+        
+        with self._lock:
+            stale = [key for key, source in self._sources.items() if is_stale(source)]
+            for key in stale:
+                del self._entries[key]
+                del self._sources[key]
+            return len(stale)
+    
+    def resize(self, maxsize: int) -> None:
+        """Change the maximum number of entries, evicting if necessary."""
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+    
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and eviction counters along with the current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize
+            }
+    
+    def _evict(self) -> None:
+        while len(self._entries) > max(self.maxsize, 0):
+            key, _ = self._entries.popitem(last=False)
+            del self._sources[key]
+            self.evictions += 1
+
+
+# Shared result cache for generate_all_content (EDUASSIST_CACHE_SIZE=0 disables it)
+content_cache = ContentCache(maxsize=int(os.environ.get("EDUASSIST_CACHE_SIZE", "256")))
+
+
+def _content_cache_key(topic: str, level: str) -> Tuple[str, str, str]:
+    # level.capitalize() is the only other use of level, so its lowercase form suffices
+    return (topic.lower().strip(), level.lower(), topic)
+
+
+# Optional host-wide tier under content_cache, shared by every worker process
+# (see shared_cache.py). Rows are namespaced by the code that generated them.
+CONTENT_SOURCE_MODULES = ("backend.py", "question_bank.py", "records.py", "topic_index.py", "content_hash.py")
+SHARED_CACHE_PATH = os.environ.get("EDUASSIST_SHARED_CACHE")
+shared_cache = SharedContentCache(
+    SHARED_CACHE_PATH,
+    max_bytes=int(float(os.environ.get("EDUASSIST_SHARED_CACHE_MB", "64")) * 2 ** 20),
+    namespace=source_fingerprint(CONTENT_SOURCE_MODULES) or ""
+) if SHARED_CACHE_PATH else None
+
+
+def _content_stamp(match: TopicMatch) -> str:
+    """Identify the knowledge base content a pair is generated from, across processes."""
+    digest = ""
+    if knowledge_source is not None:
+        digest = knowledge_source.current.digests.get(match.key, "")
+    return f"{match.key}@{digest}"
+
+
+# Content sections, in the order they are stored in a cache entry: a list
+# with one slot per section (None until generated), each filled slot an
+# immutable value that is safe to share
+SECTIONS = ("explanation", "quiz", "study_plan")
+_SECTION_INDEX = {section: index for index, section in enumerate(SECTIONS)}
+
+
+def _thaw_content(frozen: Iterable) -> Dict[str, any]:
+    """Rebuild a fresh, caller-owned content dictionary from a complete entry."""
+    explanation, quiz, study_plan = frozen
+    # QuizQuestion records are immutable, so only the containers need copying
+    return {
+        'explanation': explanation,
+        'quiz': list(quiz),
+        'study_plan': study_plan
+    }
+
+
+def get_content_cache_stats() -> Dict[str, int]:
+    """
+    Return hit/miss/eviction statistics for the content cache, the calls
+    coalesced into identical in-flight generations (``coalesced_``), and the
+    shared tier (prefixed ``shared_``).
+    """
+    stats = content_cache.stats()
+    stats.update(_coalescing_stats())
+    if shared_cache is not None:
+        stats.update({f"shared_{name}": value for name, value in shared_cache.stats().items()})
+    return stats
+
+
+def invalidate_content_cache(topic: Optional[str] = None, level: Optional[str] = None) -> int:
+    """Invalidate cached content for a topic and/or level (all entries by default), in both tiers."""
+    if shared_cache is not None:
+        shared_cache.invalidate(
+            topic.lower().strip() if topic is not None else None,
+            level.lower() if level is not None else None
+        )
+    return content_cache.invalidate(topic, level)
+
+
+def _on_knowledge_change(change: KnowledgeChange) -> None:
+    """Invalidate cached content built on the topics a knowledge source reload changed."""
+    removed = content_cache.invalidate_topics(change.topics, unmatched=change.names_changed)
+    # Stale shared rows are already ignored through their stamps; this reclaims their space
+    if shared_cache is not None:
+        shared_cache.invalidate_topics(change.topics, unmatched=change.names_changed)
+    metrics.inc("eduassist_knowledge_reloads_total")
+    metrics.inc("eduassist_knowledge_invalidations_total", value=removed)
+
+
+if knowledge_source is not None:
+    knowledge_source.on_change = _on_knowledge_change
+    knowledge_source.watch(float(os.environ.get("EDUASSIST_KB_POLL_INTERVAL", KnowledgeSource.POLL_INTERVAL)))
+
+
+# Content cache statistics that only ever grow, exported as counters
+_CACHE_COUNTERS = ("hits", "misses", "evictions", "coalesced_content", "coalesced_sections")
+
+
+def render_metrics() -> str:
+    """Return instrumentation and content cache statistics in Prometheus text format."""
+    stats = content_cache.stats()
+    stats.update(_coalescing_stats())
+    return metrics.render_prometheus(
+        {f"eduassist_content_cache_{name}": value for name, value in stats.items() if name not in _CACHE_COUNTERS},
+        {f"eduassist_content_cache_{name}_total": stats[name] for name in _CACHE_COUNTERS}
+    )
+
+
+# Whole-section generators and streams, by section name
+_SECTION_GENERATORS = {
+    "explanation": generate_explanation,
+    "quiz": lambda topic, level: tuple(generate_quiz(topic, level)),
+    "study_plan": generate_study_plan
+}
+_SECTION_STREAMS = {
+    "explanation": stream_explanation,
+    "quiz": stream_quiz,
+    "study_plan": stream_study_plan
+}
+
+# Content generator backend (see content_backends.py). The rule-based
+# generators above are the default, and the fallback for any section another
+# backend does not deliver within its deadline.
+rule_based_backend = RuleBasedBackend(_SECTION_GENERATORS)
+content_backend = create_backend(
+    os.environ.get("EDUASSIST_BACKEND", "rules"),
+    rule_based_backend,
+    latency=float(os.environ.get("EDUASSIST_BACKEND_LATENCY", "1.0")),
+    jitter=float(os.environ.get("EDUASSIST_BACKEND_JITTER", "0"))
+)
+
+# Seconds a section may take from a non-rule-based backend
+SECTION_DEADLINES = {section: float(os.environ.get("EDUASSIST_SECTION_DEADLINE", "2.0")) for section in SECTIONS}
+
+
+def set_content_backend(backend: ContentBackend) -> None:
+    """Switch the backend generate_all_content uses; content already cached is kept."""
+    global content_backend
+    content_backend = backend
+
+
+def _content_entry(topic: str, level: str) -> list:
+    """Return the cache entry for a pair, adding an empty one on a miss."""
+    key = _content_cache_key(topic, level)
+    entry = content_cache.get(key)
+    metrics.inc("eduassist_requests_total", operation="generate_all_content",
+                cache="miss" if entry is None else "hit")
+    if entry is None:
+        match = resolve_topic(topic)
+        entry = None
+        if shared_cache is not None:
+            entry = shared_cache.get(key, _content_stamp(match))
+        if entry is None:
+            entry = [None] * len(SECTIONS)
+        content_cache.put(key, entry, match)
+    return entry
+
+
+def _share_section(topic: str, level: str, index: int, value, stamp: Optional[Tuple[TopicMatch, str]]) -> None:
+    """Publish a generated section's skeleton to the shared tier (stamp taken before generating it)."""
+    if shared_cache is None or stamp is None:
+        return
+    section = SECTIONS[index]
+    skeleton = content_skeleton(topic, level, section)
+    # Only share what the skeleton reproduces; a knowledge reload may have changed the entry meanwhile
+    if section_digest(section, skeleton.render(substitutions(topic, level))) == section_digest(section, value):
+        shared_cache.put(_content_cache_key(topic, level), index, skeleton, stamp[1], stamp[0])
+
+
+def _section_stamp(topic: str) -> Optional[Tuple[TopicMatch, str]]:
+    # Taken before generating, so content racing a knowledge reload is at worst a later miss
+    if shared_cache is None:
+        return None
+    match = resolve_topic(topic)
+    return match, _content_stamp(match)
+
+
+# Identical generations running at once (a class opening the same topic
+# together) are computed once and shared; see single_flight.py. Keys are
+# content cache keys, plus the section index for lazily filled sections.
+content_flights = SingleFlight()
+section_flights = SingleFlight()
+
+
+def _coalescing_stats() -> Dict[str, int]:
+    return {
+        "coalesced_content": content_flights.coalesced,
+        "coalesced_sections": section_flights.coalesced
     }
+
+
+def _fill_section(topic: str, level: str, entry: list, index: int):
+    """Generate one section into its entry slot and return it, joining an identical generation in flight."""
+    return section_flights.do(
+        _content_cache_key(topic, level) + (index,),
+        lambda: _generate_section(topic, level, entry, index)
+    )
+
+
+def _generate_section(topic: str, level: str, entry: list, index: int):
+    # The flight this caller missed may have landed between its check and its join
+    if entry[index] is not None:
+        return entry[index]
+    section = SECTIONS[index]
+    stamp = _section_stamp(topic)
+    with metrics.stage(section):
+        value = _SECTION_GENERATORS[section](topic, level)
+    entry[index] = value
+    _share_section(topic, level, index, value, stamp)
+    return value
+
+
+# Digests of cached section values, keyed by identity with the value kept
+# alive alongside (as in _TOPIC_ENTRIES); cleared once it outgrows the cache
+_SECTION_DIGESTS: Dict[int, Tuple[object, str]] = {}
+
+
+class LazyContent(Mapping):
+    """
+    Content for one (topic, level) pair, generated section by section.
     
-    level_key = level.lower()
-    plan_data = plans.get(level_key, plans["beginner"])
+    Reads like the dictionary ``generate_all_content`` used to return
+    (``content['quiz']``, ``dict(content)``), but a section is only generated
+    the first time it is accessed. Generated sections are memoized in the
+    shared cache entry, so later requests for the pair reuse them.
+    """
     
-    # Build study plan
-    study_plan = f"# 📅 {level.capitalize()} Study Plan for {topic}\n\n"
-    study_plan += f"**Duration:** {plan_data['duration']}\n\n"
-    study_plan += "---\n\n"
+    __slots__ = ("topic", "level", "_entry")
     
-    # Week-by-week breakdown
-    for week_data in plan_data["weeks"]:
-        study_plan += f"## Week {week_data['week']}: {week_data['focus']}\n\n"
-        for activity in week_data['activities']:
-            study_plan += f"- {activity}\n"
-        study_plan += "\n"
+    def __init__(self, topic: str, level: str, entry: list):
+        self.topic = topic
+        self.level = level
+        self._entry = entry
     
-    # Resources
-    study_plan += "---\n\n"
-    study_plan += "## 📚 Recommended Resources\n\n"
-    for resource in plan_data['resources']:
-        study_plan += f"- {resource}\n"
+    def __getitem__(self, section: str):
+        index = _SECTION_INDEX[section]
+        value = self._entry[index]
+        if value is None:
+            value = _fill_section(self.topic, self.level, self._entry, index)
+        # Hand out a fresh list so callers may modify it freely
+        return list(value) if section == "quiz" else value
     
-    # Assessment milestones
-    study_plan += "\n---\n\n"
-    study_plan += "## ✅ Assessment Milestones\n\n"
-    if level_key == "beginner":
-        study_plan += "- **Week 1:** Can define key terms and explain basic concepts\n"
-        study_plan += "- **Week 2:** Can solve simple problems and explain to others\n"
-    elif level_key == "intermediate":
-        study_plan += "- **Week 2:** Can explain mechanisms and processes in detail\n"
-        study_plan += "- **Week 3:** Can apply concepts to real-world scenarios\n"
-        study_plan += "- **Week 4:** Can teach the topic and solve complex problems\n"
-    else:
-        study_plan += "- **Week 2:** Can analyze and critique research papers\n"
-        study_plan += "- **Week 4:** Can design original research or projects\n"
-        study_plan += "- **Week 6:** Can contribute original insights to the field\n"
+    def __iter__(self) -> Iterator[str]:
+        return iter(SECTIONS)
+    
+    def __len__(self) -> int:
+        return len(SECTIONS)
+    
+    def __repr__(self) -> str:
+        ready = [section for section in SECTIONS if self.is_ready(section)]
+        return f"LazyContent(topic={self.topic!r}, level={self.level!r}, ready={ready})"
+    
+    def is_ready(self, section: str) -> bool:
+        """Whether a section has already been generated."""
+        return self._entry[_SECTION_INDEX[section]] is not None
+    
+    def digest(self, section: str) -> str:
+        """Stable content hash of a section (generating it if needed), e.g. for an ETag."""
+        index = _SECTION_INDEX[section]
+        value = self._entry[index]
+        if value is None:
+            value = _fill_section(self.topic, self.level, self._entry, index)
+        cached = _SECTION_DIGESTS.get(id(value))
+        if cached is not None and cached[0] is value:
+            return cached[1]
+        digest = section_digest(section, value)
+        if len(_SECTION_DIGESTS) >= 4 * len(SECTIONS) * max(content_cache.maxsize, 1):
+            _SECTION_DIGESTS.clear()
+        _SECTION_DIGESTS[id(value)] = (value, digest)
+        return digest
     
-    return study_plan
+    def skeleton(self, section: str) -> ContentSkeleton:
+        """The section's topic-independent skeleton; see content_skeleton."""
+        return content_skeleton(self.topic, self.level, section)
+    
+    def stream(self, section: str) -> Union[str, List[QuizQuestion], Iterator]:
+        """
+        Return a generated section, or a stream of it if it is not ready yet.
+        
+        Args:
+            section: One of SECTIONS
+        
+        Returns:
+            The finished value when already generated; otherwise a stream of
+            it, whose output is memoized once it is exhausted. Only one caller
+            streams a section at a time; concurrent streams of it wait for
+            that one and yield its finished value.
+        """
+        if self.is_ready(section):
+            return self[section]
+        return self._stream(section)
+    
+    def _stream(self, section: str) -> Iterator:
+        index = _SECTION_INDEX[section]
+        key = _content_cache_key(self.topic, self.level) + (index,)
+        # The flight is taken once iteration starts, so a stream that is never read holds nothing
+        if not section_flights.lead(key):
+            yield from _section_chunks(section, self[section])
+            return
+        value = self._entry[index]
+        if value is not None:
+            # The previous flight landed between the readiness check and this one
+            section_flights.land(key, value)
+            yield from _section_chunks(section, value)
+            return
+        stamp = _section_stamp(self.topic)
+        chunks = []
+        stream = _SECTION_STREAMS[section](self.topic, self.level)
+        try:
+            try:
+                for chunk in stream:
+                    chunks.append(chunk)
+                    yield chunk
+            except GeneratorExit:
+                # Abandoned (e.g. the page reran); other callers wait for the whole section
+                chunks.extend(stream)
+        except BaseException as e:
+            section_flights.land(key, exception=e)
+            raise
+        value = self._entry[index] = tuple(chunks) if section == "quiz" else "".join(chunks)
+        section_flights.land(key, value)
+        _share_section(self.topic, self.level, index, value, stamp)
+
 
+def _section_chunks(section: str, value) -> Iterator:
+    # A finished section as stream chunks: the quiz question by question, text in one piece
+    return iter(value) if section == "quiz" else iter((value,))
 
-def generate_all_content(topic: str, level: str) -> Dict[str, any]:
+
+def generate_all_content(topic: str, level: str) -> LazyContent:
     """
-    Generate all educational content using rule-based logic.
+    Generate all educational content for a topic and level.
+    
+    With the rule-based backend, sections are generated on first access and
+    memoized in ``content_cache``, so callers only pay for the sections they
+    actually read. Any other backend is asked for every missing section at
+    once (see generate_all_content_async). Concurrent calls for the same
+    pair share one generation instead of each starting their own.
     
     Args:
         topic: The learning topic
         level: Learning level (Beginner, Intermediate, Advanced)
     
     Returns:
-        Dictionary containing explanation, quiz, and study plan
+        LazyContent mapping with explanation, quiz, and study plan
     """
-    return {
-        'explanation': generate_explanation(topic, level),
-        'quiz': generate_quiz(topic, level),
-        'study_plan': generate_study_plan(topic, level)
-    }
+    entry = _content_entry(topic, level)
+    if content_backend.rule_based or all(value is not None for value in entry):
+        return LazyContent(topic, level, entry)
+    return content_flights.do(
+        _content_cache_key(topic, level),
+        lambda: asyncio.run_coroutine_threadsafe(_fan_out(topic, level, entry), _backend_loop()).result()
+    )
+
+
+async def generate_all_content_async(topic: str, level: str) -> LazyContent:
+    """
+    Generate all educational content, awaiting a non-rule-based backend.
+    
+    The missing sections are requested concurrently, each under its
+    SECTION_DEADLINES entry. A section that misses its deadline or fails is
+    replaced with the rule-based output for this request only; a late answer
+    is still cached when it arrives. Calls for a pair already being
+    generated, from any thread or event loop, await that generation.
+    
+    Args:
+        topic: The learning topic
+        level: Learning level (Beginner, Intermediate, Advanced)
+    
+    Returns:
+        LazyContent mapping with every section ready (lazy with the rule-based backend)
+    """
+    entry = _content_entry(topic, level)
+    if content_backend.rule_based or all(value is not None for value in entry):
+        return LazyContent(topic, level, entry)
+    return await content_flights.do_async(_content_cache_key(topic, level), lambda: _fan_out(topic, level, entry))
+
+
+_loop_lock = threading.Lock()
+_loop: Optional[Tuple[int, asyncio.AbstractEventLoop]] = None
+
+
+def _backend_loop() -> asyncio.AbstractEventLoop:
+    """Event loop running backend calls for synchronous callers, one per process."""
+    global _loop
+    with _loop_lock:
+        # Threads do not survive a fork, so pool workers start their own
+        if _loop is None or _loop[0] != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="eduassist-backend-loop", daemon=True).start()
+            _loop = (os.getpid(), loop)
+        return _loop[1]
+
+
+async def _fan_out(topic: str, level: str, entry: list) -> LazyContent:
+    missing = [index for index, value in enumerate(entry) if value is None]
+    stamp = _section_stamp(topic)
+    values = await asyncio.gather(*(_backend_section(topic, level, entry, index, stamp) for index in missing))
+    # Fallbacks only go into this request's view, so later requests ask the backend again
+    view = list(entry)
+    for index, value in zip(missing, values):
+        view[index] = value
+    return LazyContent(topic, level, view)
+
+
+async def _backend_section(topic: str, level: str, entry: list, index: int,
+                           stamp: Optional[Tuple[TopicMatch, str]]) -> Any:
+    """One section from the backend, or the rule-based one if it is late or invalid."""
+    section = SECTIONS[index]
+    task = asyncio.ensure_future(content_backend.generate(section, topic, level))
+    task.add_done_callback(lambda done: _store_backend_section(topic, level, entry, index, done, stamp))
+    try:
+        with metrics.stage(section):
+            # Shielded, so a late answer keeps coming and is cached by the callback
+            return _normalize_section(section, await asyncio.wait_for(asyncio.shield(task), SECTION_DEADLINES[section]))
+    except asyncio.TimeoutError:
+        reason = "deadline"
+    except Exception:
+        reason = "error"
+    metrics.inc("eduassist_section_fallbacks_total", section=section, reason=reason)
+    return _SECTION_GENERATORS[section](topic, level)
+
+
+def _store_backend_section(topic: str, level: str, entry: list, index: int, task: asyncio.Future,
+                           stamp: Optional[Tuple[TopicMatch, str]]) -> None:
+    """Memoize a backend's section in its cache entry when it arrives, on time or not."""
+    if task.cancelled() or task.exception() is not None:
+        return
+    try:
+        value = _normalize_section(SECTIONS[index], task.result())
+    except (KeyError, TypeError, ValueError):
+        return
+    if entry[index] is None:
+        entry[index] = value
+        _share_section(topic, level, index, value, stamp)
+
+
+def _normalize_section(section: str, value: Any) -> Any:
+    """Validate a backend's section and convert it to its cache entry form."""
+    if section == "quiz":
+        quiz = tuple(QuizQuestion.from_mapping(q) for q in value)
+        if not quiz:
+            raise ValueError("the quiz has no questions")
+        return quiz
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"{section} must be non-empty text")
+    return value
+
+
+def _generate_frozen(topic: str, level: str) -> tuple:
+    """Return every section of a pair's content, generating any that are missing."""
+    if not content_backend.rule_based:
+        return tuple(generate_all_content(topic, level)._entry)
+    entry = _content_entry(topic, level)
+    for index, value in enumerate(entry):
+        if value is None:
+            _fill_section(topic, level, entry, index)
+    return tuple(entry)
+
+
+# Batches with fewer unique pairs than this are generated in-process
+BATCH_PARALLEL_THRESHOLD = 64
+
+
+def _generate_pair(pair: Tuple[str, str]) -> tuple:
+    """Process-pool worker: generate one pair in its immutable cache form."""
+    return _generate_frozen(*pair)
+
+
+def iter_all_content_batch(pairs: Iterable[Tuple[str, str]],
+                           workers: Optional[int] = None) -> Iterator[Dict[str, any]]:
+    """
+    Generate content for many (topic, level) pairs, yielding results in input order.
+    
+    Identical pairs (after cache-key normalization) are generated once. Large
+    batches are fanned out over a process pool; each result is yielded as soon
+    as it and everything before it is ready.
+    
+    Args:
+        pairs: Iterable of (topic, level) tuples
+        workers: Number of worker processes (None uses every core, 1 disables the pool)
+    
+    Yields:
+        A fresh, fully generated content dictionary per input pair
+    """
+    pairs = list(pairs)
+    
+    # Deduplicate, remembering which unique job each input position maps to
+    unique = {}
+    jobs = []
+    order = []
+    for topic, level in pairs:
+        key = _content_cache_key(topic, level)
+        if key not in unique:
+            unique[key] = len(jobs)
+            jobs.append((topic, level))
+        order.append(unique[key])
+    
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) < BATCH_PARALLEL_THRESHOLD:
+        results = map(_generate_pair, jobs)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        chunksize = max(1, len(jobs) // (workers * 4))
+        results = pool.map(_generate_pair, jobs, chunksize=chunksize)
+    
+    try:
+        done = []
+        for index in order:
+            while len(done) <= index:
+                done.append(next(results))
+            yield _thaw_content(done[index])
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def generate_all_content_batch(pairs: Iterable[Tuple[str, str]], workers: Optional[int] = None,
+                               stream: bool = False) -> Union[List[Dict[str, any]], Iterator[Dict[str, any]]]:
+    """
+    Generate all educational content for a whole cohort or syllabus at once.
+    
+    Args:
+        pairs: Iterable of (topic, level) tuples
+        workers: Number of worker processes (None uses every core, 1 disables the pool)
+        stream: Return a lazy iterator instead of a list
+    
+    Returns:
+        Content dictionaries in the same order as pairs
+    """
+    results = iter_all_content_batch(pairs, workers)
+    return results if stream else list(results)
@@ -0,0 +1,558 @@
+"""
+EduAssist AI - Benchmark Suite
+Reproducible latency/allocation benchmarks for the backend and the Streamlit page
+
+Run with:
+    python benchmark.py                          # all suites, print results
+    python benchmark.py --quick                  # smaller scaling runs
+    python benchmark.py --suite micro,app        # pick suites (micro, scaling, memory, scoring, startup, app, load)
+    python benchmark.py --save baseline.json     # record a baseline
+    python benchmark.py --compare baseline.json  # flag regressions (exit code 1)
+    python benchmark.py --suite startup --import-budget-ms 150   # fail slow cold starts
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import backend
+from admission import AdmissionController, AdmissionRejected, admission_controller
+from content_backends import SimulatedBackend
+from fragments import quiz_html
+from knowledge_store import KnowledgeStore, build_store
+from records import TopicEntry
+from scoring import ScoringEngine, quiz_answer_key
+from search_index import SearchIndex
+from topic_index import TopicIndex
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+SCALING_SIZES = [10, 100, 1_000, 10_000, 100_000]
+QUICK_SCALING_SIZES = [10, 100, 1_000, 10_000]
+MEMORY_SIZES = [1_000, 10_000]
+QUICK_MEMORY_SIZES = [1_000]
+SCORING_SUBMISSIONS = 100_000
+STARTUP_MODULES = ["backend", "service", "export"]
+STARTUP_RUNS = 7
+QUICK_STARTUP_RUNS = 3
+# Default import budget (milliseconds, median of fresh interpreters) per startup module
+IMPORT_BUDGET_MS = 200
+LOAD_SESSIONS = 300
+QUICK_LOAD_SESSIONS = 100
+# CPU seconds one page run costs besides generation (Streamlit running the script, building deltas)
+LOAD_PAGE_SECONDS = 0.02
+LEVELS = ["Beginner", "Intermediate", "Advanced"]
+
+# Vocabulary for synthetic topic names
+_WORDS = [
+    "cell", "biology", "quantum", "mechanics", "organic", "chemistry", "world", "war",
+    "history", "ancient", "egypt", "linear", "algebra", "calculus", "statistics", "python",
+    "programming", "machine", "learning", "web", "development", "genetics", "evolution",
+    "climate", "change", "plate", "tectonics", "respiration", "thermodynamics", "optics",
+    "electricity", "magnetism", "geometry", "probability", "economics", "literature",
+    "poetry", "grammar", "music", "theory", "renaissance", "revolution", "industrial",
+    "roman", "empire", "molecular", "ecology", "nutrition", "anatomy", "astronomy"
+]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def measure(fn: Callable[[], object], repeat: int = 1000, warmup: int = 50) -> Dict[str, float]:
+    """
+    Time fn and measure its allocations.
+
+    Args:
+        fn: Zero-argument callable to benchmark
+        repeat: Number of timed calls
+        warmup: Untimed calls made first
+
+    Returns:
+        Latency percentiles in microseconds, plus tracemalloc figures for one call:
+        peak bytes allocated and blocks still held by its result
+    """
+    for _ in range(warmup):
+        fn()
+
+    gc.disable()
+    try:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    timings.sort()
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    del result
+
+    return {
+        "p50_us": round(percentile(timings, 0.50) * 1e6, 3),
+        "p95_us": round(percentile(timings, 0.95) * 1e6, 3),
+        "p99_us": round(percentile(timings, 0.99) * 1e6, 3),
+        "mean_us": round(statistics.fmean(timings) * 1e6, 3),
+        "peak_bytes": peak - baseline,
+        "retained_blocks": retained
+    }
+
+
+def retained_bytes(build: Callable[[], object]) -> int:
+    """Bytes still allocated, according to tracemalloc, while build's result is held."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        held = build()
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del held
+    return after - before
+
+
+def synthetic_topics(count: int, seed: int = 42) -> List[str]:
+    """Generate count distinct, deterministic topic names."""
+    rng = random.Random(seed)
+    topics = set()
+    while len(topics) < count:
+        topics.add(" ".join(rng.sample(_WORDS, rng.randint(2, 3))) + f" {rng.randint(1, 999)}")
+    return sorted(topics)
+
+
+def synthetic_knowledge_base(topics: List[str]) -> Dict:
+    """Build a KNOWLEDGE_BASE-shaped dict over the given topic names."""
+    levels = backend.KNOWLEDGE_BASE["default"]
+    knowledge_base = {topic: levels for topic in topics}
+    knowledge_base["default"] = levels
+    return knowledge_base
+
+
+def misspell(topic: str, rng: random.Random) -> str:
+    """Replace one character so the topic needs a fuzzy match."""
+    chars = list(topic)
+    chars[rng.randrange(len(chars))] = "x"
+    return "".join(chars)
+
+
+@contextmanager
+def patched_backend(knowledge_base: Dict, index: TopicIndex, store: Optional[KnowledgeStore] = None) -> Iterator[None]:
+    """Temporarily swap backend's knowledge base, topic index and store."""
+    saved = backend.KNOWLEDGE_BASE, backend.topic_index, backend.knowledge_store
+    backend.KNOWLEDGE_BASE, backend.topic_index, backend.knowledge_store = knowledge_base, index, store
+    backend.invalidate_content_cache()
+    try:
+        yield
+    finally:
+        backend.KNOWLEDGE_BASE, backend.topic_index, backend.knowledge_store = saved
+        backend.invalidate_content_cache()
+
+
+@contextmanager
+def cache_disabled() -> Iterator[None]:
+    """Run with the content cache disabled so every call does the full work."""
+    maxsize = backend.content_cache.maxsize
+    backend.content_cache.resize(0)
+    try:
+        yield
+    finally:
+        backend.content_cache.resize(maxsize)
+
+
+def run_micro(repeat: int) -> Dict[str, Dict]:
+    """Microbenchmarks for topic lookup, each generator and generate_all_content."""
+    results = {}
+    topic, level = "Photosynthesis", "Intermediate"
+    results["get_topic_data.exact"] = measure(lambda: backend.get_topic_data(topic, level), repeat)
+    results["get_topic_data.fuzzy"] = measure(lambda: backend.get_topic_data("photosynthsis", level), repeat)
+    results["get_topic_data.default"] = measure(lambda: backend.get_topic_data("World War II", level), repeat)
+    results["generate_explanation"] = measure(lambda: backend.generate_explanation(topic, level), repeat)
+    results["generate_quiz"] = measure(lambda: backend.generate_quiz(topic, level), repeat)
+    seeds = iter(range(sys.maxsize))
+    results["generate_quiz.seeded"] = measure(lambda: backend.generate_quiz(topic, level, next(seeds)), repeat)
+    results["generate_study_plan"] = measure(lambda: backend.generate_study_plan(topic, level), repeat)
+    # generate_all_content is lazy: dict() forces every section, ["explanation"] just the first
+    with cache_disabled():
+        results["generate_all_content.cold"] = measure(lambda: dict(backend.generate_all_content(topic, level)), repeat)
+        results["generate_all_content.cold_explanation_only"] = measure(
+            lambda: backend.generate_all_content(topic, level)["explanation"], repeat)
+    dict(backend.generate_all_content(topic, level))
+    results["generate_all_content.cached"] = measure(lambda: dict(backend.generate_all_content(topic, level)), repeat)
+    # What a conditional fetch costs instead of serializing the content
+    content = backend.generate_all_content(topic, level)
+    results["content.digest"] = measure(lambda: [content.digest(section) for section in backend.SECTIONS], repeat)
+    results["content_skeleton.explanation"] = measure(
+        lambda: backend.content_skeleton(topic, level, "explanation"), repeat)
+    # Overhead of the concurrent fan-out itself, with a backend that answers at once
+    previous = backend.content_backend
+    backend.set_content_backend(SimulatedBackend(backend.rule_based_backend, latency=0))
+    try:
+        with cache_disabled():
+            results["generate_all_content.fan_out"] = measure(
+                lambda: backend.generate_all_content(topic, level), repeat)
+    finally:
+        backend.set_content_backend(previous)
+    return results
+
+
+def run_scaling(sizes: List[int], repeat: int) -> Dict[str, Dict]:
+    """Topic lookup and generation over synthetic knowledge bases of growing size."""
+    results = {}
+    rng = random.Random(7)
+    for size in sizes:
+        topics = synthetic_topics(size)
+        knowledge_base = synthetic_knowledge_base(topics)
+
+        start = time.perf_counter()
+        index = TopicIndex.build(topics, threshold=backend.TOPIC_MATCH_THRESHOLD)
+        results[f"scaling.{size}.index_build"] = {"total_ms": round((time.perf_counter() - start) * 1e3, 3)}
+        start = time.perf_counter()
+        search = SearchIndex.build(knowledge_base)
+        results[f"scaling.{size}.search_build"] = {"total_ms": round((time.perf_counter() - start) * 1e3, 3)}
+
+        probes = [rng.choice(topics) for _ in range(64)]
+        typos = [misspell(topic, rng) for topic in probes]
+        # Search as typed so far: whole words plus a partial last word
+        partials = [topic[:max(2, len(topic) - 3)] for topic in probes]
+        cycle = iter(range(sys.maxsize))
+        with patched_backend(knowledge_base, index), cache_disabled():
+            results[f"scaling.{size}.get_topic_data.exact"] = measure(
+                lambda: backend.get_topic_data(probes[next(cycle) % 64], "Beginner"), repeat)
+            results[f"scaling.{size}.get_topic_data.fuzzy"] = measure(
+                lambda: backend.get_topic_data(typos[next(cycle) % 64], "Beginner"), repeat)
+            results[f"scaling.{size}.generate_all_content"] = measure(
+                lambda: dict(backend.generate_all_content(probes[next(cycle) % 64], "Advanced")), repeat)
+        results[f"scaling.{size}.search"] = measure(
+            lambda: search.search(partials[next(cycle) % 64]), max(repeat // 10, 20), warmup=5)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "knowledge.sqlite")
+            start = time.perf_counter()
+            build_store(path, knowledge_base)
+            results[f"scaling.{size}.store_build"] = {"total_ms": round((time.perf_counter() - start) * 1e3, 3)}
+            store = KnowledgeStore(path, cache_size=0)
+            results[f"scaling.{size}.store.get"] = measure(
+                lambda: store.get(probes[next(cycle) % 64], "beginner"), repeat)
+            results[f"scaling.{size}.store.fuzzy"] = measure(
+                lambda: store.lookup(typos[next(cycle) % 64]), max(repeat // 10, 20), warmup=5)
+            results[f"scaling.{size}.store.search"] = measure(
+                lambda: store.search(partials[next(cycle) % 64]), max(repeat // 10, 20), warmup=5)
+    return results
+
+
+def run_memory(sizes: List[int]) -> Dict[str, Dict]:
+    """
+    Memory held by batch quiz output and knowledge base entries, as legacy
+    plain dicts of lists versus QuizQuestion / TopicEntry records.
+    """
+    results = {}
+    for size in sizes:
+        topics = synthetic_topics(size)
+        pairs = [(topic, level) for topic in topics for level in LEVELS]
+        # Legacy shape: a fresh dict and options list per question
+        quiz_dicts = retained_bytes(lambda: [
+            [q.to_dict() for q in backend.generate_quiz(topic, level)] for topic, level in pairs
+        ])
+        quiz_records = retained_bytes(lambda: [backend.generate_quiz(topic, level) for topic, level in pairs])
+
+        # Entries loaded from JSON, as from a disk source, so repeated text is not shared
+        source = json.dumps(synthetic_knowledge_base(topics))
+        kb_dicts = retained_bytes(lambda: json.loads(source))
+        kb_records = retained_bytes(lambda: {
+            topic: {level: TopicEntry.from_mapping(data) for level, data in levels.items()}
+            for topic, levels in json.loads(source).items()
+        })
+
+        for name, legacy, compact in (("quiz", quiz_dicts, quiz_records), ("kb", kb_dicts, kb_records)):
+            results[f"memory.{size}.{name}.dicts"] = {"retained_bytes": legacy}
+            results[f"memory.{size}.{name}.records"] = {
+                "retained_bytes": compact,
+                "saving_pct": round((1 - compact / legacy) * 100, 1)
+            }
+    return results
+
+
+def run_scoring(submissions: int) -> Dict[str, Dict]:
+    """Grade a district-sized quiz sitting, from letter lists as the JSON service receives them."""
+    rng = random.Random(11)
+    key = quiz_answer_key(backend.generate_quiz("Photosynthesis", "Beginner"))
+    responses = [[rng.choice("ABCD") for _ in key] for _ in range(submissions)]
+    return {
+        f"scoring.grade.{submissions}": measure(
+            lambda: ScoringEngine().score("benchmark", responses, key), repeat=5, warmup=1)
+    }
+
+
+def import_time_ms(module: str) -> float:
+    """Time to import a module in a fresh interpreter."""
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(APP_PATH),
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.split()[-1]) * 1e3
+
+
+def run_startup(runs: int) -> Dict[str, Dict]:
+    """Cold import time of each entry point."""
+    results = {}
+    for module in STARTUP_MODULES:
+        samples = sorted(import_time_ms(module) for _ in range(runs))
+        results[f"startup.{module}"] = {"p50_ms": round(statistics.median(samples), 3), "max_ms": round(samples[-1], 3)}
+    return results
+
+
+def check_import_budget(results: Dict[str, Dict], budget_ms: float) -> List[str]:
+    """Entry points whose median cold import exceeds the budget."""
+    return [
+        f"{name}: {result['p50_ms']} ms > {budget_ms} ms"
+        for name, result in sorted(results.items())
+        if name.startswith("startup.") and result["p50_ms"] > budget_ms
+    ]
+
+
+def run_app(repeat: int) -> Dict[str, Dict]:
+    """Time full app.py script runs headlessly with Streamlit's AppTest."""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        print("Skipping app suite: streamlit.testing is not available", file=sys.stderr)
+        return {}
+
+    def first_load():
+        AppTest.from_file(APP_PATH, default_timeout=30).run()
+
+    generated = AppTest.from_file(APP_PATH, default_timeout=30).run()
+    generated.text_input[0].input("Photosynthesis")
+    generated.button[0].click().run()
+
+    runs = max(repeat // 100, 5)
+    return {
+        "app.first_load": measure(first_load, runs, warmup=1),
+        "app.rerun_with_content": measure(lambda: generated.run(), runs, warmup=1)
+    }
+
+
+def simulate_sessions(controller: AdmissionController, sessions: int, clicks: int = 1,
+                      page_seconds: float = LOAD_PAGE_SECONDS) -> Dict[str, float]:
+    """
+    Have every session press Generate at the same moment, as a class does.
+
+    Each session is a thread doing what app.py does for a click: take an
+    admission ticket, wait for its turn, generate a topic's content with the
+    content cache off, render the quiz block, then burn page_seconds of CPU
+    time for the rest of the page run.
+
+    Args:
+        controller: Admission controller the sessions go through
+        sessions: Concurrent sessions
+        clicks: Clicks per session, back to back
+        page_seconds: CPU seconds per page run on top of generation
+
+    Returns:
+        Click latency and queue wait percentiles (ms), the slowest first
+        response (ms), wall time, and the controller's counts
+    """
+    topics = sorted(backend.KNOWLEDGE_BASE)
+    burst = []
+    # Clicks are timed from the burst, so time spent waiting for the GIL counts too
+    barrier = threading.Barrier(sessions, action=lambda: burst.append(time.perf_counter()))
+    lock = threading.Lock()
+    latencies, waits, first_responses = [], [], []
+
+    def page(topic: str, level: str) -> None:
+        content = backend.generate_all_content(topic, level)
+        quiz_html(content["quiz"], reveal=False)
+        dict(content)
+        end = time.thread_time() + page_seconds
+        while time.thread_time() < end:
+            pass
+
+    def session(number: int) -> None:
+        rng = random.Random(number)
+        topic, level = rng.choice(topics), rng.choice(LEVELS)
+        barrier.wait()
+        for click in range(clicks):
+            start = burst[0] if click == 0 else time.perf_counter()
+            try:
+                ticket = controller.submit(number)
+            except AdmissionRejected:
+                continue
+            # What the page can show at once: content is on its way, or the queue position
+            first_response = time.perf_counter() - start
+            ticket.wait()
+            waited = time.perf_counter() - start
+            try:
+                page(topic, level)
+            finally:
+                ticket.release()
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                waits.append(waited)
+                first_responses.append(first_response)
+
+    threads = [threading.Thread(target=session, args=(number,)) for number in range(sessions)]
+    start = time.perf_counter()
+    with cache_disabled():
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    waits.sort()
+    stats = controller.stats()
+    return {
+        "latency_p50_ms": round(percentile(latencies, 0.5) * 1e3, 3),
+        "latency_p95_ms": round(percentile(latencies, 0.95) * 1e3, 3),
+        "queue_p50_ms": round(percentile(waits, 0.5) * 1e3, 3),
+        "queue_p95_ms": round(percentile(waits, 0.95) * 1e3, 3),
+        "first_response_max_ms": round(max(first_responses) * 1e3, 3),
+        "wall_ms": round(wall * 1e3, 3),
+        **{name: stats[name] for name in ("admitted", "queued", "rate_limited", "rejected")}
+    }
+
+
+def run_load(sessions: int) -> Dict[str, Dict]:
+    """
+    Local load generator: a burst of sessions with and without admission control.
+
+    Without a limit every session's page runs at once and all of them finish
+    late together; with the configured admission controller most finish far
+    sooner. The last run has each session click repeatedly to hit its rate limit.
+    """
+    limits = dict(max_concurrent=admission_controller.max_concurrent, max_queue=admission_controller.max_queue)
+    return {
+        f"load.{sessions}.unlimited": simulate_sessions(
+            AdmissionController(max_concurrent=sessions, max_queue=0, rate=0), sessions),
+        f"load.{sessions}.admission": simulate_sessions(AdmissionController(**limits, rate=0), sessions),
+        # Only the counts matter here, so pages cost generation alone
+        f"load.{sessions}.repeat_clicks": simulate_sessions(
+            AdmissionController(**limits, rate=admission_controller.rate, burst=admission_controller.burst),
+            sessions, clicks=int(admission_controller.burst) + 2, page_seconds=0)
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """
+    Compare results against a baseline.
+
+    Args:
+        results: Current benchmark results
+        baseline: Results loaded from a baseline file
+        threshold: Allowed relative slowdown, e.g. 0.25 for 25%
+
+    Returns:
+        Human-readable descriptions of every regression
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ("p50_us", "p95_us", "p50_ms", "total_ms", "peak_bytes", "retained_bytes"):
+            if metric not in current or not previous.get(metric):
+                continue
+            change = current[metric] / previous[metric] - 1
+            if change > threshold:
+                regressions.append(
+                    f"{name} {metric}: {previous[metric]} -> {current[metric]} (+{change:.0%})"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="EduAssist AI benchmark suite")
+    parser.add_argument("--suite", default="micro,scaling,memory,scoring,startup,app",
+                        help="Comma-separated suites: micro, scaling, memory, scoring, startup, app, load")
+    parser.add_argument("--repeat", type=int, default=1000, help="Timed calls per microbenchmark")
+    parser.add_argument("--quick", action="store_true", help="Smaller scaling, memory and load runs")
+    parser.add_argument("--save", metavar="PATH", help="Write results to a JSON baseline file")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a JSON baseline file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown that counts as a regression")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS,
+                        help="Fail when an entry point's median cold import exceeds this (startup suite)")
+    args = parser.parse_args(argv)
+
+    suites = {name.strip() for name in args.suite.split(",")}
+    results = {}
+    if "micro" in suites:
+        results.update(run_micro(args.repeat))
+    if "scaling" in suites:
+        results.update(run_scaling(QUICK_SCALING_SIZES if args.quick else SCALING_SIZES, args.repeat))
+    if "memory" in suites:
+        results.update(run_memory(QUICK_MEMORY_SIZES if args.quick else MEMORY_SIZES))
+    if "scoring" in suites:
+        results.update(run_scoring(SCORING_SUBMISSIONS // 10 if args.quick else SCORING_SUBMISSIONS))
+    if "startup" in suites:
+        results.update(run_startup(QUICK_STARTUP_RUNS if args.quick else STARTUP_RUNS))
+    if "app" in suites:
+        results.update(run_app(args.repeat))
+    if "load" in suites:
+        results.update(run_load(QUICK_LOAD_SESSIONS if args.quick else LOAD_SESSIONS))
+
+    for name, metrics in results.items():
+        print(f"{name:48s} " + "  ".join(f"{key}={value}" for key, value in metrics.items()))
+
+    if args.save:
+        report = {
+            "meta": {
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat
+            },
+            "results": results
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nSaved {len(results)} results to {args.save}")
+
+    over_budget = check_import_budget(results, args.import_budget_ms)
+    if over_budget:
+        print(f"\n{len(over_budget)} import(s) over the {args.import_budget_ms} ms budget:")
+        for line in over_budget:
+            print(f"  {line}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+EduAssist AI - Content Generator Backends
+The interface every content generator implements, so a slower model-based
+generator can be plugged in behind the same sections the rule-based
+templates produce
+
+A backend is asynchronous: generate_all_content (backend.py) asks it for all
+three sections at once and waits for each one until its deadline. A section
+that is late, fails or returns something malformed is replaced with the
+rule-based output for that request. A late answer still lands in the content
+cache when it arrives, so later requests for the pair get it.
+
+Select a backend with EDUASSIST_BACKEND:
+    rules       The built-in templates (default; no event loop involved)
+    simulated   A local stand-in that answers with the templates after a delay,
+                EDUASSIST_BACKEND_LATENCY seconds (plus up to
+                EDUASSIST_BACKEND_JITTER), for exercising deadlines and fallback
+"""
+
+from typing import Any, Callable, Dict, Optional
+import abc
+import asyncio
+import random
+
+
+class ContentBackend(abc.ABC):
+    """
+    Produces the explanation, quiz and study plan for a (topic, level) pair.
+
+    Subclasses implement the three coroutines; each returns the same shape
+    as the matching rule-based generator (markdown text, or a sequence of
+    quiz questions as QuizQuestion records or mappings).
+    """
+
+    name = "backend"
+    rule_based = False      # True only for the built-in templates, which run synchronously
+
+    @abc.abstractmethod
+    async def explanation(self, topic: str, level: str) -> str:
+        """Markdown explanation of the topic at the level."""
+
+    @abc.abstractmethod
+    async def quiz(self, topic: str, level: str) -> Any:
+        """Quiz questions, as QuizQuestion records or mappings."""
+
+    @abc.abstractmethod
+    async def study_plan(self, topic: str, level: str) -> str:
+        """Markdown study plan."""
+
+    async def generate(self, section: str, topic: str, level: str) -> Any:
+        """Produce one section by name (explanation, quiz or study_plan)."""
+        return await getattr(self, section)(topic, level)
+
+
+class RuleBasedBackend(ContentBackend):
+    """The built-in template generators, exposed through the backend interface."""
+
+    name = "rules"
+    rule_based = True
+
+    def __init__(self, generators: Dict[str, Callable[[str, str], Any]]):
+        self.generators = generators
+
+    async def explanation(self, topic: str, level: str) -> str:
+        return self.generators["explanation"](topic, level)
+
+    async def quiz(self, topic: str, level: str) -> Any:
+        return self.generators["quiz"](topic, level)
+
+    async def study_plan(self, topic: str, level: str) -> str:
+        return self.generators["study_plan"](topic, level)
+
+
+class SimulatedBackend(ContentBackend):
+    """
+    Local stand-in for a slow model-based backend.
+
+    Answers with another backend's output after a configurable delay, so
+    deadlines and fallback can be tested without a network.
+    """
+
+    name = "simulated"
+
+    def __init__(self, inner: ContentBackend, latency: float = 1.0, jitter: float = 0.0,
+                 latencies: Optional[Dict[str, float]] = None, seed: Optional[int] = None):
+        """
+        Args:
+            inner: Backend whose output is returned
+            latency: Seconds before each section is returned
+            jitter: Extra random delay of up to this many seconds
+            latencies: Per-section latency overrides
+            seed: Seed for the jitter
+        """
+        self.inner = inner
+        self.latency = latency
+        self.jitter = jitter
+        self.latencies = latencies or {}
+        self._random = random.Random(seed)
+
+    async def _delayed(self, section: str, topic: str, level: str) -> Any:
+        delay = self.latencies.get(section, self.latency)
+        if self.jitter:
+            delay += self._random.uniform(0, self.jitter)
+        await asyncio.sleep(delay)
+        return await self.inner.generate(section, topic, level)
+
+    async def explanation(self, topic: str, level: str) -> str:
+        return await self._delayed("explanation", topic, level)
+
+    async def quiz(self, topic: str, level: str) -> Any:
+        return await self._delayed("quiz", topic, level)
+
+    async def study_plan(self, topic: str, level: str) -> str:
+        return await self._delayed("study_plan", topic, level)
+
+
+def create_backend(name: str, rules: RuleBasedBackend, latency: float = 1.0, jitter: float = 0.0) -> ContentBackend:
+    """
+    Build the backend selected by name.
+
+    Args:
+        name: "rules" or "simulated"
+        rules: The rule-based backend (returned for "rules", wrapped by "simulated")
+        latency: Simulated backend delay in seconds
+        jitter: Simulated backend extra random delay in seconds
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if name == "rules":
+        return rules
+    if name == "simulated":
+        return SimulatedBackend(rules, latency, jitter)
+    raise ValueError(f"Unknown content backend '{name}' (expected 'rules' or 'simulated')")
@@ -0,0 +1,130 @@
+"""
+EduAssist AI - Content Hashes and Skeletons
+Stable content hashes for generated sections, and the split of a section
+into a topic-independent skeleton plus a small per-topic substitution
+
+A section's digest is a hash of its canonical encoding, so it identifies the
+content itself: equal sections have equal digests in every process, which
+is what ETags and deduplicated storage need.
+
+Most of a section does not depend on the topic as typed. The study plan and
+the fixed quiz only depend on the level, and so does the explanation of every
+topic that falls back to the default entry. A skeleton is that shared part,
+a format template with {topic}, {topic_capitalized} and {level} slots, and
+substitutions() gives the values for one request. Skeletons are
+content-addressed by their own digest, so they are stored and sent once.
+"""
+
+from typing import Any, Dict, Iterable, Optional
+import hashlib
+import json
+import os
+
+from records import QuizQuestion, to_json_compatible
+
+
+QUIZ = "quiz"   # The only section that is not text
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def encode_section(section: str, value: Any) -> bytes:
+    """Canonical compact JSON for a section value (text, or a sequence of QuizQuestion records)."""
+    if section == QUIZ:
+        value = [[q.question, list(q.options), q.correct_answer] for q in value]
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_section(section: str, data: bytes) -> Any:
+    """Inverse of encode_section; the quiz comes back as a tuple of QuizQuestion records."""
+    value = json.loads(data)
+    if section == QUIZ:
+        return tuple(QuizQuestion.create(question, options, answer) for question, options, answer in value)
+    return value
+
+
+def content_digest(data: bytes) -> str:
+    """Hex digest identifying some encoded content."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def section_digest(section: str, value: Any) -> str:
+    """Stable content hash of one generated section."""
+    return content_digest(encode_section(section, value))
+
+
+def combine_digests(digests: Iterable[str]) -> str:
+    """Digest of several digests in order, e.g. for the whole content of a pair."""
+    return content_digest(",".join(digests).encode("ascii"))
+
+
+def source_fingerprint(modules: Iterable[str]) -> Optional[str]:
+    """Digest of the source of some of this package's modules, or None if one cannot be read."""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in modules:
+        try:
+            with open(os.path.join(_HERE, name), "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            return None
+    return digest.hexdigest()
+
+
+def substitutions(topic: str, level: str) -> Dict[str, str]:
+    """Values for a skeleton's slots, as the generators fill them in."""
+    return {"topic": topic, "topic_capitalized": topic.capitalize(), "level": level.capitalize()}
+
+
+def escape_template(text: str) -> str:
+    """Quote literal braces in knowledge base text placed inside a template."""
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+class ContentSkeleton:
+    """
+    The topic-independent part of one section.
+
+    ``template`` is a format string for text sections, or a tuple of
+    QuizQuestion records whose questions are format strings.
+    """
+
+    __slots__ = ("section", "template", "digest", "_data")
+
+    def __init__(self, section: str, template: Any, data: Optional[bytes] = None):
+        self.section = section
+        self.template = template
+        self._data = encode_section(section, template) if data is None else data
+        self.digest = content_digest(self._data)
+
+    @classmethod
+    def decode(cls, section: str, data: bytes) -> "ContentSkeleton":
+        """Rebuild a skeleton from encode()'s output."""
+        return cls(section, decode_section(section, data), data)
+
+    def encode(self) -> bytes:
+        """Canonical encoding, the content this skeleton's digest is computed over."""
+        return self._data
+
+    def render(self, values: Dict[str, str]) -> Any:
+        """
+        Fill in the slots for one request.
+
+        Args:
+            values: Slot values from substitutions()
+
+        Returns:
+            The section value the matching generator returns (a tuple for the quiz)
+        """
+        if self.section == QUIZ:
+            return tuple(QuizQuestion(q.question.format(**values), q.options, q.correct_answer)
+                         for q in self.template)
+        return self.template.format(**values)
+
+    def to_json(self) -> Dict[str, Any]:
+        """JSON-serializable form for clients that assemble sections themselves."""
+        template = self.template
+        if self.section == QUIZ:
+            template = [to_json_compatible(q) for q in template]
+        return {"section": self.section, "digest": self.digest, "template": template}
+
+    def __repr__(self) -> str:
+        return f"ContentSkeleton(section={self.section!r}, digest={self.digest!r})"
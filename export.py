@@ -0,0 +1,300 @@
+"""
+EduAssist AI - Static Export
+Pre-renders every knowledge base topic at every level to Markdown, JSON
+and HTML, plus a manifest with content hashes, so the output can be served
+from a CDN or an offline school server without Python
+
+Run with:
+    python export.py dist/ [--workers 4] [--force]
+
+Re-runs only re-render entries whose source data or templates changed.
+"""
+
+from html import escape
+from typing import Dict, Iterable, List, Optional
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+import backend
+from content_hash import source_fingerprint
+from fragments import quiz_html
+from records import to_json_compatible
+
+
+LEVELS = ["Beginner", "Intermediate", "Advanced"]
+FORMATS = ("md", "json", "html")
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1  # Bump when the manifest format changes
+# Modules whose code shapes the pages: the renderers below, the quiz block and record serialization
+RENDERER_MODULES = ("export.py", "fragments.py", "records.py")
+
+HTML_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title} - EduAssist AI</title>
+<style>
+body {{ font-family: system-ui, sans-serif; color: #1F2933; max-width: 48rem; margin: 2rem auto; padding: 0 1rem; line-height: 1.6; }}
+h1, h3 {{ color: #0F62FE; }}
+hr {{ border: 0; border-top: 1px solid #E5E7EB; margin: 2rem 0; }}
+.quiz-question {{ padding: 1rem; border-left: 4px solid #0F62FE; margin: 1rem 0; background: #E8F0FE; border-radius: 8px; }}
+details summary {{ cursor: pointer; font-weight: 600; }}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+def slugify(topic: str) -> str:
+    """File-system and URL safe name for a topic."""
+    return re.sub(r"[^0-9a-z]+", "-", topic.lower()).strip("-") or "topic"
+
+
+def _hash(data) -> str:
+    if not isinstance(data, bytes):
+        data = json.dumps(data, sort_keys=True, ensure_ascii=False, default=to_json_compatible).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def template_hash() -> str:
+    """Fingerprint of every template and renderer that shapes the generated output."""
+    return _hash([
+        backend.EXPLANATION_INTROS,
+        backend.EXPLANATION_CONCLUSIONS,
+        backend.QUIZ_TEMPLATES,
+        backend.STUDY_PLAN_TEMPLATES,
+        MANIFEST_VERSION,
+        # Unreadable sources cannot vouch for earlier pages, so everything is re-rendered
+        source_fingerprint(RENDERER_MODULES) or os.urandom(16).hex()
+    ])
+
+
+def _output_path(output_dir: str, relative: str) -> Optional[str]:
+    """Absolute path of a manifest entry, or None if it points outside output_dir."""
+    root = os.path.realpath(output_dir)
+    path = os.path.realpath(os.path.join(root, relative))
+    return path if path != root and os.path.commonpath([root, path]) == root else None
+
+
+def export_topics() -> List[str]:
+    """
+    Every topic key the app can serve, except the default template: the
+    built-in knowledge base, the knowledge store and the hot-reloaded
+    knowledge source.
+    """
+    topics = dict.fromkeys(key for key in backend.KNOWLEDGE_BASE if key != "default")
+    if backend.knowledge_store is not None:
+        topics.update(dict.fromkeys(key for key in backend.knowledge_store.topics() if key != "default"))
+    if backend.knowledge_source is not None:
+        topics.update(dict.fromkeys(key for key in backend.knowledge_source.current.topics if key != "default"))
+    return list(topics)
+
+
+def topic_slugs(topics: Iterable[str]) -> Dict[str, str]:
+    """
+    Directory name of each topic's pages.
+
+    Raises:
+        ValueError: If topics share a directory name ("cell biology" and
+            "cell-biology"); their pages would overwrite each other, and the
+            app cannot tell them apart either, so one of them must be renamed
+    """
+    by_slug: Dict[str, List[str]] = {}
+    for topic_key in topics:
+        by_slug.setdefault(slugify(topic_key), []).append(topic_key)
+    collisions = [keys for keys in by_slug.values() if len(keys) > 1]
+    if collisions:
+        raise ValueError("Topics with the same page directory: " + "; ".join(
+            " / ".join(repr(key) for key in keys) for keys in collisions))
+    return {keys[0]: slug for slug, keys in by_slug.items()}
+
+
+def display_name(topic_key: str) -> str:
+    """Topic name as shown in the rendered pages."""
+    return topic_key.capitalize()
+
+
+def _inline(text: str) -> str:
+    return re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", escape(text, quote=False))
+
+
+def markdown_to_html(markdown: str) -> str:
+    """Convert the markdown subset the generators emit (headings, lists, rules, bold) to HTML."""
+    html, list_tag = [], None
+    for line in markdown.split("\n"):
+        ordered = re.match(r"\d+\. (.*)", line)
+        if line.startswith("- ") or ordered:
+            tag = "ol" if ordered else "ul"
+            if list_tag != tag:
+                if list_tag:
+                    html.append(f"</{list_tag}>")
+                html.append(f"<{tag}>")
+                list_tag = tag
+            html.append(f"<li>{_inline(ordered.group(1) if ordered else line[2:])}</li>")
+            continue
+        if list_tag:
+            html.append(f"</{list_tag}>")
+            list_tag = None
+        heading = re.match(r"(#{1,6}) (.*)", line)
+        if heading:
+            level = len(heading.group(1))
+            html.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+        elif line.strip() == "---":
+            html.append("<hr>")
+        elif line.strip():
+            html.append(f"<p>{_inline(line)}</p>")
+    if list_tag:
+        html.append(f"</{list_tag}>")
+    return "\n".join(html)
+
+
+def render_markdown(topic: str, level: str, content: Dict) -> str:
+    """Render one topic/level page as Markdown."""
+    parts = [f"# {topic} ({level})\n", "## 📖 Personalized Explanation\n", content["explanation"], "\n---\n"]
+    parts.append("## 📝 Self-Assessment Quiz\n")
+    for idx, q in enumerate(content["quiz"], 1):
+        parts.append(f"**Question {idx}:** {q['question']}\n")
+        parts.extend(f"- {option}" for option in q["options"])
+        parts.append(f"\n*Correct Answer: {q['correct_answer']}*\n")
+    parts.append("---\n")
+    parts.append(content["study_plan"])
+    return "\n".join(parts) + "\n"
+
+
+def render_html(topic: str, level: str, content: Dict) -> str:
+    """Render one topic/level page as standalone HTML with answers revealed client-side."""
+    body = [f"<h1>📚 {escape(topic)} ({escape(level)})</h1>", "<h2>📖 Personalized Explanation</h2>"]
+    body.append(markdown_to_html(content["explanation"]))
+    body.append("<hr>\n<h2>📝 Self-Assessment Quiz</h2>")
+    body.append(quiz_html(content["quiz"]))
+    body.append("<hr>")
+    body.append(markdown_to_html(content["study_plan"]))
+    return HTML_PAGE.format(title=escape(f"{topic} ({level})"), body="\n".join(body))
+
+
+def _write(path: str, data: str) -> str:
+    encoded = data.encode("utf-8")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encoded)
+    os.replace(tmp_path, path)
+    return _hash(encoded)
+
+
+def _load_manifest(output_dir: str) -> Dict:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("version") == MANIFEST_VERSION else {}
+
+
+def export(output_dir: str, workers: Optional[int] = None, force: bool = False,
+           formats: Iterable[str] = FORMATS) -> Dict[str, int]:
+    """
+    Pre-render every topic x level combination into output_dir.
+
+    Args:
+        output_dir: Directory receiving <topic>/<level>.{md,json,html} and manifest.json
+        workers: Worker processes for rendering (None uses every core)
+        force: Re-render everything, ignoring the previous manifest
+        formats: Subset of "md", "json", "html" to write
+
+    Returns:
+        Counts of rendered, unchanged and removed entries
+    """
+    formats = tuple(formats)
+    templates = template_hash()
+    previous = {} if force else _load_manifest(output_dir).get("entries", {})
+
+    # Work out which entries changed since the last export
+    entries, pending = {}, []
+    for topic_key, slug in topic_slugs(export_topics()).items():
+        for level in LEVELS:
+            entry_id = f"{slug}/{level.lower()}"
+            source = _hash([templates, topic_key, backend.get_topic_data(topic_key, level), formats])
+            old = previous.get(entry_id)
+            files_present = old is not None and all(
+                info["path"] == f"{entry_id}.{fmt}" and os.path.exists(os.path.join(output_dir, info["path"]))
+                for fmt, info in old["files"].items()
+            )
+            if old is not None and old["source_hash"] == source and files_present:
+                entries[entry_id] = old
+            else:
+                pending.append((entry_id, topic_key, level, source))
+
+    # Render changed entries in parallel
+    pairs = [(display_name(topic_key), level) for _, topic_key, level, _ in pending]
+    for (entry_id, topic_key, level, source), content in zip(
+        pending, backend.iter_all_content_batch(pairs, workers)
+    ):
+        topic = display_name(topic_key)
+        renderers = {
+            "md": lambda: render_markdown(topic, level, content),
+            "json": lambda: json.dumps({"topic": topic, "level": level, **content}, ensure_ascii=False, indent=2,
+                                       default=to_json_compatible),
+            "html": lambda: render_html(topic, level, content)
+        }
+        files = {}
+        for fmt in formats:
+            path = f"{entry_id}.{fmt}"
+            files[fmt] = {"path": path, "sha256": _write(os.path.join(output_dir, path), renderers[fmt]())}
+        entries[entry_id] = {"topic": topic, "level": level, "source_hash": source, "files": files}
+
+    # Remove pages for topics that no longer exist
+    removed = 0
+    for entry_id, old in previous.items():
+        if entry_id not in entries:
+            removed += 1
+            # The manifest is read back from disk, so its paths are not trusted
+            for info in old["files"].values():
+                path = _output_path(output_dir, info["path"])
+                if path is not None and os.path.isfile(path):
+                    os.remove(path)
+            topic_dir = _output_path(output_dir, os.path.dirname(entry_id))
+            if topic_dir is not None and os.path.isdir(topic_dir) and not os.listdir(topic_dir):
+                os.rmdir(topic_dir)
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "template_hash": templates,
+        "entries": dict(sorted(entries.items()))
+    }
+    _write(os.path.join(output_dir, MANIFEST_NAME), json.dumps(manifest, ensure_ascii=False, indent=2))
+    return {"rendered": len(pending), "unchanged": len(entries) - len(pending), "removed": removed}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pre-render every topic and level to a static bundle")
+    parser.add_argument("output", help="Output directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="Re-render every entry")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="Comma-separated subset of md,json,html")
+    args = parser.parse_args(argv)
+
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        parser.error(f"Unknown format(s): {', '.join(sorted(unknown))}")
+
+    try:
+        counts = export(args.output, args.workers, args.force, formats)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f"Rendered {counts['rendered']}, unchanged {counts['unchanged']}, removed {counts['removed']} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
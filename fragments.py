@@ -0,0 +1,122 @@
+"""
+EduAssist AI - Rendered Fragments
+Pre-assembled HTML blocks for the quiz, shared by the Streamlit page and the
+static export, so a section is one element (one delta message, one DOM
+subtree) instead of one per question, option and answer
+
+Answers are revealed client-side with <details>, which needs no script and
+no round trip. Rendered blocks are cached by the content digest of what they
+show (see content_hash.py), so every session viewing the same quiz reuses
+one string and a knowledge base reload can never serve a stale block.
+"""
+
+from collections import OrderedDict
+from html import escape
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+import threading
+
+
+def option_letter(option: str) -> str:
+    """The answer letter of an option such as "B) Carbon dioxide"."""
+    return option.split(")", 1)[0]
+
+
+def answer_letters(questions: Iterable) -> List[List[str]]:
+    """Option letters of each question, the choices on the answer sheet."""
+    return [[option_letter(option) for option in q["options"]] for q in questions]
+
+
+def quiz_html(questions: Iterable, reveal: bool = True) -> str:
+    """
+    Render quiz questions and their options as one HTML block.
+
+    Args:
+        questions: QuizQuestion records (or mappings with question, options, correct_answer)
+        reveal: Add a "Show Answer" disclosure under each question
+
+    Returns:
+        HTML with one ``quiz-question`` box per question
+    """
+    blocks = []
+    for idx, q in enumerate(questions, 1):
+        options = "".join(f"<li>{escape(option)}</li>" for option in q["options"])
+        answer = (f'<details><summary>Show Answer</summary>Correct Answer: {escape(q["correct_answer"])}</details>'
+                  if reveal else "")
+        blocks.append(
+            f'<div class="quiz-question"><strong>Question {idx}:</strong> {escape(q["question"])}'
+            f'<ul>{options}</ul>{answer}</div>'
+        )
+    return "\n".join(blocks)
+
+
+def results_html(questions: Sequence, correct: Sequence[bool]) -> str:
+    """
+    Render a graded submission as one HTML block: the score, then each
+    question marked right or wrong, with the correct option behind a disclosure.
+
+    Args:
+        questions: The quiz that was graded
+        correct: Whether each answer was correct
+
+    Returns:
+        HTML summary of the submission
+    """
+    score = sum(correct)
+    heading = "Perfect! You scored" if score == len(correct) else "You scored"
+    lines = [f"<p>🎯 <strong>{heading} {score}/{len(correct)}</strong></p>"]
+    for idx, (q, is_correct) in enumerate(zip(questions, correct), 1):
+        if is_correct:
+            lines.append(f"<p>✅ <strong>Question {idx}:</strong> Correct</p>")
+            continue
+        answer = next((option for option in q["options"] if option_letter(option) == q["correct_answer"]),
+                      q["correct_answer"])
+        lines.append(
+            f"<details><summary>❌ <strong>Question {idx}:</strong> Show the correct answer</summary>"
+            f"{escape(answer)}</details>"
+        )
+    return "\n".join(lines)
+
+
+class FragmentCache:
+    """Least recently used rendered fragments, keyed by the digest of their content."""
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._fragments: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple, render: Callable[[], str]) -> str:
+        """
+        Return the cached fragment for a key, rendering and storing it on a miss.
+
+        Args:
+            key: Identifies the content, e.g. ("quiz", section digest)
+            render: Builds the fragment
+
+        Returns:
+            The rendered fragment
+        """
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+        fragment = render()
+        with self._lock:
+            self._fragments[key] = fragment
+            while len(self._fragments) > self.maxsize:
+                self._fragments.popitem(last=False)
+        return fragment
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counts and size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._fragments), "maxsize": self.maxsize}
+
+
+# Process-wide cache used by the Streamlit page
+fragment_cache = FragmentCache()
@@ -0,0 +1,297 @@
+"""
+EduAssist AI - Hot-Reloaded Knowledge Source
+External knowledge base file that is watched for changes and reloaded
+while the app keeps serving, so fixing a definition needs no redeploy
+
+The source is JSON Lines, one topic per line:
+    {"topic": "photosynthesis", "aliases": ["photo synthesis"],
+     "levels": {"beginner": {"definition": "...", "key_points": ["..."]}, ...}}
+
+Edit the file in place or, better, write a copy and rename it over the
+original. Each reload hashes every line and parses only lines it has not seen, so an
+edit costs one topic's parse. The result is a new immutable KnowledgeVersion
+that shares every unchanged entry with the previous one (copy-on-write) and
+replaces it with a single reference swap: a request reads whole entries
+from one version or the next, never a mix of the two.
+"""
+
+from types import MappingProxyType
+from typing import Callable, Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
+
+from records import TopicEntry
+from search_index import SearchHit, SearchIndex, entry_text
+from topic_index import TopicIndex, TopicMatch
+
+# One parsed source line: (topic key, entries by level, aliases)
+_Parsed = Tuple[str, Dict[str, TopicEntry], Tuple[str, ...]]
+
+
+class KnowledgeSourceError(ValueError):
+    """Raised when the source file cannot be parsed; the current version stays in place."""
+
+
+class KnowledgeChange(NamedTuple):
+    """Topics that differ between two consecutive versions."""
+    version: int
+    added: FrozenSet[str]
+    changed: FrozenSet[str]
+    removed: FrozenSet[str]
+    names_changed: bool     # Topic names or aliases changed, so topic resolution may differ
+
+    @property
+    def topics(self) -> FrozenSet[str]:
+        return self.added | self.changed | self.removed
+
+
+class KnowledgeVersion:
+    """One immutable version of the external knowledge base."""
+
+    __slots__ = ("number", "topics", "aliases", "digests", "topic_index")
+
+    def __init__(self, number: int, topics: Mapping[str, Mapping[str, TopicEntry]],
+                 aliases: Mapping[str, Tuple[str, ...]], digests: Mapping[str, str], topic_index: TopicIndex):
+        self.number = number
+        self.topics = topics
+        self.aliases = aliases
+        self.digests = digests          # Topic -> hash of its source line, identifies its content across processes
+        self.topic_index = topic_index
+
+    def get(self, topic_key: str, level_key: str) -> Optional[TopicEntry]:
+        """Entry for a topic and level, or None if this version lacks it."""
+        levels = self.topics.get(topic_key)
+        return None if levels is None else levels.get(level_key)
+
+    def lookup(self, topic: str, fuzzy: bool = True) -> Optional[TopicMatch]:
+        """Resolve a topic against this version's names and aliases."""
+        match = self.topic_index.lookup(topic)
+        # Aliases are dictionary hits too, so they count here even though they are not exact
+        if match is None or (not fuzzy and match.score < 1.0):
+            return None
+        return match
+
+
+EMPTY_VERSION = KnowledgeVersion(0, MappingProxyType({}), MappingProxyType({}), MappingProxyType({}), TopicIndex())
+
+
+class KnowledgeSource:
+    """
+    A JSON Lines knowledge base file, reloaded incrementally when it changes.
+
+    Readers use ``current`` (or get/lookup/search), which is always a
+    complete version. Reloads run one at a time, in the caller's thread or
+    in the background watcher, and report what changed to ``on_change``.
+    """
+
+    POLL_INTERVAL = 2.0    # Seconds between modification checks while watching
+
+    def __init__(self, path: str, threshold: float = 0.7,
+                 on_change: Optional[Callable[[KnowledgeChange], None]] = None):
+        self.path = path
+        self.threshold = threshold
+        self.on_change = on_change
+        self.search_index = SearchIndex()
+        self.last_error: Optional[str] = None
+        self._current = EMPTY_VERSION
+        self._stat: Optional[Tuple[int, int]] = None
+        self._lines: Dict[str, bytes] = {}                 # Topic -> digest of its current line
+        self._parsed: Dict[bytes, _Parsed] = {}
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._watch_interval: Optional[float] = None
+        self._fork_hook = False
+        self._stop = threading.Event()
+
+    @property
+    def current(self) -> KnowledgeVersion:
+        """The latest complete version (a single reference read)."""
+        return self._current
+
+    def get(self, topic_key: str, level_key: str) -> Optional[TopicEntry]:
+        return self._current.get(topic_key, level_key)
+
+    def lookup(self, topic: str, fuzzy: bool = True) -> Optional[TopicMatch]:
+        return self._current.lookup(topic, fuzzy)
+
+    def search(self, query: str, limit: int = 5) -> List[SearchHit]:
+        return self.search_index.search(query, limit)
+
+    def reload(self, force: bool = False) -> Optional[KnowledgeChange]:
+        """
+        Load the source file if it changed since the last reload.
+
+        Args:
+            force: Re-read the file even if its size and modification time are unchanged
+
+        Returns:
+            The change that was applied, or None if nothing changed
+
+        Raises:
+            KnowledgeSourceError: If a line is malformed; the current version is kept
+        """
+        with self._reload_lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                raise KnowledgeSourceError(f"Knowledge source not found: {self.path}") from None
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature == self._stat and not force:
+                return None
+            with open(self.path, "rb") as f:
+                data = f.read()
+
+            # Everything is built before anything is stored, so a malformed file
+            # leaves the source exactly as it was and is retried once edited
+            lines, parsed = self._parse_lines(data)
+            previous = self._lines
+            added = frozenset(lines.keys() - previous.keys())
+            removed = frozenset(previous.keys() - lines.keys())
+            changed = frozenset(topic for topic in lines.keys() & previous.keys() if lines[topic] != previous[topic])
+            if not (added or removed or changed):
+                self._stat = signature
+                self._parsed = parsed
+                self.last_error = None
+                return None
+
+            names_changed = bool(added or removed) or any(
+                parsed[lines[topic]][2] != self._current.aliases.get(topic, ()) for topic in changed
+            )
+            version = self._next_version(lines, parsed, added | changed, removed, names_changed)
+            documents = {topic: SearchIndex.document(entry_text(topic, version.topics[topic]))
+                         for topic in added | changed if topic != "default"}
+
+            # Search postings follow the topics; entries are swapped in with one assignment
+            for topic in removed:
+                self.search_index.remove(topic)
+            for topic, document in documents.items():
+                self.search_index.add_document(topic, document)
+            self._stat = signature
+            self._current = version
+            self._lines = lines
+            self._parsed = parsed
+            self.last_error = None
+
+            # Reported under the lock so listeners see changes in version order
+            change = KnowledgeChange(version.number, added, changed, removed, names_changed)
+            if self.on_change is not None:
+                self.on_change(change)
+        return change
+
+    def watch(self, interval: Optional[float] = None) -> None:
+        """
+        Start a daemon thread that reloads the source whenever it changes.
+
+        Threads do not survive a fork, so a forked child (e.g. a service
+        worker) starts its own watcher.
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._watch_interval = interval or self.POLL_INTERVAL
+        if not self._fork_hook and hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+            self._fork_hook = True
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(self._watch_interval,),
+            name="eduassist-knowledge-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop(self) -> None:
+        """Stop the watcher thread."""
+        self._watch_interval = None
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _after_fork(self) -> None:
+        # The parent's watcher (and whatever lock it held) did not come along
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        if self._watch_interval is not None:
+            self.watch(self._watch_interval)
+
+    def _watch(self, interval: float) -> None:
+        # A change is loaded once the file has looked the same for a whole
+        # interval, so a file caught mid-write is not mistaken for an edit
+        pending = None
+        while not self._stop.wait(interval):
+            try:
+                stat = os.stat(self.path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                signature = None
+            if signature is not None and signature != self._stat and signature == pending:
+                try:
+                    self.reload()
+                except Exception as e:
+                    # Keep serving the last good version until the file is fixed;
+                    # whatever went wrong, the watcher itself must keep running
+                    self.last_error = str(e)
+            pending = signature
+
+    def _parse_lines(self, data: bytes) -> Tuple[Dict[str, bytes], Dict[bytes, _Parsed]]:
+        # Returns the topics' line digests and the parse of every line; lines
+        # already seen reuse their parse, and self._parsed is left untouched
+        lines = {}
+        parsed_lines = {}
+        for number, line in enumerate(data.splitlines(), 1):
+            if not line.strip():
+                continue
+            digest = hashlib.blake2b(line, digest_size=16).digest()
+            parsed = self._parsed.get(digest)
+            if parsed is None:
+                parsed = _parse_topic(line, number)
+            topic = parsed[0]
+            if topic in lines:
+                raise KnowledgeSourceError(f"Line {number}: duplicate topic '{topic}'")
+            lines[topic] = digest
+            parsed_lines[digest] = parsed
+        return lines, parsed_lines
+
+    def _next_version(self, lines: Dict[str, bytes], parsed: Mapping[bytes, _Parsed], updated: Iterable[str],
+                      removed: Iterable[str], names_changed: bool) -> KnowledgeVersion:
+        # Copy-on-write: unchanged topics keep their entry objects
+        topics = dict(self._current.topics)
+        aliases = dict(self._current.aliases)
+        for topic in removed:
+            del topics[topic]
+            aliases.pop(topic, None)
+        for topic in updated:
+            _, levels, topic_aliases = parsed[lines[topic]]
+            topics[topic] = MappingProxyType(levels)
+            aliases[topic] = topic_aliases
+        index = self._current.topic_index
+        if names_changed:
+            index = TopicIndex.build((topic for topic in topics if topic != "default"), aliases,
+                                     threshold=self.threshold)
+        digests = MappingProxyType({topic: digest.hex() for topic, digest in lines.items()})
+        return KnowledgeVersion(self._current.number + 1, MappingProxyType(topics),
+                                MappingProxyType(aliases), digests, index)
+
+
+def _parse_topic(line: bytes, number: int) -> _Parsed:
+    """Parse and validate one source line into (topic key, entries by level, aliases)."""
+    try:
+        record = json.loads(line)
+        topic = record["topic"].lower().strip()
+        sources = record["levels"]
+        aliases = record.get("aliases", [])
+        if not topic or not sources:
+            raise ValueError("a topic needs a name and at least one level")
+        if not isinstance(aliases, list) or not all(isinstance(alias, str) and alias.strip() for alias in aliases):
+            raise ValueError("aliases must be a list of non-empty names")
+        aliases = tuple(aliases)
+        for level_key, data in sources.items():
+            if not isinstance(data["definition"], str) or not isinstance(data["key_points"], list) \
+                    or not all(isinstance(point, str) for point in data["key_points"]):
+                raise ValueError(f"{level_key} needs a text definition and a list of key points")
+        levels = {level_key.lower(): TopicEntry.from_mapping(data) for level_key, data in sources.items()}
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise KnowledgeSourceError(f"Line {number}: {type(e).__name__}: {e}") from None
+    return topic, levels, aliases
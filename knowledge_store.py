@@ -0,0 +1,355 @@
+"""
+EduAssist AI - Knowledge Store
+Disk-backed knowledge base in a single SQLite file, read one topic/level
+record at a time so import time and memory stay flat as the corpus grows
+
+Build a store from a JSON source (or the built-in KNOWLEDGE_BASE):
+    python knowledge_store.py build knowledge.sqlite [--source topics.json]
+
+Source format:
+    {"topics": {"topic": {"beginner": {"definition": "...", "key_points": [...]}, ...}},
+     "aliases": {"topic": ["alternative name", ...]}}
+"""
+
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional
+import argparse
+import json
+import math
+import os
+import sqlite3
+import threading
+
+from records import TopicEntry
+from search_index import SearchHit, entry_text, tokenize
+from topic_index import TopicMatch, compact_topic, normalize_topic, topic_trigrams
+
+
+SCHEMA = """
+CREATE TABLE topics (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE
+);
+CREATE TABLE entries (
+    topic_id INTEGER NOT NULL,
+    level TEXT NOT NULL,
+    definition TEXT NOT NULL,
+    key_points TEXT NOT NULL,
+    PRIMARY KEY (topic_id, level)
+) WITHOUT ROWID;
+CREATE TABLE names (
+    id INTEGER PRIMARY KEY,
+    compact TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    topic_id INTEGER NOT NULL
+);
+CREATE TABLE grams (
+    gram TEXT NOT NULL,
+    name_id INTEGER NOT NULL,
+    PRIMARY KEY (gram, name_id)
+) WITHOUT ROWID;
+CREATE TABLE gram_stats (
+    gram TEXT PRIMARY KEY,
+    df INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Full-text search over entry text (rowid = topic id), stored as search_index
+# tokens so both indexes agree on terms; skipped where SQLite lacks FTS5
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE search USING fts5(body, tokenize = 'unicode61');
+CREATE TABLE search_stats (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class KnowledgeStore:
+    """
+    Read-only SQLite knowledge base with a small LRU cache in front.
+
+    Each thread gets its own connection, since Streamlit serves sessions
+    from a thread pool and SQLite connections must not be shared.
+    """
+
+    MIN_SCANNED = 4          # Rarest trigram posting lists always scanned
+    POSTING_BUDGET = 1000    # Stop widening the scan once this many postings are seen
+    MAX_CANDIDATES = 64      # Candidates verified, by most shared trigrams
+    MIN_PREFIX = 2           # Shortest last search term that is expanded to its completions
+    MAX_PREFIX_TERMS = 32    # Completions of the last search term that are matched
+    MAX_SEARCH_WORDS = 6     # Words of a search query that are used
+
+    def __init__(self, path: str, cache_size: int = 1024, threshold: float = 0.7):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Knowledge store not found: {path}")
+        self.path = path
+        self.threshold = threshold
+        self._local = threading.local()
+        self._get = lru_cache(maxsize=cache_size)(self._fetch)
+        self._find = lru_cache(maxsize=cache_size)(self._find_exact)
+        self._documents = None
+
+    def get(self, topic_key: str, level_key: str) -> Optional[TopicEntry]:
+        """
+        Fetch one topic/level record.
+
+        Args:
+            topic_key: Knowledge base key
+            level_key: Lowercase learning level
+
+        Returns:
+            TopicEntry with the definition and key points, or None if absent
+        """
+        return self._get(topic_key, level_key)
+
+    def __contains__(self, topic_key: str) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM topics WHERE key = ?", (topic_key,)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM topics").fetchone()[0]
+
+    def topics(self) -> Iterable[str]:
+        """Iterate over every topic key without loading them all at once."""
+        cursor = self._connection().execute("SELECT key FROM topics ORDER BY id")
+        for (key,) in cursor:
+            yield key
+
+    def lookup(self, topic: str, fuzzy: bool = True) -> Optional[TopicMatch]:
+        """
+        Resolve a topic against stored names and aliases.
+
+        Args:
+            topic: Topic as entered by the student
+            fuzzy: Also try trigram similarity when there is no exact hit
+
+        Returns:
+            The best TopicMatch at or above the threshold, or None
+        """
+        query = normalize_topic(topic)
+        compact = compact_topic(query)
+        if not compact:
+            return None
+        exact = self._find(compact)
+        if exact is not None:
+            return TopicMatch(exact[0], exact[1], 1.0, query)
+        if not fuzzy:
+            return None
+        return self._lookup_fuzzy(query, compact)
+
+    def search(self, query: str, limit: int = 5) -> List[SearchHit]:
+        """
+        Rank topics against a free-text query with SQLite's BM25.
+
+        Args:
+            query: Words the student typed; the last one may be incomplete
+            limit: Maximum number of results
+
+        Returns:
+            Best matching topics, highest score first (empty if the store has no search table)
+        """
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+        connection = self._connection()
+        try:
+            if self._documents is None:
+                self._documents = connection.execute("SELECT COUNT(*) FROM search").fetchone()[0]
+            # The last word also matches its completions while it is being typed.
+            # Terms in half the topics or more get no BM25 weight but would make
+            # SQLite score nearly every row, so they are left out.
+            prefix = tokens[-1]
+            rows = connection.execute(
+                f"SELECT term, df FROM search_stats WHERE term IN ({','.join('?' * len(tokens))})",
+                tokens
+            ).fetchall()
+            if len(prefix) >= self.MIN_PREFIX:
+                rows += connection.execute(
+                    "SELECT term, df FROM search_stats WHERE term > ? AND term < ? LIMIT ?",
+                    (prefix, prefix + "\uffff", self.MAX_PREFIX_TERMS)
+                ).fetchall()
+            useful = {term for term, df in rows if 2 * df < self._documents}
+            words = [f'"{term}"' for term in dict.fromkeys(tokens[:-1]) if term in useful]
+            completions = sorted(f'"{term}"' for term in useful if term.startswith(prefix))
+            if completions:
+                words.append(f"({' OR '.join(completions)})")
+            words = words[-self.MAX_SEARCH_WORDS:]
+
+            # Ranking costs SQLite about a microsecond per matching row, so topics
+            # matching every word are ranked first, then those missing one word,
+            # and so on, until there are enough results
+            hits, seen = [], set()
+            for required in range(len(words), 0, -1):
+                match = " OR ".join(f"({' AND '.join(combo)})" for combo in combinations(words, required))
+                for hit in self._ranked(match, limit):
+                    if hit.key not in seen and len(hits) < limit:
+                        hits.append(hit)
+                        seen.add(hit.key)
+                if len(hits) >= limit:
+                    break
+        except sqlite3.OperationalError:
+            return []
+        return hits
+
+    def clear_cache(self) -> None:
+        """Drop cached records, e.g. after the store file was rebuilt."""
+        self._get.cache_clear()
+        self._find.cache_clear()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.connection = connection
+        return connection
+
+    def _ranked(self, match: str, limit: int) -> List[SearchHit]:
+        rows = self._connection().execute(
+            "SELECT t.key, -s.rank FROM search s JOIN topics t ON t.id = s.rowid "
+            "WHERE search MATCH ? ORDER BY s.rank LIMIT ?",
+            (match, limit)
+        ).fetchall()
+        return [SearchHit(key, round(score, 4)) for key, score in rows]
+
+    def _fetch(self, topic_key: str, level_key: str) -> Optional[TopicEntry]:
+        row = self._connection().execute(
+            "SELECT e.definition, e.key_points FROM entries e "
+            "JOIN topics t ON t.id = e.topic_id WHERE t.key = ? AND e.level = ?",
+            (topic_key, level_key)
+        ).fetchone()
+        if row is None:
+            return None
+        return TopicEntry.from_mapping({"definition": row[0], "key_points": json.loads(row[1])})
+
+    def _find_exact(self, compact: str) -> Optional[tuple]:
+        return self._connection().execute(
+            "SELECT t.key, n.name FROM names n JOIN topics t ON t.id = n.topic_id "
+            "WHERE n.compact = ?", (compact,)
+        ).fetchone()
+
+    def _lookup_fuzzy(self, query: str, compact: str) -> Optional[TopicMatch]:
+        # Same candidate strategy as TopicIndex.lookup, with postings kept on disk
+        connection = self._connection()
+        grams = topic_trigrams(compact)
+        size = len(grams)
+        placeholders = ",".join("?" * size)
+        stats = connection.execute(
+            f"SELECT gram, df FROM gram_stats WHERE gram IN ({placeholders}) ORDER BY df",
+            tuple(grams)
+        ).fetchall()
+        min_shared = max(1, math.ceil(self.threshold * size / (2 - self.threshold) - 1e-9))
+        scanned, postings = [], 0
+        for gram, df in stats[:size - min_shared + 1]:
+            scanned.append(gram)
+            postings += df
+            if len(scanned) >= self.MIN_SCANNED and postings >= self.POSTING_BUDGET:
+                break
+        if not scanned:
+            return None
+
+        candidates = connection.execute(
+            f"SELECT n.name, t.key FROM names n JOIN topics t ON t.id = n.topic_id "
+            f"WHERE n.id IN (SELECT name_id FROM grams WHERE gram IN ({','.join('?' * len(scanned))}) "
+            f"GROUP BY name_id ORDER BY COUNT(*) DESC LIMIT ?)",
+            (*scanned, self.MAX_CANDIDATES)
+        ).fetchall()
+        best, best_score = None, 0.0
+        for name, key in candidates:
+            other = topic_trigrams(compact_topic(name))
+            score = 2 * len(grams & other) / (size + len(other))
+            if score > best_score:
+                best, best_score = (key, name), score
+        if best is None or best_score < self.threshold:
+            return None
+        return TopicMatch(best[0], best[1], round(best_score, 3), query)
+
+
+def build_store(path: str, knowledge_base: Dict, aliases: Optional[Dict[str, List[str]]] = None) -> int:
+    """
+    Write a knowledge base (and aliases) to a new SQLite store.
+
+    Args:
+        path: Output file; replaced if it already exists
+        knowledge_base: Mapping of topic -> level -> {"definition", "key_points"}
+        aliases: Mapping of topic -> alternative names
+
+    Returns:
+        Number of topics written
+    """
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript(SCHEMA)
+        try:
+            connection.executescript(SEARCH_SCHEMA)
+            searchable = True
+        except sqlite3.OperationalError:
+            searchable = False
+        names, term_counts = {}, {}
+        for topic_id, (topic, levels) in enumerate(knowledge_base.items(), 1):
+            connection.execute("INSERT INTO topics (id, key) VALUES (?, ?)", (topic_id, topic))
+            connection.executemany(
+                "INSERT INTO entries VALUES (?, ?, ?, ?)",
+                [
+                    (topic_id, level, data["definition"], json.dumps(data["key_points"], ensure_ascii=False))
+                    for level, data in levels.items()
+                ]
+            )
+            if searchable and topic != "default":
+                tokens = tokenize(entry_text(topic, levels))
+                connection.execute("INSERT INTO search (rowid, body) VALUES (?, ?)", (topic_id, " ".join(tokens)))
+                for term in set(tokens):
+                    term_counts[term] = term_counts.get(term, 0) + 1
+            for name in [topic, *(aliases or {}).get(topic, [])]:
+                normalized = normalize_topic(name)
+                names.setdefault(compact_topic(normalized), (normalized, topic_id))
+
+        gram_counts = {}
+        for name_id, (compact, (normalized, topic_id)) in enumerate(names.items(), 1):
+            if not compact:
+                continue
+            connection.execute(
+                "INSERT INTO names VALUES (?, ?, ?, ?)", (name_id, compact, normalized, topic_id)
+            )
+            grams = topic_trigrams(compact)
+            connection.executemany("INSERT INTO grams VALUES (?, ?)", [(g, name_id) for g in grams])
+            for gram in grams:
+                gram_counts[gram] = gram_counts.get(gram, 0) + 1
+        connection.executemany("INSERT INTO gram_stats VALUES (?, ?)", gram_counts.items())
+        if searchable:
+            connection.executemany("INSERT INTO search_stats VALUES (?, ?)", term_counts.items())
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(tmp_path, path)
+    return len(knowledge_base)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build an EduAssist AI knowledge store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Build a SQLite store from JSON or the built-in knowledge base")
+    build.add_argument("output", help="Path of the SQLite file to write")
+    build.add_argument("--source", help="JSON source file (defaults to backend.KNOWLEDGE_BASE)")
+    args = parser.parse_args(argv)
+
+    if args.source:
+        with open(args.source, encoding="utf-8") as f:
+            source = json.load(f)
+        knowledge_base, aliases = source["topics"], source.get("aliases", {})
+    else:
+        from backend import KNOWLEDGE_BASE, TOPIC_ALIASES
+        knowledge_base, aliases = KNOWLEDGE_BASE, TOPIC_ALIASES
+
+    count = build_store(args.output, knowledge_base, aliases)
+    print(f"Wrote {count} topics to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
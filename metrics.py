@@ -0,0 +1,233 @@
+"""
+EduAssist AI - Metrics
+Opt-in counters and latency histograms with Prometheus text export
+
+Enable with EDUASSIST_METRICS=1. When disabled every timer is a shared
+no-op object, so instrumented code pays only an attribute check.
+Set EDUASSIST_METRICS_FILE to also write the Prometheus text to a file
+(e.g. for a node_exporter textfile collector).
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+import os
+import threading
+import time
+
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+
+STAGE_METRIC = "eduassist_stage_seconds"
+
+HELP = {
+    STAGE_METRIC: "Latency of request stages in seconds",
+    "eduassist_requests_total": "Requests handled, by operation",
+    "eduassist_http_requests_total": "HTTP responses sent by the JSON service, by status",
+    "eduassist_section_fallbacks_total": "Sections replaced with rule-based output, by section and reason",
+    "eduassist_admissions_total": "Generate requests by admission outcome (admitted, queued, rate_limited, queue_full)",
+    "eduassist_queue_seconds": "Time admitted requests waited in the admission queue in seconds",
+    "eduassist_content_cache_hits_total": "Content cache lookups that found an entry",
+    "eduassist_content_cache_misses_total": "Content cache lookups that found nothing",
+    "eduassist_content_cache_evictions_total": "Content cache entries evicted to stay within maxsize",
+    "eduassist_content_cache_coalesced_content_total": "Content requests that joined a generation in flight",
+    "eduassist_content_cache_coalesced_sections_total": "Section requests that joined a generation in flight"
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _NullTimer:
+    """Timer used while metrics are disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.observe(self.name, time.perf_counter() - self.start, self.labels)
+        return False
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters and latency histograms."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], _Histogram] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Increment a counter."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, labels: Labels = ()) -> None:
+        """Record one latency observation in a histogram."""
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            histogram.total += seconds
+            histogram.count += 1
+
+    def timer(self, name: str, **labels: str):
+        """Context manager timing its block into the named histogram."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, tuple(sorted(labels.items())))
+
+    def stage(self, stage: str):
+        """Time one request stage (topic lookup, a generator, rendering)."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, STAGE_METRIC, (("stage", stage),))
+
+    def reset(self) -> None:
+        """Drop every recorded value."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def summary(self) -> List[Dict]:
+        """
+        Summarize histograms for display.
+
+        Returns:
+            One row per histogram with count, mean and approximate p50/p95/p99 in milliseconds
+        """
+        with self._lock:
+            items = [(key, list(h.counts), h.total, h.count) for key, h in self._histograms.items()]
+        rows = []
+        for (name, labels), counts, total, count in sorted(items):
+            if not count:
+                continue
+            row = {"metric": name, **dict(labels), "count": count, "mean_ms": round(total / count * 1e3, 4)}
+            for label, fraction in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+                row[label] = _bucket_quantile(counts, count, fraction)
+            rows.append(row)
+        return rows
+
+    def render_prometheus(self, extra_gauges: Optional[Dict[str, float]] = None,
+                          extra_counters: Optional[Dict[str, float]] = None) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Args:
+            extra_gauges: Additional gauge values to include, by metric name
+            extra_counters: Additional counter totals kept elsewhere (e.g. cache hits), by
+                metric name; names should end in _total
+
+        Returns:
+            The exposition text
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, list(h.counts), h.total, h.count) for key, h in self._histograms.items())
+
+        lines = []
+        seen = set()
+
+        def header(name: str, kind: str) -> None:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+        for name, value in sorted((extra_counters or {}).items()):
+            header(name, "counter")
+            lines.append(f"{name} {value:g}")
+
+        for (name, labels), counts, total, count in histograms:
+            header(name, "histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS, counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', f'{bound:g}'),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total:.9g}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        for name, value in sorted((extra_gauges or {}).items()):
+            header(name, "gauge")
+            lines.append(f"{name} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, extra_gauges: Optional[Dict[str, float]] = None,
+                         extra_counters: Optional[Dict[str, float]] = None) -> None:
+        """Atomically write the Prometheus text to path."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus(extra_gauges, extra_counters))
+        os.replace(tmp_path, path)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _bucket_quantile(counts: List[int], total: int, fraction: float) -> float:
+    # Upper bound of the bucket holding the quantile, in milliseconds
+    target = fraction * total
+    cumulative = 0
+    for bound, bucket_count in zip(LATENCY_BUCKETS, counts):
+        cumulative += bucket_count
+        if cumulative >= target:
+            return round(bound * 1e3, 4)
+    return float("inf")
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").lower() not in ("", "0", "false", "no")
+
+
+# Process-wide registry used by backend, app and service
+metrics = MetricsRegistry(enabled=_env_flag("EDUASSIST_METRICS"))
+METRICS_FILE = os.environ.get("EDUASSIST_METRICS_FILE")
@@ -0,0 +1,188 @@
+"""
+EduAssist AI - Request Profiling
+Opt-in cProfile and tracemalloc capture of single page runs, for finding
+out why a particular topic or level renders slowly in production
+
+Enable with EDUASSIST_PROFILE=N to profile one page run in N (1 profiles
+every run), or open the page with ?profile=1 to profile that run (honoured
+only with EDUASSIST_DEV_PANEL=1). Each profile is written to
+EDUASSIST_PROFILE_DIR (default ./profiles) as:
+
+    <name>.prof        cProfile stats, for snakeviz, flameprof, gprof2dot, pstats
+    <name>.folded      Collapsed stacks in microseconds, for flamegraph.pl,
+                       speedscope and inferno (rebuilt from the call graph)
+    <name>.tracemalloc A tracemalloc snapshot (tracemalloc.Snapshot.load)
+    <name>.txt         Wall time, peak memory, slowest functions and top allocation sites
+
+Only one run per process is profiled at a time; runs selected while one is
+being profiled run normally. tracemalloc is process-wide, so other sessions
+run slower during a profile. The newest EDUASSIST_PROFILE_KEEP profiles are kept.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import cProfile
+import glob
+import io
+import itertools
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+
+
+PROFILE_DIR = os.environ.get("EDUASSIST_PROFILE_DIR", "profiles")
+PROFILE_EVERY = int(os.environ.get("EDUASSIST_PROFILE", "0"))
+PROFILE_KEEP = int(os.environ.get("EDUASSIST_PROFILE_KEEP", "100"))
+# Stack depth recorded per allocation; deeper costs more while profiling
+TRACEMALLOC_FRAMES = 16
+# Folded stacks stop here, at recursion, and below MIN_STACK_SECONDS
+MAX_STACK_DEPTH = 64
+MIN_STACK_SECONDS = 0.00001
+
+FuncKey = Tuple[str, int, str]
+
+_active = threading.Lock()
+_runs = itertools.count()
+_written = itertools.count()
+
+
+class RequestProfile:
+    """cProfile and tracemalloc running for one page run in the current thread."""
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self._tracing = not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        self.started = time.perf_counter()
+        self.profiler.enable()
+
+    def finish(self, name: str, directory: str = PROFILE_DIR) -> Optional[str]:
+        """
+        Stop profiling and write the profile files.
+
+        Args:
+            name: Describes the run, e.g. its topic and level
+            directory: Where to write the files
+
+        Returns:
+            The path of the files without their extension, or None if they
+            could not be written (profiling never fails the page)
+        """
+        try:
+            self.profiler.disable()
+            wall = time.perf_counter() - self.started
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if self._tracing:
+                tracemalloc.stop()
+        finally:
+            _active.release()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")[:60] or "page"
+        base = os.path.join(directory, f"{stamp}-{os.getpid()}-{next(_written)}-{slug}")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            stats = pstats.Stats(self.profiler)
+            stats.dump_stats(f"{base}.prof")
+            with open(f"{base}.folded", "w", encoding="utf-8") as f:
+                f.writelines(f"{stack} {weight}\n" for stack, weight in sorted(folded_stacks(stats).items()))
+            snapshot.dump(f"{base}.tracemalloc")
+            with open(f"{base}.txt", "w", encoding="utf-8") as f:
+                f.write(summary(name, wall, peak, stats, snapshot))
+            prune(directory)
+        except OSError:
+            return None
+        return base
+
+
+def start(force: bool = False) -> Optional[RequestProfile]:
+    """
+    Start profiling the current run if it is selected.
+
+    Args:
+        force: Profile this run regardless of sampling (the ?profile=1 switch)
+
+    Returns:
+        The running profile, to finish once the page is rendered, or None
+    """
+    if not force and (PROFILE_EVERY <= 0 or next(_runs) % PROFILE_EVERY):
+        return None
+    if not _active.acquire(blocking=False):
+        return None
+    try:
+        return RequestProfile()
+    except BaseException:
+        _active.release()
+        raise
+
+
+def _label(func: FuncKey) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def folded_stacks(stats: pstats.Stats) -> Dict[str, int]:
+    """
+    Collapsed stacks ("root;caller;callee microseconds") from cProfile's call graph.
+
+    cProfile keeps caller/callee pairs rather than whole stacks, so a
+    function's time is split between its callers in proportion to the time
+    each call edge accounts for, as flameprof does.
+    """
+    entries = stats.stats
+    callees: Dict[FuncKey, List[Tuple[FuncKey, float]]] = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    roots = [func for func, entry in entries.items() if not entry[4]]
+    folded: Dict[str, int] = {}
+
+    def walk(func: FuncKey, stack: List[str], share: float) -> None:
+        stack = stack + [_label(func)]
+        weight = int(entries[func][2] * share * 1e6)
+        if weight:
+            key = ";".join(stack)
+            folded[key] = folded.get(key, 0) + weight
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_total in callees.get(func, ()):
+            callee_total = entries[callee][3]
+            # Paths too short to show in a flame graph would only multiply the stacks
+            if share * edge_total >= MIN_STACK_SECONDS and _label(callee) not in stack:
+                walk(callee, stack, share * edge_total / callee_total)
+
+    for root in roots:
+        walk(root, [], 1.0)
+    return folded
+
+
+def summary(name: str, wall: float, peak: int, stats: pstats.Stats, snapshot: tracemalloc.Snapshot,
+            limit: int = 25) -> str:
+    """Readable report of one profile: totals, slowest functions and top allocation sites."""
+    out = io.StringIO()
+    out.write(f"{name}\nwall time: {wall * 1e3:.1f} ms\npeak traced memory: {peak / 1024:.1f} KiB\n\n")
+    stats.stream = out
+    stats.sort_stats("cumulative").print_stats(limit)
+    out.write("Top allocation sites (still allocated at the end of the run):\n")
+    snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+    for stat in snapshot.statistics("lineno")[:limit]:
+        out.write(f"  {stat}\n")
+    return out.getvalue()
+
+
+def prune(directory: str = PROFILE_DIR, keep: int = PROFILE_KEEP) -> None:
+    """Delete all but the newest keep profiles in a directory."""
+    profiles = sorted(glob.glob(os.path.join(directory, "*.prof")), key=os.path.getmtime)
+    for path in profiles[:max(0, len(profiles) - keep)]:
+        base = path[:-len(".prof")]
+        for extension in (".prof", ".folded", ".tracemalloc", ".txt"):
+            try:
+                os.remove(base + extension)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,549 @@
+"""
+EduAssist AI - Question Bank
+Per-level bank of quiz question templates with seeded sampling
+
+Each facet of a topic (its definition, importance, applications, ...) has
+several question phrasings, several correct answers and a pool of
+distractors. Every phrasing x correct answer x choice of three distractors
+is one template, so a handful of facets yields hundreds of templates per
+level. A quiz draws one template from each of k distinct facets and shuffles
+its options, using only the seed, so the same seed always gives the same quiz.
+"""
+
+from itertools import combinations
+from typing import Dict, List, NamedTuple, Tuple, Union
+import random
+import sys
+
+
+OPTION_LETTERS = "ABCD"
+DISTRACTORS_PER_QUESTION = len(OPTION_LETTERS) - 1
+
+# Facets by level: question phrasings ({topic} slot), correct answers, distractors
+QUESTION_BANK = {
+    "beginner": [
+        {
+            "questions": [
+                "What is {topic}?",
+                "Which statement best describes {topic}?",
+                "How would you briefly define {topic}?"
+            ],
+            "correct": [
+                "A process or concept in the subject area",
+                "An idea that helps explain part of the subject"
+            ],
+            "distractors": [
+                "A type of measurement tool",
+                "A mathematical formula",
+                "A historical event",
+                "A brand of laboratory equipment",
+                "A word with no agreed meaning"
+            ]
+        },
+        {
+            "questions": [
+                "Why is {topic} important?",
+                "Why do students learn about {topic}?",
+                "What makes {topic} worth studying?"
+            ],
+            "correct": [
+                "It helps us understand fundamental concepts",
+                "It builds a foundation for later learning"
+            ],
+            "distractors": [
+                "It has no practical use",
+                "It only matters for advanced students",
+                "It is outdated knowledge",
+                "It is only useful for passing tests",
+                "Nobody really knows"
+            ]
+        },
+        {
+            "questions": [
+                "Where do we commonly encounter {topic}?",
+                "Where might you notice {topic} outside the classroom?",
+                "In which setting can {topic} be observed?"
+            ],
+            "correct": [
+                "In everyday life and nature",
+                "In familiar, real-world situations"
+            ],
+            "distractors": [
+                "Only in laboratories",
+                "Only in textbooks",
+                "Nowhere in the real world",
+                "Only in science fiction",
+                "Only in ancient history"
+            ]
+        },
+        {
+            "questions": [
+                "What is the first step in learning about {topic}?",
+                "How should a beginner start studying {topic}?",
+                "What should you do first when you meet {topic} for the first time?"
+            ],
+            "correct": [
+                "Understanding the basic definition",
+                "Learning the key terms and what they mean"
+            ],
+            "distractors": [
+                "Memorizing complex formulas",
+                "Conducting advanced research",
+                "Ignoring the fundamentals",
+                "Reading the most advanced papers first",
+                "Skipping straight to the final exam"
+            ]
+        },
+        {
+            "questions": [
+                "How can you practice {topic}?",
+                "What is a good way to strengthen your understanding of {topic}?",
+                "How can you check that you really understand {topic}?"
+            ],
+            "correct": [
+                "By doing simple exercises and examples",
+                "By explaining it in your own words and trying examples"
+            ],
+            "distractors": [
+                "By avoiding all practice",
+                "Only through theoretical study",
+                "It cannot be practiced",
+                "By reading the same page repeatedly",
+                "By memorizing answers without understanding"
+            ]
+        },
+        {
+            "questions": [
+                "Why are key terms useful when learning {topic}?",
+                "How do flashcards of key terms help with {topic}?",
+                "What role does vocabulary play in learning {topic}?"
+            ],
+            "correct": [
+                "They give you the words to describe and recall the main ideas",
+                "They make the main ideas easier to remember and discuss"
+            ],
+            "distractors": [
+                "They are only needed by teachers",
+                "They make the topic harder to understand",
+                "They replace the need to understand",
+                "They are unrelated to the topic",
+                "They only matter in exams"
+            ]
+        },
+        {
+            "questions": [
+                "Why are everyday examples helpful for learning {topic}?",
+                "How do simple examples support learning {topic}?",
+                "What do real-life examples add when studying {topic}?"
+            ],
+            "correct": [
+                "They connect new ideas to things you already know",
+                "They make abstract ideas concrete and memorable"
+            ],
+            "distractors": [
+                "They distract from the real topic",
+                "They are only for young children",
+                "They oversimplify too much to be useful",
+                "They replace the need for definitions",
+                "They are never related to the topic"
+            ]
+        },
+        {
+            "questions": [
+                "What should you do if part of {topic} is confusing?",
+                "How should you handle a difficult idea in {topic}?",
+                "What helps when you get stuck on {topic}?"
+            ],
+            "correct": [
+                "Ask questions and review the basics again",
+                "Break it into smaller parts and ask a teacher or classmate"
+            ],
+            "distractors": [
+                "Give up on the topic entirely",
+                "Pretend you understand it",
+                "Skip it and never return",
+                "Memorize it word for word without understanding",
+                "Assume it will never be needed"
+            ]
+        }
+    ],
+    "intermediate": [
+        {
+            "questions": [
+                "What are the key mechanisms involved in {topic}?",
+                "How do the parts of {topic} work together?",
+                "What best describes how {topic} works?"
+            ],
+            "correct": [
+                "Complex interactions between multiple components",
+                "Several connected processes that influence each other"
+            ],
+            "distractors": [
+                "Simple one-step processes",
+                "No mechanisms are involved",
+                "Only theoretical concepts",
+                "Random events with no pattern",
+                "A single fixed rule that never changes"
+            ]
+        },
+        {
+            "questions": [
+                "How does {topic} relate to other concepts in the field?",
+                "How is {topic} connected to neighbouring ideas?",
+                "What is the relationship between {topic} and related topics?"
+            ],
+            "correct": [
+                "It connects to and influences related concepts",
+                "It shares principles with related ideas and builds on them"
+            ],
+            "distractors": [
+                "It exists in complete isolation",
+                "It has no relationship to anything else",
+                "Only beginners need to know connections",
+                "It contradicts every related concept",
+                "Connections only matter in exams"
+            ]
+        },
+        {
+            "questions": [
+                "What is a practical application of {topic}?",
+                "How is {topic} used in practice?",
+                "Why do professionals care about {topic}?"
+            ],
+            "correct": [
+                "It solves problems and creates solutions in various fields",
+                "It informs decisions and designs in real-world work"
+            ],
+            "distractors": [
+                "It has no real-world applications",
+                "Only theoretical exercises",
+                "Applications are unknown",
+                "It is used only for entertainment",
+                "It was useful once but no longer applies"
+            ]
+        },
+        {
+            "questions": [
+                "What level of understanding is needed to work with {topic}?",
+                "What does it take to use {topic} effectively?",
+                "Which skills matter most when working with {topic}?"
+            ],
+            "correct": [
+                "Deep conceptual understanding and analytical skills",
+                "A solid grasp of the concepts plus practice applying them"
+            ],
+            "distractors": [
+                "Only memorization is required",
+                "No understanding is necessary",
+                "Basic awareness is sufficient",
+                "Luck matters more than understanding",
+                "Only the ability to repeat definitions"
+            ]
+        },
+        {
+            "questions": [
+                "How would you explain {topic} to someone else?",
+                "What is the best way to teach {topic} to a classmate?",
+                "How could you make {topic} clear to a newcomer?"
+            ],
+            "correct": [
+                "By breaking it down into understandable parts with examples",
+                "By building from simple ideas to detailed ones with examples"
+            ],
+            "distractors": [
+                "By using technical jargon only",
+                "It cannot be explained",
+                "By avoiding all details",
+                "By reading the textbook aloud word for word",
+                "By only giving the final answer"
+            ]
+        },
+        {
+            "questions": [
+                "Why are case studies useful for studying {topic}?",
+                "What do worked examples reveal about {topic}?",
+                "How does analyzing real cases deepen understanding of {topic}?"
+            ],
+            "correct": [
+                "They show how principles play out in real situations",
+                "They reveal patterns and exceptions that theory alone can miss"
+            ],
+            "distractors": [
+                "They are only stories with no learning value",
+                "They replace the need to learn principles",
+                "They always prove the theory wrong",
+                "They are only useful for history",
+                "They make the topic less clear"
+            ]
+        },
+        {
+            "questions": [
+                "What does a concept map of {topic} help you see?",
+                "Why draw a diagram of the ideas in {topic}?",
+                "How does organizing {topic} visually help?"
+            ],
+            "correct": [
+                "How the main ideas relate to one another",
+                "The structure and connections between key ideas"
+            ],
+            "distractors": [
+                "Nothing beyond the definitions",
+                "Only the history of the topic",
+                "Which ideas can be safely ignored",
+                "The exact exam questions",
+                "Decoration for your notes"
+            ]
+        },
+        {
+            "questions": [
+                "What is a common mistake when studying {topic}?",
+                "Which habit most often leads to misunderstanding {topic}?",
+                "What should you avoid when learning {topic} in depth?"
+            ],
+            "correct": [
+                "Memorizing facts without understanding how they connect",
+                "Learning parts in isolation without seeing the whole"
+            ],
+            "distractors": [
+                "Asking too many questions",
+                "Practicing with examples",
+                "Reviewing earlier material",
+                "Connecting ideas to real life",
+                "Discussing it with classmates"
+            ]
+        }
+    ],
+    "advanced": [
+        {
+            "questions": [
+                "What are the theoretical foundations of {topic}?",
+                "What underpins current theory about {topic}?",
+                "On what basis do experts build their understanding of {topic}?"
+            ],
+            "correct": [
+                "Complex principles and established research frameworks",
+                "Well-tested models and principles built up by research"
+            ],
+            "distractors": [
+                "There are no theoretical foundations",
+                "Only practical observations",
+                "Simple assumptions",
+                "Personal opinion",
+                "A single undisputed formula"
+            ]
+        },
+        {
+            "questions": [
+                "How does current research approach {topic}?",
+                "What characterizes modern research on {topic}?",
+                "How do researchers investigate {topic} today?"
+            ],
+            "correct": [
+                "Through interdisciplinary methods and advanced analysis",
+                "By combining rigorous methods, data and insights from several fields"
+            ],
+            "distractors": [
+                "Research has concluded on this topic",
+                "Only through basic observation",
+                "Research ignores this topic",
+                "By repeating old experiments without change",
+                "Through guesswork and intuition only"
+            ]
+        },
+        {
+            "questions": [
+                "What are the limitations of current understanding of {topic}?",
+                "Where is knowledge about {topic} still incomplete?",
+                "What remains unresolved about {topic}?"
+            ],
+            "correct": [
+                "There are ongoing debates and areas requiring further investigation",
+                "Some questions remain open and current models have known limits"
+            ],
+            "distractors": [
+                "Everything is fully understood",
+                "No limitations exist",
+                "The topic is too simple to have limitations",
+                "All remaining questions are unimportant",
+                "Nothing more can ever be learned about it"
+            ]
+        },
+        {
+            "questions": [
+                "How can {topic} be applied to solve complex problems?",
+                "How do experts use {topic} on hard, open-ended problems?",
+                "What is the most effective way to apply {topic} to a complex problem?"
+            ],
+            "correct": [
+                "Through systematic analysis and integration with other advanced concepts",
+                "By modelling the problem carefully and combining several lines of evidence"
+            ],
+            "distractors": [
+                "It cannot solve complex problems",
+                "Only through guesswork",
+                "Simple application is sufficient",
+                "By applying one rule regardless of context",
+                "By ignoring conflicting evidence"
+            ]
+        },
+        {
+            "questions": [
+                "What future developments are expected in {topic}?",
+                "How is understanding of {topic} likely to change?",
+                "What is the outlook for research on {topic}?"
+            ],
+            "correct": [
+                "Continued research and technological advances will expand understanding",
+                "New methods and data will refine and extend current models"
+            ],
+            "distractors": [
+                "No future developments are anticipated",
+                "The field is stagnant",
+                "Future developments are impossible",
+                "All current knowledge will be discarded",
+                "Only funding decisions will matter"
+            ]
+        },
+        {
+            "questions": [
+                "How should you evaluate a research paper on {topic}?",
+                "What makes a study of {topic} credible?",
+                "How do experts judge new claims about {topic}?"
+            ],
+            "correct": [
+                "By examining its methods, evidence and assumptions critically",
+                "By checking the methodology, the data and whether results replicate"
+            ],
+            "distractors": [
+                "By trusting it if it is recent",
+                "By counting its pages",
+                "By accepting any published claim",
+                "By the fame of its authors alone",
+                "By whether it agrees with your opinion"
+            ]
+        },
+        {
+            "questions": [
+                "Why do interdisciplinary connections matter for {topic}?",
+                "What can other fields contribute to {topic}?",
+                "How does knowledge from related disciplines affect {topic}?"
+            ],
+            "correct": [
+                "They bring new methods and perspectives to open problems",
+                "They help explain phenomena that one field cannot explain alone"
+            ],
+            "distractors": [
+                "They only add confusion",
+                "Other fields are irrelevant",
+                "They make specialist knowledge unnecessary",
+                "They are only useful for beginners",
+                "They always contradict each other"
+            ]
+        },
+        {
+            "questions": [
+                "What does an original contribution to {topic} require?",
+                "How can an advanced student add to knowledge of {topic}?",
+                "What is needed to produce new insight into {topic}?"
+            ],
+            "correct": [
+                "Identifying a gap and investigating it with sound methods",
+                "A well-defined question, rigorous analysis and clear communication"
+            ],
+            "distractors": [
+                "Restating existing work in new words",
+                "Avoiding any existing literature",
+                "Only having a new opinion",
+                "Collecting facts without analysis",
+                "Waiting for someone else to find the answer"
+            ]
+        }
+    ]
+}
+
+
+class BankQuestion(NamedTuple):
+    """One compiled template: the question and its options, correct one first."""
+    question: str
+    # options[i][position] is option i already lettered for that position
+    options: Tuple[Tuple[str, ...], ...]
+
+
+class QuestionBank:
+    """Compiled question templates with constant-time seeded sampling."""
+
+    def __init__(self, facets: Dict[str, Tuple[Tuple[BankQuestion, ...], ...]]):
+        self._facets = facets
+
+    @classmethod
+    def build(cls, sources: Dict[str, List[Dict]]) -> "QuestionBank":
+        """
+        Expand facet sources into every template combination.
+
+        Args:
+            sources: Mapping of level to facets, shaped like QUESTION_BANK
+
+        Returns:
+            The compiled bank
+        """
+        lettered = {}
+
+        def letter(text: str) -> Tuple[str, ...]:
+            # Each option text is formatted once per position and shared by every template
+            if text not in lettered:
+                lettered[text] = tuple(sys.intern(f"{option_letter}) {text}") for option_letter in OPTION_LETTERS)
+            return lettered[text]
+
+        facets = {}
+        for level_key, level_facets in sources.items():
+            facets[level_key] = tuple(
+                tuple(
+                    BankQuestion(sys.intern(question), (letter(correct),) + tuple(letter(d) for d in distractors))
+                    for question in facet["questions"]
+                    for correct in facet["correct"]
+                    for distractors in combinations(facet["distractors"], DISTRACTORS_PER_QUESTION)
+                )
+                for facet in level_facets
+            )
+        return cls(facets)
+
+    def size(self, level_key: str) -> int:
+        """Number of templates for a level."""
+        return sum(len(templates) for templates in self._facets.get(level_key, ()))
+
+    def max_questions(self, level_key: str) -> int:
+        """Largest quiz a level can produce (one question per facet)."""
+        return len(self._level(level_key))
+
+    def sample(self, level_key: str, k: int, seed: Union[int, str]) -> List[Tuple[str, Tuple[str, ...], str]]:
+        """
+        Draw a quiz: k questions from distinct facets, each with shuffled options.
+
+        Work is proportional to k, not to the size of the bank.
+
+        Args:
+            level_key: Lowercase learning level (unknown levels use beginner)
+            k: Number of questions (capped at max_questions)
+            seed: Per-student seed; the same seed always gives the same quiz
+
+        Returns:
+            (question template, lettered options, correct answer letter) per question
+        """
+        facets = self._level(level_key)
+        rng = random.Random(f"{level_key}:{seed}")
+        quiz = []
+        for facet_index in rng.sample(range(len(facets)), min(k, len(facets))):
+            templates = facets[facet_index]
+            template = templates[rng.randrange(len(templates))]
+            order = list(range(len(OPTION_LETTERS)))
+            rng.shuffle(order)
+            options = tuple(template.options[option][position] for position, option in enumerate(order))
+            quiz.append((template.question, options, OPTION_LETTERS[order.index(0)]))
+        return quiz
+
+    def _level(self, level_key: str) -> Tuple[Tuple[BankQuestion, ...], ...]:
+        return self._facets.get(level_key) or self._facets["beginner"]
+
+
+# Compiled once per process
+question_bank = QuestionBank.build(QUESTION_BANK)
@@ -0,0 +1,99 @@
+"""
+EduAssist AI - Content Records
+Compact, immutable record types for quiz questions, study plan weeks and
+knowledge base entries. Records use __slots__, intern their strings so
+repeated text (shared distractors, key points) is stored once, and read
+like dictionaries so existing q.get(...) / data["definition"] code works.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, Tuple
+import sys
+
+
+def intern_all(strings: Iterable[str]) -> Tuple[str, ...]:
+    """Intern every string so identical text shares one object."""
+    return tuple(sys.intern(s) for s in strings)
+
+
+class _Record(Mapping):
+    """Read-only mapping view over a slotted record's fields."""
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __reduce__(self):
+        # Frozen slotted instances cannot use the default setattr-based unpickling
+        return (type(self), tuple(getattr(self, name) for name in self.__slots__))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain, JSON-serializable dictionary with lists in place of tuples."""
+        return {
+            name: list(value) if isinstance(value, tuple) else value
+            for name, value in zip(self.__slots__, (getattr(self, n) for n in self.__slots__))
+        }
+
+
+@dataclass(frozen=True, eq=False)
+class QuizQuestion(_Record):
+    """One multiple-choice question."""
+    __slots__ = ("question", "options", "correct_answer")
+    question: str
+    options: Tuple[str, ...]
+    correct_answer: str
+
+    @classmethod
+    def create(cls, question: str, options: Iterable[str], correct_answer: str) -> "QuizQuestion":
+        return cls(sys.intern(question), intern_all(options), sys.intern(correct_answer))
+
+    @classmethod
+    def from_mapping(cls, data: Mapping) -> "QuizQuestion":
+        if isinstance(data, cls):
+            return data
+        return cls.create(data["question"], data["options"], data["correct_answer"])
+
+
+@dataclass(frozen=True, eq=False)
+class StudyWeek(_Record):
+    """One week of a study plan."""
+    __slots__ = ("week", "focus", "activities")
+    week: int
+    focus: str
+    activities: Tuple[str, ...]
+
+    @classmethod
+    def from_mapping(cls, data: Mapping) -> "StudyWeek":
+        return cls(data["week"], sys.intern(data["focus"]), intern_all(data["activities"]))
+
+
+@dataclass(frozen=True, eq=False)
+class TopicEntry(_Record):
+    """Knowledge base content for one topic at one level."""
+    __slots__ = ("definition", "key_points")
+    definition: str
+    key_points: Tuple[str, ...]
+
+    @classmethod
+    def from_mapping(cls, data: Mapping) -> "TopicEntry":
+        if isinstance(data, cls):
+            return data
+        return cls(sys.intern(data["definition"]), intern_all(data["key_points"]))
+
+
+def to_json_compatible(value: Any) -> Any:
+    """json.dumps default hook that serializes records (and other mappings) as plain dictionaries."""
+    if isinstance(value, _Record):
+        return value.to_dict()
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,275 @@
+"""
+EduAssist AI - Quiz Scoring Engine
+Vectorized grading of response matrices (students x questions) with NumPy,
+plus per-question difficulty and discrimination statistics that are kept
+up to date incrementally from running sums, without rescanning history
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+import threading
+
+import numpy as np
+
+
+OPTION_LETTERS = "ABCDEFGH"
+UNANSWERED = -1
+
+
+def encode_answers(responses) -> np.ndarray:
+    """
+    Encode answer letters as option indices.
+
+    Args:
+        responses: Array-like of option letters ("A", "b", ...), or of option
+            indices already; "" or None mark unanswered questions
+
+    Returns:
+        int8 array of the same shape, with UNANSWERED for blank answers and
+        letters or indices beyond the options
+
+    Raises:
+        ValueError: If an answer is neither a single letter, an index nor blank
+    """
+    array = np.asarray(responses)
+    if array.dtype.kind in "iu":
+        codes = array.astype(np.int16)
+    else:
+        if array.dtype == object:
+            is_answer = np.frompyfunc(lambda answer: answer is None or isinstance(answer, str), 1, 1)
+            if not is_answer(array).all():
+                raise ValueError("Answers must be option letters")
+            array = np.where(array == None, "", array).astype(str)  # noqa: E711 - elementwise comparison
+        if array.dtype.kind != "U":
+            raise ValueError("Answers must be option letters")
+        # Wider than one character only if some answer is; never truncate "AB" to "A"
+        if array.dtype.itemsize > 4 and (np.char.str_len(array) > 1).any():
+            raise ValueError("Each answer must be a single option letter")
+        letters = np.ascontiguousarray(array.astype("U1"))
+        codes = letters.view(np.uint32).reshape(letters.shape).astype(np.int16)
+        codes = np.where((codes >= ord("a")) & (codes <= ord("z")), codes - 32, codes) - ord("A")
+    codes[(codes < 0) | (codes >= len(OPTION_LETTERS))] = UNANSWERED
+    return codes.astype(np.int8)
+
+
+def grade(responses, answer_key) -> np.ndarray:
+    """
+    Grade a response matrix against an answer key.
+
+    Args:
+        responses: students x questions array-like of answers (see encode_answers)
+        answer_key: One correct answer per question
+
+    Returns:
+        Boolean students x questions matrix, True where the answer is correct
+
+    Raises:
+        ValueError: If the responses or the answer key are malformed
+    """
+    codes = encode_answers(responses)
+    if codes.ndim == 1:
+        codes = codes[np.newaxis, :]
+    if codes.ndim != 2:
+        raise ValueError("Responses must be one submission or one list of answers per student")
+    key = encode_answers(answer_key)
+    if (key == UNANSWERED).any():
+        raise ValueError("Answer key contains blank or invalid answers")
+    if codes.shape[1] != key.shape[0]:
+        raise ValueError(f"Expected {key.shape[0]} answers per submission, got {codes.shape[1]}")
+    return codes == key
+
+
+class ItemStatistics:
+    """
+    Running per-question statistics for a pool of questions.
+
+    A pool is every quiz drawn for one topic and level: each submission
+    updates only the questions it was asked, identified by id (their text),
+    so students with different question bank draws add to the same
+    questions' statistics. Only sums are stored (answers, correct answers,
+    rest scores and their squares and cross products), so each update costs
+    O(students x questions) for the new batch alone. Discrimination is the
+    corrected point-biserial correlation between answering a question
+    correctly and the score on the other questions of the same submission.
+    """
+
+    def __init__(self):
+        self.item_ids: List[Hashable] = []
+        self._columns: Dict[Hashable, int] = {}
+        self.submissions = 0
+        self.score_total = 0
+        self._answered = np.zeros(0, dtype=np.int64)
+        self._correct = np.zeros(0, dtype=np.int64)
+        self._rest = np.zeros(0, dtype=np.int64)
+        self._rest_sq = np.zeros(0, dtype=np.int64)
+        self._correct_rest = np.zeros(0, dtype=np.int64)
+
+    @property
+    def n_items(self) -> int:
+        """Questions answered at least once."""
+        return len(self.item_ids)
+
+    def update(self, correct: np.ndarray, item_ids: Optional[Sequence[Hashable]] = None) -> None:
+        """
+        Fold a graded batch into the sums.
+
+        Args:
+            correct: students x questions boolean matrix
+            item_ids: Id of each question (column); question numbers 1..n by default
+        """
+        correct = np.asarray(correct, dtype=bool)
+        if correct.ndim != 2:
+            raise ValueError(f"Expected a students x questions matrix, got shape {correct.shape}")
+        item_ids = list(range(1, correct.shape[1] + 1) if item_ids is None else item_ids)
+        if correct.shape[1] != len(item_ids):
+            raise ValueError(f"Expected {len(item_ids)} questions, got {correct.shape[1]}")
+        if len(set(item_ids)) != len(item_ids):
+            raise ValueError("A quiz cannot ask the same question twice")
+        x = correct.astype(np.int64)
+        totals = x.sum(axis=1)
+        rest = totals[:, np.newaxis] - x
+
+        # Every sum changes together or, if anything fails first, none does
+        deltas = (x.sum(axis=0), rest.sum(axis=0), (rest * rest).sum(axis=0), (x * rest).sum(axis=0))
+        columns = self._columns_of(item_ids)
+        self.submissions += correct.shape[0]
+        self.score_total += int(totals.sum())
+        self._answered[columns] += correct.shape[0]
+        self._correct[columns] += deltas[0]
+        self._rest[columns] += deltas[1]
+        self._rest_sq[columns] += deltas[2]
+        self._correct_rest[columns] += deltas[3]
+
+    def _columns_of(self, item_ids: List[Hashable]) -> np.ndarray:
+        new = [item_id for item_id in item_ids if item_id not in self._columns]
+        if new:
+            for item_id in new:
+                self._columns[item_id] = len(self.item_ids)
+                self.item_ids.append(item_id)
+            grow = np.zeros(len(new), dtype=np.int64)
+            self._answered, self._correct, self._rest, self._rest_sq, self._correct_rest = (
+                np.concatenate([sums, grow]) for sums in
+                (self._answered, self._correct, self._rest, self._rest_sq, self._correct_rest)
+            )
+        return np.array([self._columns[item_id] for item_id in item_ids], dtype=np.intp)
+
+    @property
+    def difficulty(self) -> np.ndarray:
+        """Proportion of answers to each question that were correct (higher is easier)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self._answered > 0, self._correct / self._answered, np.nan)
+
+    @property
+    def discrimination(self) -> np.ndarray:
+        """Corrected point-biserial correlation per question (NaN while undefined)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n = self._answered
+            p = self._correct / n
+            mean_rest = self._rest / n
+            covariance = self._correct_rest / n - p * mean_rest
+            variance = p * (1 - p) * (self._rest_sq / n - mean_rest ** 2)
+            return np.where((n > 0) & (variance > 0), covariance / np.sqrt(variance), np.nan)
+
+    def summary(self, item_ids: Optional[Iterable[Hashable]] = None) -> List[Dict]:
+        """One row per question (the given ones, in order, or all) with its answers, difficulty and discrimination."""
+        difficulty, discrimination = self.difficulty, self.discrimination
+        rows = []
+        for item_id in (self.item_ids if item_ids is None else item_ids):
+            column = self._columns.get(item_id)
+            p = np.nan if column is None else difficulty[column]
+            r = np.nan if column is None else discrimination[column]
+            rows.append({
+                "question": item_id,
+                "answers": 0 if column is None else int(self._answered[column]),
+                "difficulty": None if np.isnan(p) else round(float(p), 4),
+                "discrimination": None if np.isnan(r) else round(float(r), 4)
+            })
+        return rows
+
+
+class ScoringEngine:
+    """Thread-safe grader that keeps ItemStatistics per question pool, for the most recently graded pools."""
+
+    def __init__(self, max_pools: int = 1024):
+        """
+        Args:
+            max_pools: Pools kept; the least recently graded one is dropped beyond this
+        """
+        self.max_pools = max_pools
+        self._stats: "OrderedDict[str, ItemStatistics]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def score(self, quiz_id: str, responses, answer_key: Sequence[str], record: bool = True,
+              item_ids: Optional[Sequence[Hashable]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Grade submissions and record them in their question pool's item statistics.
+
+        Args:
+            quiz_id: Identifies the question pool whose statistics are updated (see quiz_stats_key)
+            responses: students x questions answers (a single submission may be 1-D)
+            answer_key: Correct answer per question
+            record: Update the item statistics (False only grades, e.g. for resubmissions)
+            item_ids: Id of each question in the pool (see quiz_item_ids); question numbers by default
+
+        Returns:
+            Tuple of the boolean correctness matrix and each student's score
+
+        Raises:
+            ValueError: If the responses, answer key or item ids do not fit together
+        """
+        correct = grade(responses, answer_key)
+        if not record:
+            return correct, correct.sum(axis=1)
+        with self._lock:
+            stats = self._stats.get(quiz_id)
+            if stats is None:
+                stats = self._stats[quiz_id] = ItemStatistics()
+                if len(self._stats) > self.max_pools:
+                    self._stats.popitem(last=False)
+            self._stats.move_to_end(quiz_id)
+            stats.update(correct, item_ids)
+        return correct, correct.sum(axis=1)
+
+    def statistics(self, quiz_id: str) -> Optional[ItemStatistics]:
+        """Return the statistics recorded for a question pool, or None if it was never graded (or dropped)."""
+        with self._lock:
+            return self._stats.get(quiz_id)
+
+    def quizzes(self) -> List[str]:
+        """Identifiers of every question pool with statistics."""
+        with self._lock:
+            return sorted(self._stats)
+
+    def reset(self, quiz_ids: Optional[Iterable[str]] = None) -> None:
+        """Forget the statistics of some question pools (all by default)."""
+        with self._lock:
+            if quiz_ids is None:
+                self._stats.clear()
+            else:
+                for quiz_id in quiz_ids:
+                    self._stats.pop(quiz_id, None)
+
+
+def quiz_stats_key(topic: str, level: str) -> str:
+    """
+    Statistics key of the questions asked for (topic, level).
+
+    Every quiz for the pair, the fixed one and each question bank draw,
+    shares the key, so a question's statistics grow with every student it
+    is asked to, whatever else their quiz contained.
+    """
+    return f"{topic.lower().strip()}/{level.lower()}"
+
+
+def quiz_item_ids(quiz: Iterable) -> List[str]:
+    """Ids of generated quiz questions for the item statistics: their text, the same in every draw."""
+    return [q["question"] for q in quiz]
+
+
+def quiz_answer_key(quiz: Iterable) -> List[str]:
+    """Correct answer letters of generated quiz questions."""
+    return [q["correct_answer"] for q in quiz]
+
+
+# Process-wide engine used by the app and the JSON service
+scoring_engine = ScoringEngine()
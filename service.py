@@ -0,0 +1,409 @@
+"""
+EduAssist AI - Headless JSON Service
+Exposes the backend generators over HTTP without the Streamlit UI
+
+Run with:
+    python service.py --port 8000 --workers 4
+
+Endpoints (topic/level as query parameters or a JSON body):
+    GET  /health
+    GET  /metrics            (Prometheus text; enable with EDUASSIST_METRICS=1)
+    GET  /explanation?topic=...&level=...
+    GET  /quiz?topic=...&level=...[&seed=...&num_questions=...]
+    GET  /study-plan?topic=...&level=...
+    GET  /content?topic=...&level=...[&split=1]
+    GET  /skeleton?topic=...&level=...&section=...
+    POST any of the above with {"topic": "...", "level": "..."}
+    POST /grade              {"topic": "...", "level": "...", "responses": [["A", "B", ...], ...]}
+                             (plus "seed"/"num_questions" when grading a question bank draw)
+
+Content responses carry an ETag derived from their section digests, the
+same on every worker, and a GET with a matching If-None-Match gets 304 Not
+Modified. With split=1, /content returns each section's skeleton digest and
+the topic's substitutions instead of the text; a client fetches a skeleton
+from /skeleton only the first time it sees its digest (see content_hash.py).
+"""
+
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+
+import backend
+from content_hash import combine_digests, content_digest, section_digest, substitutions
+from metrics import metrics
+from records import to_json_compatible
+from scoring import quiz_answer_key, quiz_item_ids, quiz_stats_key, scoring_engine
+from backend import (
+    SECTIONS,
+    content_skeleton,
+    generate_all_content,
+    generate_explanation,
+    generate_quiz,
+    generate_study_plan,
+    get_content_cache_stats,
+    max_quiz_questions,
+    render_metrics
+)
+
+
+LEVELS = ("beginner", "intermediate", "advanced")
+
+ROUTES = {
+    "/explanation": lambda topic, level: {"explanation": generate_explanation(topic, level)},
+    "/quiz": lambda topic, level, **options: {"quiz": generate_quiz(topic, level, **options)},
+    "/study-plan": lambda topic, level: {"study_plan": generate_study_plan(topic, level)},
+    "/content": generate_all_content
+}
+ROUTE_SECTIONS = {"/explanation": "explanation", "/quiz": "quiz", "/study-plan": "study_plan"}
+SKELETON_PATH = "/skeleton"
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+MAX_GRADE_BODY_BYTES = 16 * 1024 * 1024  # Room for a whole district's quiz sitting
+GRADE_PATH = "/grade"
+QUIZ_PATHS = ("/quiz", GRADE_PATH)
+MAX_QUIZ_QUESTIONS = 20
+KEEP_ALIVE_TIMEOUT = 15
+BODY_TIMEOUT = 30  # Seconds a client has to send the body it announced
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPError(Exception):
+    """An error that maps directly to an HTTP response."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _quiz_options(params: Dict, level: str) -> Dict:
+    """Validate the optional question bank parameters of /quiz and /grade."""
+    options = {}
+    seed = params.get("seed")
+    if seed is not None:
+        if isinstance(seed, bool) or not isinstance(seed, (str, int)) or seed == "":
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Parameter 'seed' must be a string or an integer")
+        options["seed"] = seed
+    if "num_questions" in params:
+        try:
+            num_questions = int(params["num_questions"])
+        except (TypeError, ValueError):
+            num_questions = 0
+        # More than the quiz has would be silently cut short
+        most = min(MAX_QUIZ_QUESTIONS, max_quiz_questions(level, seed))
+        if not 1 <= num_questions <= most:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Parameter 'num_questions' must be between 1 and {most}")
+        options["num_questions"] = num_questions
+    return options
+
+
+def grade_submissions(topic: str, level: str, responses, seed=None, num_questions: int = 5) -> Dict:
+    """
+    Grade a batch of quiz submissions and update the quiz's item statistics.
+
+    Args:
+        topic: The quiz topic
+        level: The quiz level
+        responses: One list of answer letters per student
+        seed: Question bank seed the quiz was drawn with (None for the fixed quiz)
+        num_questions: Number of questions the quiz was drawn with
+
+    Returns:
+        Scores per submission plus per-question difficulty and discrimination
+    """
+    if not isinstance(responses, list) or not responses or not all(isinstance(row, list) for row in responses):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Parameter 'responses' must be a non-empty list of answer lists")
+    quiz = generate_quiz(topic, level, seed, num_questions)
+    key, item_ids = quiz_stats_key(topic, level), quiz_item_ids(quiz)
+    try:
+        _, scores = scoring_engine.score(key, responses, quiz_answer_key(quiz), item_ids=item_ids)
+    except ValueError as e:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+    stats = scoring_engine.statistics(key)
+    return {
+        "scores": scores.tolist(),
+        "max_score": len(quiz),
+        "submissions": stats.submissions,
+        "items": stats.summary(item_ids)
+    }
+
+
+def _etag(path: str, payload) -> str:
+    """Strong ETag for a content response, from section digests rather than the serialized body."""
+    if path in ROUTE_SECTIONS:
+        section = ROUTE_SECTIONS[path]
+        return f'"{section_digest(section, payload[section])}"'
+    return f'"{combine_digests(payload.digest(section) for section in SECTIONS)}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def split_content(topic: str, level: str) -> Tuple[Dict, str]:
+    """
+    A pair's content as skeleton digests plus substitutions, and its ETag.
+
+    Returns:
+        Tuple of the payload ({"substitutions": ..., "sections": {section: skeleton digest}})
+        and its ETag
+    """
+    values = substitutions(topic, level)
+    digests = {section: content_skeleton(topic, level, section).digest for section in SECTIONS}
+    encoded = json.dumps(values, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    etag = f'"split-{combine_digests([*digests.values(), content_digest(encoded)])}"'
+    return {"substitutions": values, "sections": digests}, etag
+
+
+def handle_request(method: str, target: str, body: bytes,
+                   headers: Optional[Dict[str, str]] = None) -> Tuple[HTTPStatus, Union[Dict, str, None], Optional[str]]:
+    """
+    Route one request to the matching backend generator.
+
+    Args:
+        method: HTTP method
+        target: Request target (path and query string)
+        body: Raw request body
+        headers: Request headers with lowercase names (for If-None-Match)
+
+    Returns:
+        Tuple of HTTP status, JSON-serializable payload (plain text, or None
+        for 304 Not Modified) and the content's ETag (None if it has none)
+    """
+    url = urlsplit(target)
+    path = url.path.rstrip("/") or "/"
+
+    if path == "/health":
+        return HTTPStatus.OK, {"status": "ok", "pid": os.getpid(), "cache": get_content_cache_stats()}, None
+    if path == "/metrics":
+        return HTTPStatus.OK, render_metrics(), None
+
+    generator = ROUTES.get(path)
+    if generator is None and path not in (GRADE_PATH, SKELETON_PATH):
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown endpoint: {path}")
+    if path == GRADE_PATH and method != "POST":
+        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{path} only accepts POST")
+    if method not in ("GET", "POST"):
+        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not supported")
+
+    params = dict(parse_qsl(url.query))
+    if method == "POST" and body:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be valid JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+        params.update(payload)
+
+    topic = params.get("topic")
+    level = params.get("level", "Beginner")
+    if not isinstance(topic, str) or not topic.strip():
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Parameter 'topic' is required")
+    if not isinstance(level, str) or level.lower() not in LEVELS:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Parameter 'level' must be one of {', '.join(LEVELS)}")
+
+    options = _quiz_options(params, level) if path in QUIZ_PATHS else {}
+    if path == GRADE_PATH:
+        return HTTPStatus.OK, grade_submissions(topic, level, params.get("responses"), **options), None
+    if path == SKELETON_PATH:
+        section = params.get("section")
+        if section not in SECTIONS:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Parameter 'section' must be one of {', '.join(SECTIONS)}")
+        skeleton = content_skeleton(topic, level, section)
+        payload, etag = skeleton.to_json(), f'"{skeleton.digest}"'
+    elif path == "/content" and params.get("split") in ("1", "true", 1, True):
+        payload, etag = split_content(topic, level)
+    else:
+        payload = generator(topic, level, **options)
+        etag = _etag(path, payload)
+    if method == "GET" and _etag_matches((headers or {}).get("if-none-match"), etag):
+        return HTTPStatus.NOT_MODIFIED, None, etag
+    return HTTPStatus.OK, payload, etag
+
+
+def _response(status: HTTPStatus, payload: Union[Dict, str, None], keep_alive: bool,
+              etag: Optional[str] = None) -> bytes:
+    etag_header = f"ETag: {etag}\r\n" if etag is not None else ""
+    if payload is None:
+        # 304 Not Modified has no body
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"{etag_header}"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        return head.encode("latin-1")
+    if isinstance(payload, str):
+        body = payload.encode("utf-8")
+        content_type = "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body = json.dumps(payload, ensure_ascii=False, default=to_json_compatible).encode("utf-8")
+        content_type = "application/json; charset=utf-8"
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"{etag_header}"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    try:
+        raw = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Headers too large")
+
+    lines = raw.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", "0") or 0)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length < 0:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    # Only Content-Length framing is read; a chunked body would otherwise be
+    # left on the connection and parsed as the next request
+    if "transfer-encoding" in headers:
+        raise HTTPError(HTTPStatus.NOT_IMPLEMENTED, "Transfer-Encoding is not supported; send a Content-Length")
+    # Checked before reading, so an oversized body is never buffered
+    limit = MAX_GRADE_BODY_BYTES if urlsplit(target).path.rstrip("/") == GRADE_PATH else MAX_BODY_BYTES
+    if length > limit:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Request body too large (at most {limit} bytes)")
+    if not length:
+        return method.upper(), target, headers, b""
+    try:
+        body = await asyncio.wait_for(reader.readexactly(length), BODY_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPError(HTTPStatus.REQUEST_TIMEOUT, "Request body not received in time")
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    return method.upper(), target, headers, body
+
+
+async def _serve_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            keep_alive = False
+            etag = None
+            try:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                if backend.content_backend.rule_based and urlsplit(target).path.rstrip("/") != GRADE_PATH:
+                    status, payload, etag = handle_request(method, target, body, headers)
+                else:
+                    # A slower backend, or grading a body of up to MAX_GRADE_BODY_BYTES, is
+                    # awaited in a thread, so this loop keeps serving other connections
+                    status, payload, etag = await asyncio.get_running_loop().run_in_executor(
+                        None, handle_request, method, target, body, headers)
+            except HTTPError as e:
+                status, payload = e.status, {"error": e.message}
+            except Exception:
+                # The details stay in the log; they may name files or internals
+                logger.exception("Unhandled error serving a request")
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+            metrics.inc("eduassist_http_requests_total", status=str(status.value))
+            writer.write(_response(status, payload, keep_alive, etag))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _serve(sock: socket.socket) -> None:
+    server = await asyncio.start_server(_serve_connection, sock=sock, limit=MAX_HEADER_BYTES)
+    async with server:
+        await server.serve_forever()
+
+
+def _run_worker(sock: socket.socket) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    try:
+        asyncio.run(_serve(sock))
+    except KeyboardInterrupt:
+        pass
+
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers: int = 1) -> None:
+    """
+    Serve the JSON API, forking worker processes that share one listening socket.
+
+    Args:
+        host: Interface to bind
+        port: TCP port to bind
+        workers: Number of worker processes, each running its own event loop
+    """
+    sock = socket.create_server((host, port), backlog=1024)
+    sock.setblocking(False)
+    print(f"EduAssist AI service listening on http://{host}:{port} with {workers} worker(s)")
+
+    if workers <= 1:
+        try:
+            asyncio.run(_serve(sock))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    # Platforms stop dynos with SIGTERM; turn it into a clean shutdown of every worker
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_run_worker, args=(sock,), daemon=True) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="EduAssist AI headless JSON service")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
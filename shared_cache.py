@@ -0,0 +1,299 @@
+"""
+EduAssist AI - Shared Content Cache
+Host-wide second cache tier in a SQLite file, so several app or service
+processes on one machine generate each popular (topic, level) pair once
+instead of once per process
+
+Sections are stored individually, as a reference to their skeleton (see
+content_hash.py) next to a stamp naming the knowledge base content they were
+built from. Skeletons are stored once per digest, so the many topics that
+share a study plan or fall back to the default entry cost one small row each. A reader only accepts a
+section whose stamp matches what it would generate from now, so processes
+that reload the knowledge base at slightly different moments never serve
+each other stale content. Rows from other code versions live under their
+own namespace and age out through normal eviction.
+
+The file runs in WAL mode: readers never block each other or the writer,
+and writes are short transactions that also keep a running byte total
+and evict the least recently used rows once it passes the limit.
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+import os
+import sqlite3
+import threading
+import time
+
+from content_hash import ContentSkeleton, substitutions
+from topic_index import TopicMatch
+
+
+SCHEMA_VERSION = 2     # Files with another version are emptied and recreated on open
+
+SCHEMA = (
+    "DROP TABLE IF EXISTS sections",
+    "DROP TABLE IF EXISTS skeletons",
+    "DROP TABLE IF EXISTS usage",
+    """CREATE TABLE sections (
+        namespace TEXT NOT NULL,
+        topic_key TEXT NOT NULL,
+        level_key TEXT NOT NULL,
+        topic TEXT NOT NULL,
+        section INTEGER NOT NULL,
+        stamp TEXT NOT NULL,
+        source_key TEXT NOT NULL,
+        exact INTEGER NOT NULL,
+        skeleton TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        accessed REAL NOT NULL,
+        UNIQUE (namespace, topic_key, level_key, topic, section)
+    )""",
+    "CREATE INDEX sections_accessed ON sections (accessed)",
+    "CREATE INDEX sections_source ON sections (source_key)",
+    "CREATE INDEX sections_skeleton ON sections (skeleton)",
+    """CREATE TABLE skeletons (
+        digest TEXT PRIMARY KEY,
+        section TEXT NOT NULL,
+        template BLOB NOT NULL,
+        size INTEGER NOT NULL
+    )""",
+    "CREATE TABLE usage (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL)",
+    "INSERT INTO usage VALUES (0, 0)"
+)
+
+ROW_OVERHEAD = 96   # Approximate bytes per row beyond its text, for the size limit
+
+
+class SharedContentCache:
+    """
+    Content sections shared by every process that opens the same file.
+
+    All methods are best effort: if the file is busy beyond the timeout or
+    unreadable, reads miss and writes are skipped, and generation carries on.
+    """
+
+    BUSY_TIMEOUT = 0.2      # Seconds to wait for the write lock before giving up
+    TOUCH_INTERVAL = 60.0   # Recency of a row is refreshed at most this often, to keep reads read-only
+    EVICT_TO = 0.9          # Eviction frees space down to this fraction of max_bytes
+
+    def __init__(self, path: str, max_bytes: int = 64 * 2 ** 20, sections: int = 3, namespace: str = ""):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.sections = sections
+        self.namespace = namespace
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+        connection = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("BEGIN IMMEDIATE")
+            if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                for statement in SCHEMA:
+                    connection.execute(statement)
+                connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+    def get(self, key: Tuple[str, str, str], stamp: str) -> Optional[List]:
+        """
+        Read every cached section of a content entry.
+
+        Args:
+            key: Content cache key (topic key, level key, topic as typed)
+            stamp: What the caller would generate from now (see backend._content_stamp)
+
+        Returns:
+            One slot per section (None where missing or stale), or None if nothing matched
+        """
+        try:
+            connection = self._connection()
+            rows = connection.execute(
+                "SELECT sections.rowid, sections.section, stamp, skeletons.section, template, accessed "
+                "FROM sections JOIN skeletons ON skeletons.digest = sections.skeleton "
+                "WHERE namespace = ? AND topic_key = ? AND level_key = ? AND topic = ?",
+                (self.namespace, *key)
+            ).fetchall()
+            entry = [None] * self.sections
+            values = substitutions(key[2], key[1])
+            now = time.time()
+            touch = []
+            for rowid, index, row_stamp, section, template, accessed in rows:
+                if row_stamp == stamp and 0 <= index < self.sections:
+                    entry[index] = ContentSkeleton.decode(section, template).render(values)
+                    if now - accessed > self.TOUCH_INTERVAL:
+                        touch.append((now, rowid))
+        except (sqlite3.Error, ValueError, KeyError):
+            self._count("errors")
+            return None
+        if touch:
+            try:
+                connection.executemany("UPDATE sections SET accessed = ? WHERE rowid = ?", touch)
+            except sqlite3.Error:
+                pass    # Recency is advisory; a busy writer must not turn a hit into a miss
+        found = any(value is not None for value in entry)
+        self._count("hits" if found else "misses")
+        return entry if found else None
+
+    def put(self, key: Tuple[str, str, str], index: int, skeleton: ContentSkeleton, stamp: str,
+            source: TopicMatch) -> None:
+        """
+        Store one generated section as its skeleton, evicting least recently used rows past the size limit.
+
+        Args:
+            key: Content cache key; the topic as typed and the level give the substitutions
+            index: Position of the section in a content entry
+            skeleton: The section's skeleton (content_skeleton in backend.py)
+            stamp: Knowledge base content the section was generated from
+            source: Topic match the section was generated for, for per-topic invalidation
+        """
+        data = skeleton.encode()
+        size = len(key[2]) + ROW_OVERHEAD
+        skeleton_size = len(data) + ROW_OVERHEAD
+        if size + skeleton_size > self.max_bytes:
+            return
+        try:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                old = connection.execute(
+                    "DELETE FROM sections WHERE namespace = ? AND topic_key = ? AND level_key = ? "
+                    "AND topic = ? AND section = ? RETURNING size, skeleton",
+                    (self.namespace, *key, index)
+                ).fetchall()
+                connection.execute(
+                    "INSERT INTO sections VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (self.namespace, *key, index, stamp, source.key, int(source.exact), skeleton.digest,
+                     size, time.time())
+                )
+                added = size + (skeleton_size if connection.execute(
+                    "INSERT OR IGNORE INTO skeletons VALUES (?, ?, ?, ?)",
+                    (skeleton.digest, skeleton.section, data, skeleton_size)
+                ).rowcount else 0)
+                freed = sum(old_size for old_size, _ in old)
+                freed += self._drop_orphans(connection, (digest for _, digest in old))
+                total = connection.execute(
+                    "UPDATE usage SET bytes = bytes + ? WHERE id = 0 RETURNING bytes", (added - freed,)
+                ).fetchall()[0][0]
+                if total > self.max_bytes:
+                    self._evict(connection, total)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            self._count("errors")
+            return
+        self._count("writes")
+
+    def invalidate(self, topic_key: Optional[str] = None, level_key: Optional[str] = None) -> int:
+        """Delete rows for a normalized topic and/or level (every row by default)."""
+        where = " AND ".join(
+            clause for clause, value in (("topic_key = ?", topic_key), ("level_key = ?", level_key))
+            if value is not None
+        )
+        params = tuple(value for value in (topic_key, level_key) if value is not None)
+        return self._delete(where or "1", params)
+
+    def invalidate_topics(self, topic_keys: FrozenSet[str], unmatched: bool = False) -> int:
+        """Delete rows generated from some knowledge base topics (see ContentCache.invalidate_topics)."""
+        where = f"source_key IN ({','.join('?' * len(topic_keys))})" if topic_keys else "0"
+        if unmatched:
+            where += " OR exact = 0"
+        return self._delete(where, tuple(topic_keys))
+
+    def stats(self) -> Dict[str, int]:
+        """This process's hit, miss, write, eviction and error counts, plus the file's rows, skeletons and bytes."""
+        with self._stats_lock:
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "errors": self.errors
+            }
+        try:
+            connection = self._connection()
+            stats["entries"] = connection.execute("SELECT COUNT(*) FROM sections").fetchone()[0]
+            stats["skeletons"] = connection.execute("SELECT COUNT(*) FROM skeletons").fetchone()[0]
+            stats["bytes"] = connection.execute("SELECT bytes FROM usage").fetchone()[0]
+        except sqlite3.Error:
+            pass
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+    def _evict(self, connection: sqlite3.Connection, total: int) -> None:
+        target = int(self.max_bytes * self.EVICT_TO)
+        evicted = freed = 0
+        while total - freed > target:
+            # A skeleton's bytes count as freed once its last section is picked,
+            # so a batch stops as soon as it has made enough room
+            oldest = connection.execute(
+                "SELECT sections.rowid, sections.size, skeleton, skeletons.size, "
+                "(SELECT COUNT(*) FROM sections AS other WHERE other.skeleton = sections.skeleton) "
+                "FROM sections JOIN skeletons ON skeletons.digest = sections.skeleton "
+                "ORDER BY accessed LIMIT 64"
+            ).fetchall()
+            if not oldest:
+                break
+            victims, references, batch = [], {}, 0
+            for rowid, size, digest, skeleton_size, count in oldest:
+                victims.append(rowid)
+                references[digest] = references.get(digest, count) - 1
+                batch += size + (skeleton_size if references[digest] == 0 else 0)
+                if total - freed - batch <= target:
+                    break
+            connection.execute(f"DELETE FROM sections WHERE rowid IN ({','.join('?' * len(victims))})", victims)
+            freed += sum(size for _, size, *_ in oldest[:len(victims)])
+            freed += self._drop_orphans(connection, references)
+            evicted += len(victims)
+        connection.execute("UPDATE usage SET bytes = bytes - ? WHERE id = 0", (freed,))
+        self._count("evictions", evicted)
+
+    def _drop_orphans(self, connection: sqlite3.Connection, digests: Iterable[str]) -> int:
+        # Skeletons go once no section refers to them; returns the bytes freed
+        freed = 0
+        for digest in set(digests):
+            freed += sum(size for (size,) in connection.execute(
+                "DELETE FROM skeletons WHERE digest = ? AND NOT EXISTS "
+                "(SELECT 1 FROM sections WHERE skeleton = ?) RETURNING size",
+                (digest, digest)
+            ).fetchall())
+        return freed
+
+    def _delete(self, where: str, params: tuple) -> int:
+        try:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = connection.execute(f"DELETE FROM sections WHERE {where} RETURNING size, skeleton",
+                                          params).fetchall()
+                freed = sum(size for size, _ in rows) + self._drop_orphans(connection, (d for _, d in rows))
+                connection.execute("UPDATE usage SET bytes = bytes - ? WHERE id = 0", (freed,))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            self._count("errors")
+            return 0
+        return len(rows)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections are per thread, and reopened in forked worker processes
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.BUSY_TIMEOUT, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _count(self, name: str, value: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + value)
@@ -0,0 +1,122 @@
+"""
+EduAssist AI - Single-Flight Request Coalescing
+Concurrent calls for the same key share one in-flight computation instead
+of each starting their own, e.g. when a whole class opens the same topic
+at the same moment and the cache is still cold
+
+Flights are concurrent.futures futures, so callers coalesce across threads
+(how Streamlit serves sessions) and across event loops: threads block on
+the result and coroutines await it without blocking their loop.
+"""
+
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+import asyncio
+import threading
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time; callers arriving while
+    it runs wait for it and get the same result (or exception).
+
+    Do not call the blocking ``do`` from an event loop thread whose own
+    coroutine may be leading the flight; await ``do_async`` there instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # The future is only created once a second caller joins; most calls run alone
+        self._flights: Dict[Hashable, Optional[Future]] = {}
+        self.leaders = 0        # Calls that ran the computation
+        self.coalesced = 0      # Calls that waited on another call's computation
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Call fn, or wait for the identical call already in flight.
+
+        Args:
+            key: Identifies identical calls
+            fn: Computes the result
+
+        Returns:
+            fn's result, from this call or the one in flight
+        """
+        flight, leader = self._join(key)
+        if not leader:
+            return flight.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self.land(key, exception=e)
+            raise
+        self.land(key, result)
+        return result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Coroutine version of do: fn returns an awaitable, and waiting does not block the loop.
+
+        The computation runs as its own task, so cancelling any caller,
+        including the one that started it, leaves it running for the others.
+        """
+        flight, leader = self._join(key)
+        if leader:
+            task = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._land_task(key, done))
+            return await asyncio.shield(task)
+        return await asyncio.shield(asyncio.wrap_future(flight))
+
+    def lead(self, key: Hashable) -> bool:
+        """
+        Start a flight for key without a function to run, unless one is running.
+
+        For computations that are not a single call, such as a stream that is
+        consumed piece by piece. A True return must be followed by land(key, ...)
+        in every case, or callers of do() with this key wait forever.
+        """
+        with self._lock:
+            if key in self._flights:
+                return False
+            self._flights[key] = None
+            self.leaders += 1
+            return True
+
+    def land(self, key: Hashable, result: Any = None, exception: Optional[BaseException] = None) -> None:
+        """End the flight for key, handing result (or exception) to every caller waiting on it."""
+        # Later callers start a new flight (and normally hit the cache the leader filled)
+        with self._lock:
+            flight = self._flights.pop(key)
+        if flight is None:
+            return
+        if exception is not None:
+            flight.set_exception(exception)
+        else:
+            flight.set_result(result)
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Whether a computation for key is running."""
+        return key in self._flights
+
+    def stats(self) -> Dict[str, int]:
+        """Computations run, calls coalesced into them, and computations running now."""
+        with self._lock:
+            return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._flights)}
+
+    def _join(self, key: Hashable) -> Tuple[Optional[Future], bool]:
+        with self._lock:
+            if key in self._flights:
+                flight = self._flights[key]
+                if flight is None:
+                    flight = self._flights[key] = Future()
+                self.coalesced += 1
+                return flight, False
+            self._flights[key] = None
+            self.leaders += 1
+            return None, True
+
+    def _land_task(self, key: Hashable, task: asyncio.Future) -> None:
+        if task.cancelled():
+            self.land(key, exception=asyncio.CancelledError())
+        else:
+            self.land(key, task.result() if task.exception() is None else None, task.exception())
@@ -0,0 +1,82 @@
+"""Tests of admission control for bursts of generation requests."""
+
+import threading
+
+import pytest
+
+from admission import AdmissionController, QueueFull, RateLimited
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_requests_past_the_slots_queue_in_order(clock):
+    controller = AdmissionController(max_concurrent=2, max_queue=3, rate=0, clock=clock)
+    first, second, third, fourth = (controller.submit(f"s{n}") for n in range(4))
+    assert (first.admitted, second.admitted) == (True, True)
+    assert (third.position, fourth.position) == (1, 2)
+
+    clock.now = 2.0
+    first.release()
+    assert third.admitted and third.position == 0
+    assert fourth.position == 1
+    assert controller.stats()["queue_seconds_max"] == 2.0
+
+
+def test_leaving_the_queue_moves_the_others_up(clock):
+    controller = AdmissionController(max_concurrent=1, max_queue=3, rate=0, clock=clock)
+    active = controller.submit("a")
+    waiting = [controller.submit(name) for name in "bcd"]
+    waiting[0].release()
+    assert [ticket.position for ticket in waiting] == [0, 1, 2]
+    active.release()
+    assert waiting[1].admitted and not waiting[2].admitted
+    stats = controller.stats()
+    assert (stats["abandoned"], stats["active"], stats["waiting"]) == (1, 1, 1)
+
+
+def test_full_queue_rejects_with_a_retry_hint(clock):
+    controller = AdmissionController(max_concurrent=1, max_queue=1, rate=0, clock=clock)
+    with controller.submit("a"):
+        clock.now = 4.0
+    with controller.submit("a"):
+        controller.submit("b")
+        with pytest.raises(QueueFull) as error:
+            controller.submit("c")
+    assert error.value.retry_after == pytest.approx(8.0)
+    assert controller.stats()["rejected"] == 1
+
+
+def test_session_rate_limit_refills_over_time(clock):
+    controller = AdmissionController(max_concurrent=8, rate=0.5, burst=2, clock=clock)
+    controller.submit("a").release()
+    controller.submit("a").release()
+    with pytest.raises(RateLimited) as error:
+        controller.submit("a")
+    assert error.value.retry_after == pytest.approx(2.0)
+    # Other sessions have their own bucket
+    controller.submit("b").release()
+    clock.now = 2.0
+    controller.submit("a").release()
+    assert controller.stats()["rate_limited"] == 1
+
+
+def test_a_queued_ticket_waits_until_a_slot_frees():
+    controller = AdmissionController(max_concurrent=1, rate=0)
+    active = controller.submit("a")
+    queued = controller.submit("b")
+    assert not queued.wait(0.01)
+    threading.Timer(0.02, active.release).start()
+    assert queued.wait(5)
+    queued.release()
+    assert controller.stats()["active"] == 0
@@ -0,0 +1,124 @@
+"""Tests of the Streamlit page, run headlessly through AppTest."""
+
+import os
+
+from streamlit.testing.v1 import AppTest
+
+import backend
+import profiling
+from content_backends import ContentBackend
+from fragments import fragment_cache
+
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def run_page(**query) -> AppTest:
+    at = AppTest.from_file(APP, default_timeout=30)
+    for name, value in query.items():
+        at.query_params[name] = value
+    at.run()
+    assert not at.exception
+    return at
+
+
+def developer_panels(at: AppTest) -> list:
+    return [expander for expander in at.expander if "Developer metrics" in expander.label]
+
+
+def test_visitor_cannot_open_developer_panel(monkeypatch):
+    monkeypatch.delenv("EDUASSIST_DEV_PANEL", raising=False)
+    assert not developer_panels(run_page(dev="1"))
+
+
+def test_developer_panel_cannot_switch_instrumentation(monkeypatch):
+    monkeypatch.setenv("EDUASSIST_DEV_PANEL", "1")
+    at = run_page()
+    assert developer_panels(at)
+    assert not [toggle for toggle in at.toggle if toggle.label == "Enable instrumentation"]
+
+
+
+def generate_profiled(monkeypatch, directory, **query) -> AppTest:
+    """Generate a topic's page with profiles written to directory."""
+    finish = profiling.RequestProfile.finish
+    monkeypatch.setattr(profiling, "PROFILE_EVERY", 0)
+    monkeypatch.setattr(profiling.RequestProfile, "finish", lambda self, name: finish(self, name, str(directory)))
+    at = run_page(**query)
+    at.text_input[0].input("Photosynthesis")
+    at.button[0].click().run()
+    assert not at.exception
+    return at
+
+
+def profile_captions(at: AppTest) -> list:
+    return [caption.value for caption in at.caption if "Profile written" in caption.value]
+
+
+def test_visitor_cannot_request_a_profile(monkeypatch, tmp_path):
+    monkeypatch.delenv("EDUASSIST_DEV_PANEL", raising=False)
+    at = generate_profiled(monkeypatch, tmp_path, profile="1")
+    assert not list(tmp_path.iterdir())
+    assert not profile_captions(at)
+
+
+def test_profile_caption_shows_only_the_file_name(monkeypatch, tmp_path):
+    monkeypatch.setenv("EDUASSIST_DEV_PANEL", "1")
+    at = generate_profiled(monkeypatch, tmp_path, profile="1")
+    (prof,) = tmp_path.glob("*.prof")
+    assert profile_captions(at) == [f"🔬 Profile written to `{prof.stem}.*`"]
+
+
+def test_alias_shows_which_topic_it_matched():
+    at = run_page()
+    at.text_input[0].input("Calvin cycle")
+    at.button[0].click().run()
+    assert [info.value for info in at.info if "Showing results for **Photosynthesis**" in info.value]
+
+
+class QuizBackend(ContentBackend):
+    """A generator backend whose quiz is recognisably its own."""
+
+    name = "quiz-test"
+
+    async def explanation(self, topic: str, level: str) -> str:
+        return f"About {topic}."
+
+    async def quiz(self, topic: str, level: str):
+        return [{"question": f"Backend question on {topic}?", "options": ["A) Yes", "B) No"], "correct_answer": "A"}]
+
+    async def study_plan(self, topic: str, level: str) -> str:
+        return "Study it."
+
+
+def test_generator_backend_quiz_is_shown(monkeypatch):
+    monkeypatch.setattr(backend, "content_backend", QuizBackend())
+    backend.invalidate_content_cache()
+    try:
+        at = run_page()
+        at.text_input[0].input("Osmosis")
+        at.button[0].click().run()
+        at.toggle(key="show_quiz").set_value(True).run()
+        assert not at.exception
+        assert any("Backend question on Osmosis?" in block.value for block in at.markdown)
+        assert [radio.label for radio in at.radio if radio.label.startswith("Question")] == ["Question 1"]
+    finally:
+        backend.invalidate_content_cache()
+
+
+def test_shared_quiz_block_is_rendered_once(monkeypatch):
+    monkeypatch.setattr(backend, "content_backend", QuizBackend())
+    backend.invalidate_content_cache()
+    try:
+        for _ in range(2):
+            at = run_page()
+            at.text_input[0].input("Diffusion")
+            at.button[0].click().run()
+            before = fragment_cache.stats()
+            at.toggle(key="show_quiz").set_value(True).run()
+            assert not at.exception
+        after = fragment_cache.stats()
+        # The second session's page found the first session's block
+        assert after["hits"] > before["hits"] and after["misses"] == before["misses"]
+    finally:
+        backend.invalidate_content_cache()
@@ -0,0 +1,76 @@
+"""Tests for coalescing concurrent content generation."""
+
+import threading
+import time
+
+import pytest
+
+import backend
+
+
+@pytest.fixture
+def slow_explanation_stream(monkeypatch):
+    """Make the explanation stream slow and count how often it runs."""
+    calls = []
+    stream = backend._SECTION_STREAMS["explanation"]
+
+    def slow(topic, level):
+        calls.append(topic)
+        for chunk in stream(topic, level):
+            time.sleep(0.005)
+            yield chunk
+
+    monkeypatch.setitem(backend._SECTION_STREAMS, "explanation", slow)
+    backend.invalidate_content_cache()
+    yield calls
+    backend.invalidate_content_cache()
+
+
+def read_concurrently(read, sessions=40):
+    barrier = threading.Barrier(sessions)
+    results = []
+
+    def session():
+        content = backend.generate_all_content("Photosynthesis", "Beginner")
+        barrier.wait()
+        results.append(read(content))
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_streams_generate_a_section_once(slow_explanation_stream):
+    coalesced = backend.section_flights.coalesced
+    results = read_concurrently(lambda content: "".join(content.stream("explanation")))
+    assert len(slow_explanation_stream) == 1
+    assert backend.section_flights.coalesced - coalesced == 39
+    assert set(results) == {backend.generate_explanation("Photosynthesis", "Beginner")}
+
+
+def test_streams_and_lookups_share_one_generation(slow_explanation_stream):
+    def read(content):
+        if threading.get_ident() % 2:
+            return content["explanation"]
+        return "".join(content.stream("explanation"))
+
+    results = read_concurrently(read)
+    assert len(slow_explanation_stream) == 1
+    assert len(set(results)) == 1
+
+
+def test_abandoned_stream_still_serves_waiters(slow_explanation_stream):
+    content = backend.generate_all_content("Photosynthesis", "Beginner")
+    stream = content.stream("explanation")
+    next(stream)
+    waiter = []
+    thread = threading.Thread(target=lambda: waiter.append(content["explanation"]))
+    thread.start()
+    stream.close()
+    thread.join(timeout=5)
+    assert waiter == [backend.generate_explanation("Photosynthesis", "Beginner")]
+    assert content.is_ready("explanation")
+    assert len(slow_explanation_stream) == 1
@@ -0,0 +1,50 @@
+"""Tests of batch content generation."""
+
+import pytest
+
+import backend
+
+
+TOPICS = ["Photosynthesis", "Gravity", "Cells", "Volcanoes"]
+LEVELS = ["Beginner", "Intermediate", "Advanced"]
+
+
+def expected(pairs):
+    return [backend.generate_all_content(topic, level)["explanation"] for topic, level in pairs]
+
+
+def test_small_batch_keeps_order_and_generates_each_pair_once(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("a small batch must not start a process pool")
+    monkeypatch.setattr(backend, "ProcessPoolExecutor", no_pool)
+    generated = []
+    generate_pair = backend._generate_pair
+    monkeypatch.setattr(backend, "_generate_pair", lambda pair: generated.append(pair) or generate_pair(pair))
+
+    pairs = [("Gravity", "Advanced"), ("Cells", "Beginner"), ("gravity ", "advanced"), ("Gravity", "Advanced")]
+    results = backend.generate_all_content_batch(pairs, workers=4)
+    assert [content["explanation"] for content in results] == expected(pairs)
+    # Case and spacing variants are separate jobs, since the text echoes the topic as typed
+    assert generated == [("Gravity", "Advanced"), ("Cells", "Beginner"), ("gravity ", "advanced")]
+
+
+def test_one_worker_never_starts_a_pool(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("workers=1 must generate in-process")
+    monkeypatch.setattr(backend, "ProcessPoolExecutor", no_pool)
+    pairs = [(f"Gravity {n}", "Beginner") for n in range(backend.BATCH_PARALLEL_THRESHOLD)]
+    assert len(backend.generate_all_content_batch(pairs, workers=1)) == len(pairs)
+
+
+def test_pooled_batch_yields_results_in_input_order():
+    pairs = [(f"{topic} {n}", level) for n in range(6) for topic in TOPICS for level in LEVELS]
+    assert len(pairs) >= backend.BATCH_PARALLEL_THRESHOLD
+    pairs.reverse()
+    results = backend.generate_all_content_batch(pairs, workers=2, stream=True)
+    assert [content["explanation"] for content in results] == expected(pairs)
+
+
+def test_batch_results_are_caller_owned():
+    first, second = backend.generate_all_content_batch([("Cells", "Beginner")] * 2, workers=1)
+    first["quiz"].clear()
+    assert len(second["quiz"]) == 5
@@ -0,0 +1,29 @@
+"""Tests of the content generator backend interface."""
+
+import asyncio
+
+import pytest
+
+from content_backends import ContentBackend
+
+
+class ExplanationOnly(ContentBackend):
+    async def explanation(self, topic: str, level: str) -> str:
+        return f"{topic} ({level})"
+
+
+class Complete(ExplanationOnly):
+    async def quiz(self, topic: str, level: str):
+        return []
+
+    async def study_plan(self, topic: str, level: str) -> str:
+        return "plan"
+
+
+def test_backend_missing_a_section_cannot_be_created():
+    with pytest.raises(TypeError):
+        ExplanationOnly()
+
+
+def test_complete_backend_generates_sections_by_name():
+    assert asyncio.run(Complete().generate("explanation", "cells", "Beginner")) == "cells (Beginner)"
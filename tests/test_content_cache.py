@@ -0,0 +1,80 @@
+"""Tests of the generate_all_content result cache."""
+
+import pytest
+
+import backend
+from backend import ContentCache
+from topic_index import TopicMatch
+
+
+def key(topic: str, level: str = "beginner"):
+    return (topic, level, topic)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ContentCache(maxsize=2)
+    cache.put(key("a"), "A")
+    cache.put(key("b"), "B")
+    assert cache.get(key("a")) == "A"
+    cache.put(key("c"), "C")
+    assert cache.get(key("b")) is None
+    assert (cache.get(key("a")), cache.get(key("c"))) == ("A", "C")
+    assert cache.stats() == {"hits": 3, "misses": 1, "evictions": 1, "size": 2, "maxsize": 2}
+
+
+def test_shrinking_evicts_oldest_entries():
+    cache = ContentCache(maxsize=3)
+    for name in "abc":
+        cache.put(key(name), name)
+    cache.resize(1)
+    assert cache.get(key("c")) == "c"
+    assert cache.get(key("a")) is None and cache.get(key("b")) is None
+    assert cache.evictions == 2
+
+
+def test_invalidate_by_topic_and_level():
+    cache = ContentCache()
+    for topic in ("gravity", "cells"):
+        for level in ("beginner", "advanced"):
+            cache.put(key(topic, level), topic)
+    assert cache.invalidate("Gravity ", "Advanced") == 1
+    assert cache.invalidate(level="beginner") == 2
+    assert cache.stats()["size"] == 1
+    assert cache.get(key("cells", "advanced")) == "cells"
+
+
+def test_invalidate_topics_follows_the_entry_source():
+    cache = ContentCache()
+    cache.put(key("gravity"), "exact", TopicMatch("gravity", "gravity", 1.0, "gravity"))
+    cache.put(key("gravty"), "fuzzy", TopicMatch("gravity", "gravity", 0.8, "gravty"))
+    cache.put(key("orbits"), "fuzzy elsewhere", TopicMatch("orbit", "orbit", 0.8, "orbits"))
+    cache.put(key("cells"), "unknown source")
+    assert cache.invalidate_topics(frozenset({"gravity"})) == 3
+    assert cache.get(key("orbits")) == "fuzzy elsewhere"
+    assert cache.invalidate_topics(frozenset(), unmatched=True) == 1
+
+
+@pytest.fixture
+def clean_cache():
+    backend.invalidate_content_cache()
+    yield backend.content_cache
+    backend.invalidate_content_cache()
+
+
+def test_generated_content_is_served_from_the_cache_until_invalidated(clean_cache):
+    misses = clean_cache.misses
+    first = backend.generate_all_content("Photosynthesis", "Beginner")
+    second = backend.generate_all_content("Photosynthesis", "Beginner")
+    assert clean_cache.misses - misses == 1
+    assert second["explanation"] == first["explanation"]
+
+    assert backend.invalidate_content_cache("photosynthesis") == 1
+    backend.generate_all_content("Photosynthesis", "Beginner")
+    assert clean_cache.misses - misses == 2
+
+
+def test_callers_cannot_change_cached_content(clean_cache):
+    content = backend.generate_all_content("Photosynthesis", "Beginner")
+    quiz = content["quiz"]
+    quiz.clear()
+    assert len(backend.generate_all_content("Photosynthesis", "Beginner")["quiz"]) == 5
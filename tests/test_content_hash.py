@@ -0,0 +1,65 @@
+"""Tests of section content hashes, ETags and skeletons."""
+
+from http import HTTPStatus
+from urllib.parse import quote
+
+import pytest
+
+import backend
+import service
+from backend import SECTIONS
+from content_hash import ContentSkeleton, section_digest, substitutions
+
+
+def get(target: str, **headers):
+    return service.handle_request("GET", target, b"", {name.replace("_", "-"): value
+                                                        for name, value in headers.items()})
+
+
+@pytest.mark.parametrize("target", [
+    "/content?topic=Photosynthesis&level=Beginner",
+    "/quiz?topic=Photosynthesis&level=Beginner&seed=7",
+    "/explanation?topic=Gravity&level=Advanced",
+    "/content?topic=Gravity&level=Beginner&split=1",
+    "/skeleton?topic=Gravity&level=Beginner&section=study_plan",
+])
+def test_a_matching_if_none_match_is_not_modified(target):
+    status, payload, etag = get(target)
+    assert status == HTTPStatus.OK and etag.startswith('"')
+    assert get(target, if_none_match=etag) == (HTTPStatus.NOT_MODIFIED, None, etag)
+    assert get(target, if_none_match=f'"other", W/{etag}')[0] == HTTPStatus.NOT_MODIFIED
+    assert get(target, if_none_match="*")[0] == HTTPStatus.NOT_MODIFIED
+    assert get(target, if_none_match='"other"')[0] == HTTPStatus.OK
+
+
+def test_etag_does_not_depend_on_the_process_cache():
+    target = "/content?topic=Photosynthesis&level=Intermediate"
+    _, _, etag = get(target)
+    backend.invalidate_content_cache()
+    assert get(target)[2] == etag
+
+
+def test_etag_changes_with_the_content():
+    assert get("/explanation?topic=Gravity&level=Beginner")[2] != get("/explanation?topic=Gravity&level=Advanced")[2]
+
+
+def test_post_is_never_not_modified():
+    _, _, etag = get("/explanation?topic=Gravity&level=Beginner")
+    status, _, _ = service.handle_request("POST", "/explanation", b'{"topic": "Gravity"}', {"if-none-match": etag})
+    assert status == HTTPStatus.OK
+
+
+@pytest.mark.parametrize("topic", ["Photosynthesis", "tidal locking", "{braces} & 100%"])
+@pytest.mark.parametrize("section", SECTIONS)
+def test_skeleton_renders_to_the_generated_section(topic, section):
+    skeleton = backend.content_skeleton(topic, "Intermediate", section)
+    expected = backend.generate_all_content(topic, "Intermediate")[section]
+    rendered = skeleton.render(substitutions(topic, "Intermediate"))
+    assert section_digest(section, rendered) == section_digest(section, expected)
+    assert ContentSkeleton.decode(section, skeleton.encode()).digest == skeleton.digest
+
+
+def test_topics_without_an_entry_share_skeletons():
+    split = [get(f"/content?topic={quote(topic)}&level=Beginner&split=1")[1] for topic in ("Gravity", "Tides")]
+    assert split[0]["sections"] == split[1]["sections"]
+    assert split[0]["substitutions"]["topic"] == "Gravity"
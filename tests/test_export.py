@@ -0,0 +1,67 @@
+"""Tests of the static export."""
+
+import json
+
+import pytest
+
+import backend
+import export
+from knowledge_source import KnowledgeSource
+
+
+@pytest.fixture
+def knowledge_source(monkeypatch, tmp_path):
+    """Serve a hot-reloaded knowledge source with the given topics."""
+    def install(*topics: str) -> None:
+        source = tmp_path / "topics.jsonl"
+        with open(source, "w", encoding="utf-8") as f:
+            for topic in topics:
+                level = {"definition": f"{topic} DEFINITION", "key_points": ["point"]}
+                f.write(json.dumps({"topic": topic, "levels": {"beginner": level}}) + "\n")
+        loaded = KnowledgeSource(str(source))
+        loaded.reload()
+        monkeypatch.setattr(backend, "knowledge_source", loaded)
+        backend.invalidate_content_cache()
+    yield install
+    backend.invalidate_content_cache()
+
+
+def test_export_covers_knowledge_source_topics(knowledge_source, tmp_path):
+    knowledge_source("tidal locking")
+    export.export(str(tmp_path / "dist"), workers=1, formats=("json",))
+    page = json.loads((tmp_path / "dist/tidal-locking/beginner.json").read_text(encoding="utf-8"))
+    assert "tidal locking DEFINITION" in page["explanation"]
+
+
+def test_export_refuses_topics_with_the_same_directory(knowledge_source, tmp_path):
+    knowledge_source("cell biology", "cell-biology")
+    with pytest.raises(ValueError, match="cell-biology"):
+        export.export(str(tmp_path / "dist"), workers=1)
+    assert not (tmp_path / "dist").exists()
+
+
+def test_pages_are_rendered_again_when_a_renderer_changes(knowledge_source, tmp_path, monkeypatch):
+    knowledge_source("tidal locking")
+    first = export.export(str(tmp_path / "dist"), workers=1, formats=("html",))
+    assert export.export(str(tmp_path / "dist"), workers=1, formats=("html",))["rendered"] == 0
+    monkeypatch.setattr(export, "source_fingerprint", lambda modules: "edited fragments.py")
+    assert export.export(str(tmp_path / "dist"), workers=1, formats=("html",))["rendered"] == first["rendered"]
+
+
+def test_stale_entries_never_remove_files_outside_the_output(knowledge_source, tmp_path):
+    knowledge_source("tidal locking", "orbits")
+    dist = tmp_path / "dist"
+    export.export(str(dist), workers=1, formats=("json",))
+    outside = tmp_path / "keep.txt"
+    outside.write_text("not part of the export", encoding="utf-8")
+    manifest = json.loads((dist / "manifest.json").read_text(encoding="utf-8"))
+    manifest["entries"]["orbits/beginner"]["files"]["json"]["path"] = "../keep.txt"
+    (dist / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+    knowledge_source("tidal locking")
+    assert export.export(str(dist), workers=1, formats=("json",))["removed"] == 3
+    assert outside.exists()
+    # Only the entry with the rewritten path is left behind
+    assert (dist / "orbits" / "beginner.json").exists()
+    assert not (dist / "orbits" / "advanced.json").exists()
+    assert (dist / "tidal-locking" / "beginner.json").exists()
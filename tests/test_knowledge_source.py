@@ -0,0 +1,49 @@
+"""Tests of the hot-reloaded knowledge source."""
+
+import json
+
+import pytest
+
+from knowledge_source import KnowledgeSource, KnowledgeSourceError
+
+
+def topic_line(topic: str, definition: str, **extra) -> str:
+    level = {"definition": definition, "key_points": ["point"]}
+    return json.dumps({"topic": topic, "levels": {"beginner": level}, **extra}) + "\n"
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "topics.jsonl"
+    path.write_text(topic_line("gravity", "mass attracts mass"), encoding="utf-8")
+    loaded = KnowledgeSource(str(path))
+    loaded.reload()
+    return path, loaded
+
+
+@pytest.mark.parametrize("aliases", ["grav", [1], [""], {"grav": True}])
+def test_malformed_aliases_keep_the_current_version(source, aliases):
+    path, loaded = source
+    version = loaded.current
+    path.write_text(topic_line("gravity", "spacetime curvature", aliases=aliases)
+                    + topic_line("orbits", "falling around"), encoding="utf-8")
+    with pytest.raises(KnowledgeSourceError, match="aliases"):
+        loaded.reload()
+    assert loaded.current is version
+    assert [hit.key for hit in loaded.search("curvature")] == []
+    assert [hit.key for hit in loaded.search("falling")] == []
+
+    # The failed attempt is not remembered, so the fixed file is loaded
+    path.write_text(topic_line("gravity", "spacetime curvature", aliases=["grav"]), encoding="utf-8")
+    change = loaded.reload()
+    assert change.changed == {"gravity"}
+    assert loaded.lookup("grav").key == "gravity"
+    assert [hit.key for hit in loaded.search("curvature")] == ["gravity"]
+
+
+def test_an_unchanged_broken_file_fails_every_reload(source):
+    path, loaded = source
+    path.write_text(topic_line("gravity", "mass attracts mass", aliases="grav"), encoding="utf-8")
+    for _ in range(2):
+        with pytest.raises(KnowledgeSourceError):
+            loaded.reload()
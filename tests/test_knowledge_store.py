@@ -0,0 +1,70 @@
+"""Tests of the SQLite knowledge store."""
+
+import pytest
+
+from knowledge_store import KnowledgeStore, build_store
+
+
+def entry(definition: str, *key_points: str) -> dict:
+    return {"beginner": {"definition": definition, "key_points": list(key_points)}}
+
+
+KNOWLEDGE_BASE = {
+    "photosynthesis": entry("Plants turn light into chemical energy", "chlorophyll absorbs light"),
+    "cell biology": entry("Cells are the units of life", "the cell membrane"),
+    "respiration": entry("Cells release energy from glucose", "mitochondria"),
+    "world war ii": entry("A global war from 1939 to 1945", "allies", "axis"),
+    "plate tectonics": entry("Earth's crust moves in plates", "earthquakes"),
+    "volcanoes": entry("Openings where magma reaches the surface", "lava"),
+    "default": entry("General template", "overview"),
+}
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("store") / "knowledge.sqlite")
+    build_store(path, KNOWLEDGE_BASE, {"world war ii": ["ww2", "second world war"]})
+    return KnowledgeStore(path)
+
+
+def test_records_are_read_back(store):
+    assert len(store) == len(KNOWLEDGE_BASE)
+    assert "volcanoes" in store and "geysers" not in store
+    volcanoes = store.get("volcanoes", "beginner")
+    assert volcanoes.definition == "Openings where magma reaches the surface"
+    assert list(volcanoes.key_points) == ["lava"]
+    assert store.get("volcanoes", "advanced") is None
+
+
+@pytest.mark.parametrize("topic, expected", [
+    ("Cell Biology", ("cell biology", "cell biology", 1.0)),
+    ("WW2", ("world war ii", "ww2", 1.0)),
+    ("platetectonics", ("plate tectonics", "plate tectonics", 1.0)),
+])
+def test_names_and_aliases_resolve_exactly(store, topic, expected):
+    match = store.lookup(topic)
+    assert (match.key, match.matched, match.score) == expected
+
+
+def test_typos_resolve_only_when_fuzzy(store):
+    assert store.lookup("photosynthesys", fuzzy=False) is None
+    match = store.lookup("photosynthesys")
+    assert match.key == "photosynthesis" and 0.7 <= match.score < 1.0
+    assert store.lookup("chemosynthesis") is None
+
+
+def test_search_ranks_the_topic_that_names_the_term(store):
+    hits = store.search("chlorophyll")
+    assert [hit.key for hit in hits] == ["photosynthesis"]
+    assert hits[0].score > 0
+
+
+def test_topics_matching_every_word_rank_first(store):
+    hits = store.search("cells energy")
+    assert hits[0].key == "respiration"
+    assert {hit.key for hit in hits} == {"respiration", "cell biology", "photosynthesis"}
+
+
+def test_last_word_matches_its_completions(store):
+    assert [hit.key for hit in store.search("magm")] == ["volcanoes"]
+    assert store.search("") == [] and store.search("lava", limit=0) == []
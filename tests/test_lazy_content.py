@@ -0,0 +1,49 @@
+"""Tests of section-by-section content generation."""
+
+import pytest
+
+import backend
+from backend import SECTIONS, LazyContent
+
+
+@pytest.fixture
+def generated(monkeypatch):
+    """Count which sections the rule-based generators produce."""
+    calls = []
+    for section, generate in list(backend._SECTION_GENERATORS.items()):
+        def counted(topic, level, section=section, generate=generate):
+            calls.append(section)
+            return generate(topic, level)
+        monkeypatch.setitem(backend._SECTION_GENERATORS, section, counted)
+    backend.invalidate_content_cache()
+    yield calls
+    backend.invalidate_content_cache()
+
+
+def test_nothing_is_generated_until_a_section_is_read(generated):
+    content = backend.generate_all_content("Photosynthesis", "Beginner")
+    assert isinstance(content, LazyContent)
+    assert list(content) == list(SECTIONS) and len(content) == 3
+    assert generated == []
+    assert not any(content.is_ready(section) for section in SECTIONS)
+
+    assert len(content["quiz"]) == 5
+    assert generated == ["quiz"]
+    assert content.is_ready("quiz") and not content.is_ready("explanation")
+
+
+def test_sections_are_generated_once_per_pair(generated):
+    backend.generate_all_content("Photosynthesis", "Beginner")["study_plan"]
+    again = backend.generate_all_content("Photosynthesis", "Beginner")
+    assert again.is_ready("study_plan")
+    again["study_plan"]
+    dict(again)
+    assert sorted(generated) == ["explanation", "quiz", "study_plan"]
+
+
+def test_lazy_sections_match_the_direct_generators(generated):
+    content = dict(backend.generate_all_content("Photosynthesis", "Advanced"))
+    assert content["explanation"] == backend.generate_explanation("Photosynthesis", "Advanced")
+    assert content["study_plan"] == backend.generate_study_plan("Photosynthesis", "Advanced")
+    assert [q.question for q in content["quiz"]] == \
+        [q.question for q in backend.generate_quiz("Photosynthesis", "Advanced")]
@@ -0,0 +1,22 @@
+"""Tests of the Prometheus export."""
+
+import backend
+
+
+def samples(text: str) -> dict:
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def test_cache_counts_are_exported_as_counters():
+    text = backend.render_metrics()
+    for name in ("hits", "misses", "evictions", "coalesced_content", "coalesced_sections"):
+        assert f"# TYPE eduassist_content_cache_{name}_total counter" in text
+        assert f"eduassist_content_cache_{name} " not in text
+    assert "# TYPE eduassist_content_cache_size gauge" in text
+
+
+def test_cache_hits_counter_increases():
+    backend.generate_all_content("Photosynthesis", "Beginner")
+    before = float(samples(backend.render_metrics())["eduassist_content_cache_hits_total"])
+    backend.generate_all_content("Photosynthesis", "Beginner")
+    assert float(samples(backend.render_metrics())["eduassist_content_cache_hits_total"]) == before + 1
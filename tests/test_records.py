@@ -0,0 +1,56 @@
+"""Tests that content records still read like the dictionaries they replaced."""
+
+from dataclasses import FrozenInstanceError
+import json
+import pickle
+
+import pytest
+
+import backend
+from records import QuizQuestion, StudyWeek, TopicEntry, to_json_compatible
+
+
+@pytest.fixture
+def question():
+    return backend.generate_quiz("Photosynthesis", "Beginner")[0]
+
+
+def test_quiz_question_reads_like_a_dictionary(question):
+    assert isinstance(question, QuizQuestion)
+    assert set(question) == {"question", "options", "correct_answer"}
+    assert question["question"] == question.question
+    assert question.get("correct_answer") in "ABCD"
+    assert question.get("explanation", "none") == "none"
+    with pytest.raises(KeyError):
+        question["explanation"]
+    assert {**question}["options"] == question.options
+
+
+def test_sequences_are_tuples_but_serialize_as_lists(question):
+    assert isinstance(question["options"], tuple) and len(question["options"]) == 4
+    as_dict = question.to_dict()
+    assert isinstance(as_dict["options"], list)
+    assert json.loads(json.dumps(question, default=to_json_compatible)) == as_dict
+    # A record compares equal to the plain dictionary it replaced
+    assert question == {**as_dict, "options": tuple(as_dict["options"])}
+
+
+def test_records_are_immutable_and_survive_pickling(question):
+    with pytest.raises(FrozenInstanceError):
+        question.question = "changed"
+    restored = pickle.loads(pickle.dumps(question))
+    assert type(restored) is QuizQuestion and restored == question
+
+
+def test_from_mapping_accepts_old_dictionaries():
+    week = StudyWeek.from_mapping({"week": 2, "focus": "Practice", "activities": ["Quiz", "Review"]})
+    assert (week["week"], week["activities"]) == (2, ("Quiz", "Review"))
+    entry = TopicEntry.from_mapping({"definition": "Mass attracts mass", "key_points": ["g = 9.8 m/s²"]})
+    assert TopicEntry.from_mapping(entry) is entry
+    assert entry.to_dict() == {"definition": "Mass attracts mass", "key_points": ["g = 9.8 m/s²"]}
+
+
+def test_repeated_text_is_stored_once():
+    first = QuizQuestion.create("".join(["Wh", "at?"]), ["".join(["A) ", "yes"]), "B) no"], "A")
+    second = QuizQuestion.create("What?", ["A) yes", "B) no"], "A")
+    assert first.question is second.question and first.options[0] is second.options[0]
@@ -0,0 +1,64 @@
+"""Tests of quiz grading and item statistics."""
+
+import pytest
+
+from scoring import UNANSWERED, ScoringEngine, encode_answers
+
+
+def test_quiz_of_another_length_keeps_recorded_statistics():
+    engine = ScoringEngine()
+    engine.score("cells/beginner", [["A", "B", "C"], ["A", "C", "C"]], ["A", "B", "C"])
+    engine.score("cells/beginner", [["A", "B"]], ["A", "B"])
+
+    stats = engine.statistics("cells/beginner")
+    assert (stats.n_items, stats.submissions, stats.score_total) == (3, 3, 7)
+    assert [row["answers"] for row in stats.summary()] == [3, 3, 2]
+
+
+def test_question_statistics_pool_every_draw_that_asks_it():
+    engine = ScoringEngine()
+    # Four students, each with a different draw; "q1" is in every one
+    draws = [["q1", "q2"], ["q3", "q1"], ["q1", "q4"], ["q5", "q1"]]
+    answers = [["A", "A"], ["A", "A"], ["B", "A"], ["B", "B"]]
+    for item_ids, response in zip(draws, answers):
+        engine.score("cells/beginner", [response], ["A", "A"], item_ids=item_ids)
+
+    (q1,) = engine.statistics("cells/beginner").summary(["q1"])
+    assert (q1["answers"], q1["difficulty"]) == (4, 0.5)
+    assert q1["discrimination"] is not None
+
+
+def test_statistics_keep_only_the_most_recently_graded_pools():
+    engine = ScoringEngine(max_pools=2)
+    for quiz_id in ("a/beginner", "b/beginner", "a/beginner", "c/beginner"):
+        engine.score(quiz_id, [["A"]], ["A"])
+    assert engine.quizzes() == ["a/beginner", "c/beginner"]
+
+
+def test_quiz_cannot_ask_a_question_twice():
+    with pytest.raises(ValueError):
+        ScoringEngine().score("cells/beginner", [["A", "A"]], ["A", "A"], item_ids=["q1", "q1"])
+
+
+@pytest.mark.parametrize("responses", [
+    [[["A"]] * 3],              # One level of nesting too many
+    [["AB", "B", "C"]],         # Would be read as "A"
+    [[{"answer": "A"}, "B", "C"]],
+    [[1.5, "B", "C"]],
+])
+def test_malformed_submission_is_rejected_without_touching_statistics(responses):
+    engine = ScoringEngine()
+    engine.score("cells/beginner", [["A", "B", "C"], ["A", "C", "C"]], ["A", "B", "C"])
+    before = engine.statistics("cells/beginner").summary()
+
+    with pytest.raises(ValueError):
+        engine.score("cells/beginner", responses, ["A", "B", "C"])
+
+    stats = engine.statistics("cells/beginner")
+    assert (stats.submissions, stats.score_total) == (2, 5)
+    assert stats.summary() == before
+
+
+def test_blank_and_out_of_range_answers_are_unanswered():
+    assert encode_answers(["a", None, "", "Z"]).tolist() == [0, UNANSWERED, UNANSWERED, UNANSWERED]
+    assert encode_answers([0, 7, 8]).tolist() == [0, 7, UNANSWERED]
@@ -0,0 +1,36 @@
+"""Regression tests for the BM25 topic search."""
+
+import pytest
+
+from search_index import SearchIndex
+
+
+KNOWLEDGE_BASE = {
+    "photosynthesis": {"beginner": {"definition": "Plants turn light into chemical energy", "key_points": ["chlorophyll"]}},
+    "world war ii": {"beginner": {"definition": "A global war from 1939 to 1945", "key_points": ["allies", "axis"]}},
+    "cell biology": {"beginner": {"definition": "Cells are the units of life", "key_points": ["cell membrane"]}}
+}
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SearchIndex.build(KNOWLEDGE_BASE)
+
+
+@pytest.mark.parametrize("query", ["World War 2", "x", "c", "zzzz", "world war q", "cell x"])
+def test_short_or_unknown_last_token_does_not_fail(index, query):
+    hits = index.search(query)
+    assert all(hit.score > 0 for hit in hits)
+
+
+def test_whole_words_still_rank_with_unknown_last_token(index):
+    assert index.search("World War 2")[0].key == "world war ii"
+
+
+def test_short_last_token_matches_a_whole_indexed_term(index):
+    assert index._completions("ii") == ["ii"]
+    assert index._completions("q") == []
+
+
+def test_prefix_completion(index):
+    assert index.search("photosynth")[0].key == "photosynthesis"
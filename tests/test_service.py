@@ -0,0 +1,199 @@
+"""Tests of the JSON service, called in process and running as a subprocess."""
+
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import quote
+from urllib.request import urlopen
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import service as service_module
+from scoring import scoring_engine
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(port: int, target: str) -> dict:
+    with urlopen(f"http://127.0.0.1:{port}{target}", timeout=5) as response:
+        return json.loads(response.read())
+
+
+def write_source(path: str, definition: str) -> None:
+    line = {"topic": "tidal locking", "levels": {"beginner": {"definition": definition, "key_points": ["Moon"]}}}
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(line) + "\n")
+    os.replace(tmp, path)
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Start service.py with two forked workers and a hot-reloaded knowledge source."""
+    source = str(tmp_path / "topics.jsonl")
+    write_source(source, "OLD definition")
+    port = free_port()
+    env = dict(os.environ, EDUASSIST_KB_SOURCE=source, EDUASSIST_KB_POLL_INTERVAL="0.1")
+    process = subprocess.Popen([sys.executable, "service.py", "--host", "127.0.0.1", "--port", str(port),
+                                "--workers", "2"], cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                get(port, "/health")
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+        yield port, source
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def explanations(port: int, requests: int = 40) -> set:
+    target = "/explanation?topic=" + quote("tidal locking") + "&level=Beginner"
+    with ThreadPoolExecutor(8) as pool:
+        return set(pool.map(lambda _: get(port, target)["explanation"], range(requests)))
+
+
+def test_every_worker_sees_knowledge_source_edits(service):
+    port, source = service
+    assert all("OLD definition" in text for text in explanations(port))
+
+    write_source(source, "NEW definition")
+    deadline = time.monotonic() + 10
+    while True:
+        texts = explanations(port)
+        if all("NEW definition" in text for text in texts):
+            break
+        assert time.monotonic() < deadline, "a worker kept serving the old knowledge source"
+        time.sleep(0.2)
+
+
+def grade(responses, **options) -> dict:
+    body = json.dumps({"topic": "photosynthesis", "level": "Beginner", "responses": responses, **options})
+    status, payload, _ = service_module.handle_request("POST", "/grade", body.encode("utf-8"))
+    assert status == HTTPStatus.OK
+    return payload
+
+
+def test_every_draw_adds_to_the_same_question_statistics():
+    scoring_engine.reset()
+    first = grade([["A"] * 8], seed="s1", num_questions=8)
+    second = grade([["B"] * 8], seed="s2", num_questions=8)
+    assert first["max_score"] == second["max_score"] == 8
+    asked_before = {item["question"] for item in first["items"]}
+    answers = {item["question"]: item["answers"] for item in second["items"]}
+    assert asked_before & set(answers)
+    assert all(count == (2 if question in asked_before else 1) for question, count in answers.items())
+    assert service_module.scoring_engine.quizzes() == ["photosynthesis/beginner"]
+
+
+@pytest.mark.parametrize("query", ["seed=s1&num_questions=9", "num_questions=6"])
+def test_quiz_longer_than_its_questions_is_rejected(query):
+    with pytest.raises(service_module.HTTPError) as error:
+        service_module.handle_request("GET", f"/quiz?topic=cells&level=Beginner&{query}", b"")
+    assert error.value.status == HTTPStatus.BAD_REQUEST
+
+
+def test_quiz_as_long_as_the_bank_allows():
+    status, payload, _ = service_module.handle_request("GET", "/quiz?topic=cells&level=Beginner&seed=s1&num_questions=8", b"")
+    assert status == HTTPStatus.OK and len(payload["quiz"]) == 8
+
+
+def read_request(data: bytes, eof: bool = True):
+    """Parse one request from data with the service's reader."""
+    async def read():
+        reader = asyncio.StreamReader(limit=service_module.MAX_HEADER_BYTES)
+        reader.feed_data(data)
+        if eof:
+            reader.feed_eof()
+        return await service_module._read_request(reader)
+    return asyncio.run(read())
+
+
+def test_request_body_over_the_limit_is_rejected_unread():
+    head = f"POST /explanation HTTP/1.1\r\nContent-Length: {service_module.MAX_BODY_BYTES + 1}\r\n\r\n"
+    with pytest.raises(service_module.HTTPError) as error:
+        read_request(head.encode("latin-1"), eof=False)
+    assert error.value.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+def test_request_body_that_never_arrives_times_out(monkeypatch):
+    monkeypatch.setattr(service_module, "BODY_TIMEOUT", 0.05)
+    with pytest.raises(service_module.HTTPError) as error:
+        read_request(b"POST /explanation HTTP/1.1\r\nContent-Length: 10\r\n\r\n{", eof=False)
+    assert error.value.status == HTTPStatus.REQUEST_TIMEOUT
+
+
+def test_request_body_cut_short_closes_the_connection():
+    assert read_request(b"POST /explanation HTTP/1.1\r\nContent-Length: 10\r\n\r\n{") is None
+
+
+def test_malformed_grading_request_is_a_bad_request():
+    scoring_engine.reset()
+    grade([["A"] * 5])
+    body = json.dumps({"topic": "photosynthesis", "level": "Beginner", "responses": [[["A"]] * 5]})
+    with pytest.raises(service_module.HTTPError) as error:
+        service_module.handle_request("POST", "/grade", body.encode("utf-8"))
+    assert error.value.status == HTTPStatus.BAD_REQUEST
+    assert grade([["B"] * 5])["submissions"] == 2
+
+
+def serve_one(request: bytes) -> bytes:
+    """Send one raw request to an in-process server and return the raw response."""
+    async def exchange():
+        server = await asyncio.start_server(service_module._serve_connection, "127.0.0.1", 0,
+                                            limit=service_module.MAX_HEADER_BYTES)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(request)
+            response = await reader.read()
+            writer.close()
+            return response
+    return asyncio.run(exchange())
+
+
+def test_chunked_request_body_is_refused():
+    with pytest.raises(service_module.HTTPError) as error:
+        read_request(b"POST /grade HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n2\r\n{}\r\n0\r\n\r\n")
+    assert error.value.status == HTTPStatus.NOT_IMPLEMENTED
+
+
+def test_grading_runs_off_the_event_loop(monkeypatch):
+    threads = {}
+
+    def record_thread(method, target, body, headers=None):
+        threads[target] = threading.current_thread()
+        return HTTPStatus.OK, {}, None
+    monkeypatch.setattr(service_module, "handle_request", record_thread)
+    for target in ("/health", "/grade"):
+        serve_one(f"POST {target} HTTP/1.1\r\nConnection: close\r\n\r\n".encode("latin-1"))
+    assert threads["/health"] is threading.main_thread()
+    assert threads["/grade"] is not threading.main_thread()
+
+
+def test_unexpected_errors_are_not_echoed(monkeypatch, caplog):
+    def fail(*args):
+        raise OSError("/srv/eduassist/secrets.json is unreadable")
+    monkeypatch.setattr(service_module, "handle_request", fail)
+    response = serve_one(b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n")
+    assert response.startswith(b"HTTP/1.1 500 ")
+    assert b"secrets" not in response
+    assert "secrets.json" in caplog.text
@@ -0,0 +1,89 @@
+"""Tests of the host-wide shared content cache."""
+
+import sqlite3
+
+import pytest
+
+from content_hash import ContentSkeleton, encode_section
+from shared_cache import ROW_OVERHEAD, SharedContentCache
+from topic_index import TopicMatch
+
+
+EXPLANATION = 0
+
+
+def key(topic: str, level: str = "beginner"):
+    return (topic.lower(), level, topic)
+
+
+def source(topic: str) -> TopicMatch:
+    return TopicMatch(topic.lower(), topic.lower(), 1.0, topic.lower())
+
+
+def skeleton(text: str) -> ContentSkeleton:
+    return ContentSkeleton("explanation", text + " about {topic} at {level} level")
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "shared.sqlite")
+
+
+def stored_bytes(path: str) -> int:
+    """The actual size of every row, to check the running total against."""
+    with sqlite3.connect(path) as connection:
+        sections = connection.execute("SELECT COALESCE(SUM(size), 0) FROM sections").fetchone()[0]
+        skeletons = connection.execute("SELECT COALESCE(SUM(size), 0) FROM skeletons").fetchone()[0]
+    return sections + skeletons
+
+
+def test_a_section_written_by_one_process_is_read_by_another(path):
+    writer, reader = SharedContentCache(path), SharedContentCache(path)
+    writer.put(key("Gravity"), EXPLANATION, skeleton("Notes"), "gravity@1", source("Gravity"))
+    assert reader.get(key("Gravity"), "gravity@1") == ["Notes about Gravity at Beginner level", None, None]
+    assert reader.stats()["hits"] == 1 and writer.stats()["writes"] == 1
+
+
+def test_a_stale_stamp_is_a_miss(path):
+    writer, reader = SharedContentCache(path), SharedContentCache(path)
+    writer.put(key("Gravity"), EXPLANATION, skeleton("Old notes"), "gravity@1", source("Gravity"))
+    assert reader.get(key("Gravity"), "gravity@2") is None
+    assert reader.stats()["misses"] == 1
+
+
+def test_other_code_versions_do_not_share_rows(path):
+    SharedContentCache(path, namespace="v1").put(
+        key("Gravity"), EXPLANATION, skeleton("Notes"), "gravity@1", source("Gravity"))
+    assert SharedContentCache(path, namespace="v2").get(key("Gravity"), "gravity@1") is None
+
+
+def test_topics_share_one_skeleton_and_bytes_are_accounted(path):
+    first, second = SharedContentCache(path), SharedContentCache(path)
+    first.put(key("Gravity"), EXPLANATION, skeleton("Notes"), "default@", source("Gravity"))
+    second.put(key("Orbits"), EXPLANATION, skeleton("Notes"), "default@", source("Orbits"))
+    stats = first.stats()
+    assert (stats["entries"], stats["skeletons"]) == (2, 1)
+    assert stats["bytes"] == stored_bytes(path)
+
+    # Replacing a row and invalidating from the other connection keep the total exact
+    second.put(key("Gravity"), EXPLANATION, skeleton("Newer notes"), "default@", source("Gravity"))
+    assert first.invalidate_topics(frozenset({"orbits"})) == 1
+    stats = second.stats()
+    assert (stats["entries"], stats["skeletons"]) == (1, 1)
+    assert stats["bytes"] == stored_bytes(path)
+
+
+def test_least_recently_used_rows_are_evicted_past_the_limit(path):
+    row = ROW_OVERHEAD + len("Topic 0") + ROW_OVERHEAD + len(encode_section("explanation", "x" * 200 + " {topic}"))
+    first = SharedContentCache(path, max_bytes=3 * row)
+    second = SharedContentCache(path, max_bytes=3 * row)
+    for n in range(4):
+        writer = first if n % 2 else second
+        writer.put(key(f"Topic {n}"), EXPLANATION,
+                   ContentSkeleton("explanation", f"{n}" * 200 + " {topic}"), "stamp", source(f"Topic {n}"))
+    # Making room for the fourth row evicts the oldest two (down to EVICT_TO), never the new one
+    assert [first.get(key(f"Topic {n}"), "stamp") is not None for n in range(4)] == [False, False, True, True]
+    assert first.evictions + second.evictions == 2
+    stats = first.stats()
+    assert stats["bytes"] <= 3 * row
+    assert stats["bytes"] == stored_bytes(path)
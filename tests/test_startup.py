@@ -0,0 +1,13 @@
+"""Cold import time of each entry point, held to the benchmark's budget."""
+
+import statistics
+
+import pytest
+
+from benchmark import IMPORT_BUDGET_MS, STARTUP_MODULES, import_time_ms
+
+
+@pytest.mark.parametrize("module", STARTUP_MODULES)
+def test_cold_import_stays_within_budget(module):
+    median = statistics.median(import_time_ms(module) for _ in range(3))
+    assert median <= IMPORT_BUDGET_MS, f"importing {module} took {median:.0f} ms"
@@ -0,0 +1,35 @@
+"""Tests of topic resolution."""
+
+import pytest
+
+from backend import resolve_topic
+from topic_index import TopicIndex
+
+
+@pytest.mark.parametrize("topic, exact", [
+    ("Photosynthesis", True),
+    ("photo synthesis", True),
+    ("Calvin cycle", False),
+    ("photosynthesys", False),
+])
+def test_only_the_topic_name_resolves_exactly(topic, exact):
+    match = resolve_topic(topic)
+    assert match.key == "photosynthesis"
+    assert match.exact is exact
+
+
+@pytest.mark.parametrize("topic", ["fotosynthesis", "photo synthesys", "calvin cycel"])
+def test_typos_resolve_to_the_topic(topic):
+    assert resolve_topic(topic).key == "photosynthesis"
+
+
+@pytest.mark.parametrize("topic", ["chemosynthesis", "biosynthesis", "synthesis", "protein synthesis", "photo"])
+def test_near_miss_words_do_not_resolve(topic):
+    match = resolve_topic(topic)
+    assert (match.key, match.score) == ("default", 0.0)
+
+
+def test_alias_match_keeps_full_confidence():
+    index = TopicIndex.build(["world war 2"], {"world war 2": ["ww2"]})
+    match = index.lookup("WW2")
+    assert (match.key, match.matched, match.score, match.exact) == ("world war 2", "ww2", 1.0, False)
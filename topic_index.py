@@ -0,0 +1,150 @@
+"""
+EduAssist AI - Topic Index
+Resolves misspelled, reworded and aliased topics to knowledge base entries
+using a character trigram index built once over topic names and aliases
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional
+import math
+import re
+
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+class TopicMatch(NamedTuple):
+    """Result of resolving a topic against the index."""
+    key: str          # Knowledge base key that matched
+    matched: str      # Name or alias the query matched against
+    score: float      # Confidence between 0.0 and 1.0
+    query: str        # The normalized query
+
+    @property
+    def exact(self) -> bool:
+        """The query named the entry itself; alias and fuzzy matches are not exact."""
+        return self.score >= 1.0 and compact_topic(self.matched) == compact_topic(normalize_topic(self.key))
+
+
+def normalize_topic(topic: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace."""
+    return " ".join(_NON_WORD.sub(" ", topic.lower()).split())
+
+
+def compact_topic(name: str) -> str:
+    """Drop spaces so "photo synthesis" and "photosynthesis" compare equal."""
+    return name.replace(" ", "")
+
+
+def topic_trigrams(compact: str) -> frozenset:
+    """Return the padded character trigrams of a space-free topic name."""
+    padded = f"  {compact} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TopicIndex:
+    """
+    Character trigram index over topic names and aliases.
+
+    Exact names, aliases and their space-insensitive forms resolve through a
+    dictionary. Everything else is ranked by trigram Dice similarity over
+    candidates drawn from the query's rarest indexed trigrams, so lookups
+    touch a few short posting lists even on very large knowledge bases.
+    """
+
+    MIN_SCANNED = 4          # Rarest posting lists always scanned
+    POSTING_BUDGET = 1000    # Candidates gathered before the scan stops early
+    MAX_CANDIDATES = 64      # Candidates verified, by most shared trigrams
+
+    def __init__(self, threshold: float = 0.7):
+        self.threshold = threshold
+        self._exact: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._keys: List[str] = []
+        self._grams: List[frozenset] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+    @classmethod
+    def build(cls, topics: Iterable[str], aliases: Optional[Dict[str, Iterable[str]]] = None,
+              threshold: float = 0.7) -> "TopicIndex":
+        """
+        Build an index over topics and their declared aliases.
+
+        Args:
+            topics: Knowledge base keys
+            aliases: Mapping of knowledge base key to alternative names
+            threshold: Minimum similarity for a fuzzy match
+
+        Returns:
+            A populated TopicIndex
+        """
+        index = cls(threshold)
+        for topic in topics:
+            index.add(topic, topic)
+        for topic, names in (aliases or {}).items():
+            for name in names:
+                index.add(topic, name)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, key: str, name: str) -> None:
+        """Index name as a way of referring to the knowledge base entry key."""
+        normalized = normalize_topic(name)
+        compact = compact_topic(normalized)
+        if not compact or compact in self._exact:
+            return
+        entry_id = len(self._names)
+        self._names.append(normalized)
+        self._keys.append(key)
+        self._exact[compact] = entry_id
+        grams = topic_trigrams(compact)
+        self._grams.append(grams)
+        for gram in grams:
+            self._postings[gram].append(entry_id)
+
+    def lookup(self, topic: str) -> Optional[TopicMatch]:
+        """
+        Find the best entry for a topic.
+
+        Args:
+            topic: Topic as entered by the student
+
+        Returns:
+            The best TopicMatch at or above the threshold, or None
+        """
+        query = normalize_topic(topic)
+        compact = compact_topic(query)
+        entry_id = self._exact.get(compact)
+        if entry_id is not None:
+            return TopicMatch(self._keys[entry_id], self._names[entry_id], 1.0, query)
+        if not compact:
+            return None
+
+        grams = topic_trigrams(compact)
+        size = len(grams)
+        # Dice >= t needs at least t*|q|/(2-t) shared trigrams, so any candidate
+        # must appear in one of the (|q| - min_shared + 1) rarest posting lists.
+        # Past MIN_SCANNED lists the scan also stops once the posting budget is
+        # spent: a typo only disturbs a few trigrams, so the rarest ones survive.
+        min_shared = max(1, math.ceil(self.threshold * size / (2 - self.threshold) - 1e-9))
+        postings = sorted(
+            (self._postings[gram] for gram in grams if gram in self._postings),
+            key=len
+        )
+        shared = Counter()
+        for scanned, posting in enumerate(postings[:size - min_shared + 1], 1):
+            shared.update(posting)
+            if scanned >= self.MIN_SCANNED and len(shared) >= self.POSTING_BUDGET:
+                break
+
+        best_id, best_score = -1, 0.0
+        for candidate, _ in shared.most_common(self.MAX_CANDIDATES):
+            other = self._grams[candidate]
+            score = 2 * len(grams & other) / (size + len(other))
+            if score > best_score:
+                best_id, best_score = candidate, score
+        if best_id < 0 or best_score < self.threshold:
+            return None
+        return TopicMatch(self._keys[best_id], self._names[best_id], round(best_score, 3), query)